@@ -0,0 +1,206 @@
+"""Benchmark the results history queries on a synthetic sqlite DB.
+
+Builds a history of runs in a temporary sqlite DB (migrated to the latest
+schema, without the results history indexes of migration 0004), measures the
+latency of the queries that go over the history, adds the indexes and
+measures again.
+
+Usage:
+    python benchmarks/results_history.py --runs 200 --cases 500
+"""
+# pylint: disable=protected-access
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.core.management import call_command
+
+# The indexes added by migration 0004, by model name
+INDEXED_FIELDS = (("CaseData", "exception_type"),
+                  ("RunData", "run_name"))
+
+
+def create_run(run_name, start_time, cases, randomizer):
+    """Create a run of cases in the DB, using bulk inserts.
+
+    Args:
+        run_name (str): name of the run.
+        start_time (datetime.datetime): start time of the run.
+        cases (number): number of cases in the run.
+        randomizer (random.Random): randomizer of the cases' outcomes.
+    """
+    from rotest.core.models import RunData, GeneralData, CaseData
+    from rotest.core.models.case_data import TestOutcome
+
+    with transaction.atomic():
+        run_data = RunData.objects.create(run_name=run_name, run_delta=False)
+        cases_datas = [
+            CaseData(name="Case%d.test_method" % case_index,
+                     run_data=run_data,
+                     status=GeneralData.FINISHED,
+                     start_time=start_time + timedelta(seconds=case_index),
+                     success=randomizer.random() < 0.8,
+                     exception_type=randomizer.choice(
+                         TestOutcome.RESULT_PRIORITY.keys()))
+            for case_index in xrange(cases)]
+
+        GeneralData.bulk_create_tree([[(case_data, None)
+                                       for case_data in cases_datas]])
+
+        run_data.main_test_id = cases_datas[0].pk
+        run_data.save()
+
+
+def create_history(runs, cases, run_names, seed):
+    """Create a synthetic history of runs in the DB.
+
+    Args:
+        runs (number): number of runs to create.
+        cases (number): number of cases in each run.
+        run_names (number): number of distinct run names.
+        seed (number): seed of the random outcomes.
+    """
+    randomizer = random.Random(seed)
+    start_time = datetime.now() - timedelta(days=runs)
+    for run_index in xrange(runs):
+        create_run("run_%d" % (run_index % run_names),
+                   start_time + timedelta(days=run_index), cases, randomizer)
+
+
+def set_history_indexes(enabled):
+    """Add or drop the results history indexes of migration 0004.
+
+    The tables are altered using the latest models, so the columns added by
+    the later migrations are kept.
+
+    Args:
+        enabled (bool): whether to add the indexes or to drop them.
+    """
+    from rotest.core import models
+
+    with connection.schema_editor() as editor:
+        for model_name, field_name in INDEXED_FIELDS:
+            model = getattr(models, model_name)
+            field = model._meta.get_field(field_name)
+            unindexed_field = field.clone()
+            unindexed_field.db_index = False
+            unindexed_field.set_attributes_from_name(field.name)
+            if enabled:
+                editor.alter_field(model, unindexed_field, field)
+
+            else:
+                editor.alter_field(model, field, unindexed_field)
+
+        index_together = models.GeneralData._meta.index_together
+        editor.alter_index_together(models.GeneralData,
+                                    () if enabled else index_together,
+                                    index_together if enabled else ())
+
+
+def measure(query, repeats):
+    """Return the average latency of the query, in milliseconds.
+
+    Args:
+        query (function): function that runs the query.
+        repeats (number): number of times to run the query.
+
+    Returns:
+        number. the average latency in milliseconds.
+    """
+    start_time = time.time()
+    for _ in xrange(repeats):
+        query()
+
+    return (time.time() - start_time) * 1000.0 / repeats
+
+
+def measure_queries(cases, repeats):
+    """Measure the latency of the results history queries.
+
+    Args:
+        cases (number): number of cases in each run.
+        repeats (number): number of times to run each query.
+
+    Returns:
+        list. tuples of (query description, average latency in ms).
+    """
+    from rotest.core.models import RunData, CaseData
+
+    run_data = RunData.objects.order_by("pk").last()
+    case_name = "Case%d.test_method" % (cases / 2)
+    cases_names = ["Case%d.test_method" % case_index
+                   for case_index in xrange(cases)]
+
+    def last_run_of_run_name():
+        """The Excel generator's lookup of the last run of a run name."""
+        return RunData.objects.filter(
+            run_name=run_data.run_name,
+            main_test__isnull=False).order_by("main_test__start_time").last()
+
+    return [
+        ("should_skip (by name and run name)",
+         measure(lambda: CaseData.should_skip(case_name, run_data), repeats)),
+        ("should_skip (by name)",
+         measure(lambda: CaseData.should_skip(case_name), repeats)),
+        ("get_delta_manifest (by run name)",
+         measure(lambda: CaseData.get_delta_manifest(cases_names, run_data),
+                 1)),
+        ("last run of a run name",
+         measure(last_run_of_run_name, repeats))]
+
+
+def main():
+    """Build the synthetic history and report the queries latencies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100,
+                        help="number of runs in the history")
+    parser.add_argument("--cases", type=int, default=200,
+                        help="number of cases in each run")
+    parser.add_argument("--run-names", type=int, default=10,
+                        help="number of distinct run names")
+    parser.add_argument("--repeats", type=int, default=20,
+                        help="number of times to run each query")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the random outcomes")
+    options = parser.parse_args()
+
+    # The settings are loaded lazily, on their first access
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE",
+                          "rotest.common.django_utils.settings")
+
+    db_dir = tempfile.mkdtemp()
+    settings.DATABASES["default"]["NAME"] = os.path.join(db_dir, "history.db")
+    django.setup()
+
+    try:
+        call_command("migrate", verbosity=0)
+        set_history_indexes(enabled=False)
+        print "Creating %d runs of %d cases..." % (options.runs,
+                                                   options.cases)
+        create_history(options.runs, options.cases, options.run_names,
+                       options.seed)
+
+        before = measure_queries(options.cases, options.repeats)
+
+        print "Adding the results history indexes..."
+        set_history_indexes(enabled=True)
+        after = measure_queries(options.cases, options.repeats)
+
+        print
+        print "%-40s %12s %12s" % ("Query", "Before (ms)", "After (ms)")
+        for (description, before_ms), (_, after_ms) in zip(before, after):
+            print "%-40s %12.2f %12.2f" % (description, before_ms, after_ms)
+
+    finally:
+        shutil.rmtree(db_dir)
+
+
+if __name__ == "__main__":
+    main()
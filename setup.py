@@ -5,21 +5,28 @@ __version__ = "4.2.0"
 
 result_handlers = [
     "db = rotest.core.result.handlers.db_handler:DBHandler",
+    "batchdb = rotest.core.result.handlers.db_handler:BatchDBHandler",
     "xml = rotest.core.result.handlers.xml_handler:XMLHandler",
     "excel = rotest.core.result.handlers.excel_handler:ExcelHandler",
+    "xlsx = rotest.core.result.handlers.xlsx_handler:XlsxHandler",
     "dots = rotest.core.result.handlers.stream.dots_handler:DotsHandler",
     "tree = rotest.core.result.handlers.stream.tree_handler:TreeHandler",
     "remote = rotest.core.result.handlers.remote_db_handler:RemoteDBHandler",
     "loginfo = rotest.core.result.handlers.stream.log_handler:LogInfoHandler",
     "artifact = rotest.core.result.handlers.artifact_handler:ArtifactHandler",
+    "artifact_store = "
+    "rotest.core.result.handlers.artifact_handler:ArtifactStoreHandler",
     "logdebug = "
     "rotest.core.result.handlers.stream.log_handler:LogDebugHandler",
     "pretty = "
     "rotest.core.result.handlers.stream.log_handler:PrettyHandler",
     "signature = "
     "rotest.core.result.handlers.signature_handler:SignatureHandler",
+    "xlsx_signature = "
+    "rotest.core.result.handlers.xlsx_handler:XlsxSignatureHandler",
     "full = "
     "rotest.core.result.handlers.stream.stream_handler:EventStreamHandler",
+    "profile = rotest.core.result.handlers.profile_handler:ProfileHandler",
 ]
 
 requirements = [
@@ -31,6 +38,7 @@ requirements = [
     'docopt',
     'lxml<4.0.0',
     'xlwt',
+    'xlsxwriter',
     'attrdict',
     'pyyaml',
     'twisted',
@@ -105,6 +105,17 @@ class TestControlOperationParamsModel(AbstractAPIModel):
     ]
 
 
+class SessionParamsModel(AbstractAPIModel):
+    """Data structure of session-wide query operations.
+
+    Args:
+        token (str): the session token of the current test run.
+    """
+    PROPERTIES = [
+        StringField(name="token", required=True, location="query")
+    ]
+
+
 class UpdateResourcesParamsModel(AbstractAPIModel):
     """Update the given resources test data.
 
@@ -139,6 +150,45 @@ class AddTestResultParamsModel(AbstractAPIModel):
     ]
 
 
+class TestEventModel(AbstractAPIModel):
+    """Describes an event of a test.
+
+    Args:
+        event (str): name of the event (e.g. "start_test", "add_result").
+        test_id (number): the identifier of the test.
+        time (number): time of the event, in seconds since the epoch.
+        result_code (number): the result code, for result events.
+        info (str): additional info of the result, for result events.
+        descriptors (list): list of ResourceDescriptorModel, for resources
+            update events.
+        phase_times (str): JSON of the durations of the test's phases, for
+            stop events.
+    """
+    TITLE = "TestEvent"
+    PROPERTIES = [
+        StringField(name="event", required=True),
+        NumberField(name="test_id", required=True),
+        NumberField(name="time"),
+        NumberField(name="result_code"),
+        StringField(name="info"),
+        ArrayField(name="descriptors", items_type=ResourceDescriptorModel),
+        StringField(name="phase_times")
+    ]
+
+
+class AddTestEventsParamsModel(AbstractAPIModel):
+    """Apply a batch of tests events.
+
+    Args:
+        token (str): the session token of the current test run.
+        events (list): list of TestEventModel, in the order to apply them.
+    """
+    PROPERTIES = [
+        StringField(name="token", required=True),
+        ArrayField(name="events", items_type=TestEventModel, required=True)
+    ]
+
+
 class TestModel(AbstractAPIModel):
     """Test model structure.
 
@@ -187,12 +237,17 @@ class UpdateRunDataParamsModel(AbstractAPIModel):
 class StartTestRunParamsModel(AbstractAPIModel):
     """Start a new run session.
 
+    Either 'tests' or 'compressed_tests' should be given.
+
     Args:
         tests (TestModel): the main test to build the run suite from.
+        compressed_tests (str): the main test's tree, compressed using
+            :func:`rotest.management.common.utils.compress_tests_tree`.
         run_data (RunDataModel): the run data details of the current run.
     """
     PROPERTIES = [
         StringField(name="token", required=True),
-        ModelField(name="tests", model=TestModel, required=True),
+        ModelField(name="tests", model=TestModel),
+        StringField(name="compressed_tests"),
         ModelField(name="run_data", model=RunDataModel, required=True)
     ]
@@ -1,6 +1,7 @@
 """Responses models of the view requests."""
 from swaggapi.api.builder.common.response import AbstractResponse
 from swaggapi.api.builder.common.fields import (StringField,
+                                                NumberField,
                                                 ModelField,
                                                 ArrayField, BoolField)
 
@@ -43,3 +44,12 @@ class ShouldSkipResponse(AbstractResponse):
         BoolField(name="should_skip", required=True),
         StringField(name="reason", required=True)
     ]
+
+
+class DeltaManifestResponse(AbstractResponse):
+    """Returns the identifiers of the tests that passed in their last run."""
+    PROPERTIES = [
+        ArrayField(name="tests_to_skip", items_type=NumberField("test_id"),
+                   required=True),
+        StringField(name="reason", required=True)
+    ]
@@ -4,6 +4,8 @@ from .should_skip import ShouldSkip
 from .start_test_run import StartTestRun
 from .stop_composite import StopComposite
 from .add_test_result import AddTestResult
+from .add_test_events import AddTestEvents
 from .update_run_data import UpdateRunData
 from .start_composite import StartComposite
 from .update_resources import UpdateResources
+from .get_delta_manifest import GetDeltaManifest
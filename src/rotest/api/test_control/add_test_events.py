@@ -0,0 +1,116 @@
+# pylint: disable=unused-argument, no-self-use
+import httplib
+from datetime import datetime
+
+from django.db import transaction
+from swaggapi.api.builder.server.response import Response
+from swaggapi.api.builder.server.exceptions import BadRequest
+from swaggapi.api.builder.server.request import DjangoRequestView
+
+from rotest.api.common.models import AddTestEventsParamsModel
+from rotest.api.test_control.middleware import session_middleware
+from rotest.management.common.resource_descriptor import ResourceDescriptor
+from rotest.api.common.responses import SuccessResponse, FailureResponseModel
+
+
+START_TEST = "start_test"
+STOP_TEST = "stop_test"
+START_COMPOSITE = "start_composite"
+STOP_COMPOSITE = "stop_composite"
+ADD_RESULT = "add_result"
+UPDATE_RESOURCES = "update_resources"
+
+
+def start_test(test_data, event):
+    """Update the test data to 'in progress' state and set the start time."""
+    test_data.start()
+    if event.get("time") is not None:
+        test_data.start_time = datetime.fromtimestamp(event.time)
+
+
+def stop_test(test_data, event):
+    """Update the test data to 'finished' state and set the end time."""
+    test_data.end()
+    if event.get("time") is not None:
+        test_data.end_time = datetime.fromtimestamp(event.time)
+
+    if event.get("phase_times") is not None:
+        test_data.phase_times = event.phase_times
+
+
+def stop_composite(test_data, event):
+    """Finish the composite test data, according to its sub tests."""
+    test_data.success = all(sub_test.success for sub_test in test_data)
+    stop_test(test_data, event)
+
+
+def add_result(test_data, event):
+    """Add a result to the test data."""
+    test_data.update_result(event.result_code, event.get("info"))
+
+
+def update_resources(test_data, event):
+    """Update the resources list of the test data."""
+    test_data.resources.clear()
+
+    for resource_descriptor in event.get("descriptors", ()):
+        resource_dict = ResourceDescriptor.decode(resource_descriptor)
+        test_data.resources.add(resource_dict.type.objects.get(
+            **resource_dict.properties))
+
+
+EVENT_HANDLERS = {START_TEST: start_test,
+                  STOP_TEST: stop_test,
+                  START_COMPOSITE: start_test,
+                  STOP_COMPOSITE: stop_composite,
+                  ADD_RESULT: add_result,
+                  UPDATE_RESOURCES: update_resources}
+
+
+class AddTestEvents(DjangoRequestView):
+    """Apply a batch of tests events.
+
+    The events are applied in the given order, in a single transaction.
+
+    Args:
+        token (str): token of the session.
+        events (list): the events to apply, each contains the event's name,
+            the identifier of the test and the event's parameters.
+    """
+    URI = "tests/add_test_events"
+    DEFAULT_MODEL = AddTestEventsParamsModel
+    DEFAULT_RESPONSES = {
+        httplib.NO_CONTENT: SuccessResponse,
+        httplib.BAD_REQUEST: FailureResponseModel
+    }
+    TAGS = {
+        "post": ["Tests"]
+    }
+
+    @session_middleware
+    def post(self, request, sessions, *args, **kwargs):
+        """Apply a batch of tests events.
+
+        Args:
+            token (str): token of the session.
+            events (list): the events to apply.
+        """
+        try:
+            session_data = sessions[request.model.token]
+
+        except KeyError:
+            raise BadRequest("Invalid token provided!")
+
+        with transaction.atomic():
+            for event in request.model.events:
+                try:
+                    test_data = session_data.all_tests[event.test_id]
+                    event_handler = EVENT_HANDLERS[event.event]
+
+                except KeyError:
+                    raise BadRequest("Invalid test_id/event provided!")
+
+                event_handler(test_data, event)
+                test_data.save()
+
+        return Response({}, status=httplib.NO_CONTENT)
@@ -0,0 +1,63 @@
+# pylint: disable=unused-argument, no-self-use
+import httplib
+
+from swaggapi.api.builder.server.response import Response
+from swaggapi.api.builder.server.exceptions import BadRequest
+from swaggapi.api.builder.server.request import DjangoRequestView
+
+from rotest.core.models.case_data import CaseData
+from rotest.api.common.models import SessionParamsModel
+from rotest.api.test_control.should_skip import SKIP_DELTA_MESSAGE
+from rotest.api.test_control.middleware import session_middleware
+from rotest.api.common.responses import (DeltaManifestResponse,
+                                         FailureResponseModel)
+
+
+class GetDeltaManifest(DjangoRequestView):
+    """Get the tests of the run that passed in their last run.
+
+    Answers the 'should skip' query for all the tests of the run at once,
+    according to the results DB.
+
+    Args:
+        token (str): token of the session.
+    """
+    URI = "tests/get_delta_manifest"
+    DEFAULT_MODEL = SessionParamsModel
+    DEFAULT_RESPONSES = {
+        httplib.OK: DeltaManifestResponse,
+        httplib.BAD_REQUEST: FailureResponseModel
+    }
+    TAGS = {
+        "get": ["Tests"]
+    }
+
+    @session_middleware
+    def get(self, request, sessions, *args, **kwargs):
+        """Get the tests of the run that passed in their last run.
+
+        Args:
+            token (str): token of the session.
+        """
+        try:
+            session_data = sessions[request.model.token]
+
+        except KeyError:
+            raise BadRequest("Invalid token provided!")
+
+        if session_data.all_tests is None:
+            raise BadRequest("The test run wasn't started!")
+
+        manifest = CaseData.get_delta_manifest(
+            [test_data.name
+             for test_data in session_data.all_tests.itervalues()],
+            session_data.run_data)
+        tests_to_skip = [test_id
+                         for test_id, test_data in
+                         session_data.all_tests.iteritems()
+                         if manifest.get(test_data.name, False)]
+
+        return Response({
+            "tests_to_skip": tests_to_skip,
+            "reason": SKIP_DELTA_MESSAGE
+        }, status=httplib.OK)
@@ -1,12 +1,17 @@
 # pylint: disable=unused-argument, no-self-use
+import json
+import zlib
 import httplib
+from collections import defaultdict
 
+from django.db import transaction
 from swaggapi.api.builder.server.response import Response
 from swaggapi.api.builder.server.exceptions import BadRequest
 from swaggapi.api.builder.server.request import DjangoRequestView
 
-from rotest.core.models import RunData
+from rotest.core.models import RunData, GeneralData
 from rotest.management.common.json_parser import JSONParser
+from rotest.management.common.utils import decompress_tests_tree
 from rotest.api.common.models import StartTestRunParamsModel
 from rotest.api.test_control.middleware import session_middleware
 from rotest.api.common.responses import (SuccessResponse,
@@ -23,7 +28,8 @@ class StartTestRun(DjangoRequestView):
     """Initialize the tests run data.
 
     Args:
-        tests_tree (dict): contains the hierarchy of the tests in the run.
+        tests_tree (dict): contains the hierarchy of the tests in the run,
+            can be given compressed (see 'compressed_tests').
         run_data (dict): contains additional data about the run.
     """
     URI = "tests/start_test_run"
@@ -36,36 +42,61 @@ class StartTestRun(DjangoRequestView):
         "post": ["Tests"]
     }
 
-    def _create_test_data(self, test_dict, run_data, all_tests):
-        """Recursively create the test's datas and add them to 'all_tests'.
+    @staticmethod
+    def _get_tests_levels(tests_tree, run_data):
+        """Create the datas of the tests in the tree, without saving them.
 
         Args:
             tests_tree (dict): contains the hierarchy of the tests in the run.
+            run_data (RunData): run data of the tests.
 
         Returns:
-            GeneralData. the created test data object.
+            tuple. the levels of the tree, from its root, each a list of
+                (test data, parent data) tuples, and the test datas by the
+                identifier of their test.
         """
         parser = JSONParser()
-        data_type = parser.decode(test_dict[TEST_CLASS_CODE_KEY])
-        try:
-            test_data = data_type(name=test_dict[TEST_NAME_KEY])
-
-        except TypeError:
-            raise BadRequest("Invalid type provided: {}".format(data_type))
-
-        test_data.run_data = run_data
-        test_data.save()
-        all_tests[test_dict[TEST_ID_KEY]] = test_data
+        data_types = {}
+        levels = defaultdict(list)
+        all_tests = {}
+        pending = [(tests_tree, None, 0)]
+        while len(pending) > 0:
+            test_dict, parent_data, depth = pending.pop()
+            class_key = json.dumps(test_dict[TEST_CLASS_CODE_KEY],
+                                   sort_keys=True)
+            if class_key not in data_types:
+                data_types[class_key] = parser.decode(
+                    test_dict[TEST_CLASS_CODE_KEY])
+
+            data_type = data_types[class_key]
+            try:
+                test_data = data_type(name=test_dict[TEST_NAME_KEY],
+                                      run_data=run_data)
+
+            except TypeError:
+                raise BadRequest("Invalid type provided: {}".format(data_type))
+
+            levels[depth].append((test_data, parent_data))
+            all_tests[test_dict[TEST_ID_KEY]] = test_data
+            pending.extend((sub_test_dict, test_data, depth + 1)
+                           for sub_test_dict in
+                           reversed(test_dict.get(TEST_SUBTESTS_KEY, ())))
+
+        return [levels[level] for level in sorted(levels)], all_tests
+
+    def _create_tests_datas(self, tests_tree, run_data):
+        """Create the datas of all the tests in the tree using bulk inserts.
 
-        if TEST_SUBTESTS_KEY in test_dict:
-            for sub_test_dict in test_dict[TEST_SUBTESTS_KEY]:
-                sub_test = self._create_test_data(sub_test_dict,
-                                                  run_data,
-                                                  all_tests)
-                test_data.add_sub_test_data(sub_test)
-                sub_test.save()
+        Args:
+            tests_tree (dict): contains the hierarchy of the tests in the run.
+            run_data (RunData): run data of the tests.
 
-        return test_data
+        Returns:
+            dict. the created test datas, by the identifier of their test.
+        """
+        levels, all_tests = self._get_tests_levels(tests_tree, run_data)
+        GeneralData.bulk_create_tree(levels)
+        return all_tests
 
     @session_middleware
     def post(self, request, sessions, *args, **kwargs):
@@ -81,14 +112,29 @@ class StartTestRun(DjangoRequestView):
         except TypeError:
             raise BadRequest("Invalid run data provided!")
 
-        all_tests = {}
-        tests_tree = request.model.tests
+        request_body = request.model.body
+        if "compressed_tests" in request_body:
+            try:
+                tests_tree = decompress_tests_tree(
+                    request_body["compressed_tests"])
+
+            except (TypeError, ValueError, zlib.error):
+                raise BadRequest("Invalid compressed tests tree provided!")
+
+        elif "tests" in request_body:
+            tests_tree = request_body["tests"]
+
+        else:
+            raise BadRequest("No tests tree provided!")
+
         try:
-            main_test = self._create_test_data(tests_tree, run_data, all_tests)
+            with transaction.atomic():
+                all_tests = self._create_tests_datas(tests_tree, run_data)
 
         except KeyError:
             raise BadRequest("Invalid tests tree provided!")
 
+        main_test = all_tests[tests_tree[TEST_ID_KEY]]
         run_data.main_test = main_test
         run_data.user_name = request.get_host()
         run_data.save()
@@ -18,7 +18,9 @@ from rotest.api.test_control import (StartTestRun,
                                      StopComposite,
                                      StartComposite,
                                      ShouldSkip,
-                                     AddTestResult, UpdateResources)
+                                     AddTestResult, UpdateResources,
+                                     AddTestEvents,
+                                     GetDeltaManifest)
 
 requests = [
     RequestToken,
@@ -39,7 +41,9 @@ requests = [
     StartComposite,
     ShouldSkip,
     AddTestResult,
-    UpdateResources
+    UpdateResources,
+    AddTestEvents,
+    GetDeltaManifest
 ]
 
 info = Info(title="Rotest OpenAPI",
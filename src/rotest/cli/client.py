@@ -18,6 +18,18 @@ Options:
     -p <processes>, --processes <processes>
             Use multiprocess test runner - specify number of worker
             processes to be created.
+    --min-processes <processes>
+            Autoscale the multiprocess test runner's workers between the
+            given minimal number and the number given by '--processes'.
+    --max-jobs-per-worker <jobs>
+            Replace each worker process with a new one after it has run
+            the given number of tests.
+    --max-worker-memory <megabytes>
+            Replace worker processes whose RSS memory exceeds the given
+            size (in megabytes) with new ones.
+    --threads <threads>
+            Use threaded test runner - specify number of threads to run the
+            tests in.
     -o <outputs>, --outputs <outputs>
             Output handlers separated by comma.
     -f <query>, --filter <query>
@@ -36,6 +48,11 @@ Options:
     -r <query>, --resources <query>
             Specify resources to request by attributes,
             e.g. '-r res1.group=QA,res2.comment=CI'.
+    --profile [<mode>]
+            Profile each test, using 'cprofile' (default) or 'sampling',
+            and print the hot functions of the slowest tests.
+    --profile-slowest <number>
+            Number of slowest tests whose hot functions are printed.
 """
 # pylint: disable=unused-argument
 # pylint: disable=too-many-arguments,too-many-locals,redefined-builtin
@@ -52,6 +69,7 @@ from attrdict import AttrDict
 from rotest.core import TestSuite
 from rotest.common import core_log
 from rotest.core.filter import match_tags
+from rotest.core.utils.profiler import CPROFILE, PROFILE_MODES
 from rotest.core.utils.common import print_test_hierarchy
 from rotest.core.result.result import get_result_handlers
 from rotest.cli.discover import discover_tests_under_paths
@@ -99,15 +117,23 @@ def run_tests(test, config):
     resource_identifiers = parse_resource_identifiers(config.resources)
     update_resource_requests(test, resource_identifiers)
 
+    outputs = config.outputs
+    if config.get("profile") is not None and "profile" not in outputs:
+        outputs = list(outputs) + ["profile"]
+
     runs_data = rotest_runner(config=config,
                               test_class=test,
-                              outputs=config.outputs,
+                              outputs=outputs,
                               run_name=config.run_name,
                               enable_debug=config.debug,
                               fail_fast=config.fail_fast,
                               skip_init=config.skip_init,
                               save_state=config.save_state,
                               processes_number=config.processes,
+                              max_jobs_per_worker=config.max_jobs_per_worker,
+                              max_worker_memory=config.max_worker_memory,
+                              min_processes=config.min_processes,
+                              threads_number=config.threads,
                               delta_iterations=config.delta_iterations)
 
     sys.exit(runs_data[-1].get_return_value())
@@ -153,6 +179,19 @@ def create_client_options_parser():
     parser.add_argument("--processes", "-p", metavar="number", type=int,
                         help="Use multiprocess test runner - specify number "
                              "of worker processes to be created")
+    parser.add_argument("--min-processes", metavar="number", type=int,
+                        help="Autoscale the worker processes between the "
+                             "given number and the '--processes' number")
+    parser.add_argument("--max-jobs-per-worker", metavar="jobs", type=int,
+                        help="Replace each worker process with a new one "
+                             "after it has run the given number of tests")
+    parser.add_argument("--max-worker-memory", metavar="megabytes",
+                        type=int,
+                        help="Replace worker processes whose RSS memory "
+                             "exceeds the given size (in megabytes)")
+    parser.add_argument("--threads", metavar="number", type=int,
+                        help="Use threaded test runner - specify number of "
+                             "threads to run the tests in")
     parser.add_argument("--outputs", "-o",
                         type=parse_outputs_option,
                         help="Output handlers separated by comma. Options: {}"
@@ -175,6 +214,14 @@ def create_client_options_parser():
     parser.add_argument("--resources", "-r", metavar="query",
                         help="Specify resources to request be attributes, "
                              "e.g. '-r res1.group=QA,res2.comment=CI'")
+    parser.add_argument("--profile", nargs="?", const=CPROFILE,
+                        choices=PROFILE_MODES, metavar="mode",
+                        help="Profile each test, using 'cprofile' (default) "
+                             "or 'sampling', and print the hot functions of "
+                             "the slowest tests")
+    parser.add_argument("--profile-slowest", metavar="number", type=int,
+                        help="Number of slowest tests whose hot functions "
+                             "are printed")
 
     for entry_point in \
             pkg_resources.iter_entry_points("rotest.cli_client_parsers"):
@@ -4,6 +4,8 @@ import sys
 
 from rotest.cli.client import main as run
 from rotest.management.utils.shell import main as shell
+from rotest.core.utils.artifact_store import main as export_artifact
+from rotest.core.utils.signature_classifier import main as classify
 from rotest.common.config import DJANGO_MANAGER_PORT, search_config_file
 
 
@@ -33,5 +35,11 @@ def main():
     elif len(sys.argv) > 1 and sys.argv[1] == "server":
         start_server()
 
+    elif len(sys.argv) > 1 and sys.argv[1] == "classify":
+        classify()
+
+    elif len(sys.argv) > 1 and sys.argv[1] == "export":
+        export_artifact()
+
     else:
         run()
@@ -245,6 +245,26 @@ CONFIGURATION_SCHEMA = {
         environment_variables=["ARTIFACTS_DIR"],
         config_file_options=["artifacts_dir"],
         default_value=os.path.expanduser("~/.rotest/artifacts")),
+    "report_save_interval": Option(
+        environment_variables=["ROTEST_REPORT_SAVE_INTERVAL"],
+        config_file_options=["report_save_interval"],
+        default_value=5),
+    "async_logging": Option(
+        environment_variables=["ROTEST_ASYNC_LOGGING"],
+        config_file_options=["async_logging"],
+        default_value=False),
+    "async_log_queue_size": Option(
+        environment_variables=["ROTEST_ASYNC_LOG_QUEUE_SIZE"],
+        config_file_options=["async_log_queue_size"],
+        default_value=10000),
+    "async_log_overflow": Option(
+        environment_variables=["ROTEST_ASYNC_LOG_OVERFLOW"],
+        config_file_options=["async_log_overflow"],
+        default_value="block"),
+    "debug_log_buffer_size": Option(
+        environment_variables=["ROTEST_DEBUG_LOG_BUFFER_SIZE"],
+        config_file_options=["debug_log_buffer_size"],
+        default_value=0),
 }
 
 config_path = search_config_file()
@@ -267,6 +287,12 @@ API_BASE_URL = CONFIGURATION.api_base_url
 RESOURCE_REQUEST_TIMEOUT = int(CONFIGURATION.resource_request_timeout)
 DJANGO_SETTINGS_MODULE = CONFIGURATION.django_settings
 ARTIFACTS_DIR = os.path.expanduser(CONFIGURATION.artifacts_dir)
+REPORT_SAVE_INTERVAL = float(CONFIGURATION.report_save_interval)
+ASYNC_LOGGING = \
+    str(CONFIGURATION.async_logging).lower() in ("1", "true", "yes", "on")
+ASYNC_LOG_QUEUE_SIZE = int(CONFIGURATION.async_log_queue_size)
+ASYNC_LOG_OVERFLOW = CONFIGURATION.async_log_overflow
+DEBUG_LOG_BUFFER_SIZE = int(CONFIGURATION.debug_log_buffer_size)
 DISCOVERER_BLACKLIST = CONFIGURATION.discoverer_blacklist
 SHELL_APPS = CONFIGURATION.shell_apps
 SHELL_STARTUP_COMMANDS = CONFIGURATION.shell_startup_commands
@@ -4,14 +4,19 @@ core_logger inherits from the system logger,
 test logger inherits from core_logger
 and resource_logger inherits from test_logger.
 """
-# pylint: disable=too-many-arguments
+# pylint: disable=too-many-arguments,global-statement
 import os
+import Queue
+import threading
 import logging
 from logging.handlers import RotatingFileHandler
+from collections import deque
 
 from termcolor import colored
 
-from rotest.common.config import ROTEST_WORK_DIR
+from rotest.common.config import (ROTEST_WORK_DIR, ASYNC_LOGGING,
+                                  ASYNC_LOG_QUEUE_SIZE, ASYNC_LOG_OVERFLOW,
+                                  DEBUG_LOG_BUFFER_SIZE)
 from rotest.common.constants import WHITE, BOLD, CYAN, YELLOW, RED, MAGENTA
 
 
@@ -72,10 +77,251 @@ class LoggerWrapper(logging.Logger):
 
 logging.setLoggerClass(LoggerWrapper)
 
+EXCEPTION_FORMATTER = logging.Formatter()
+
+
+def render_record(record):
+    """Render the message and traceback of a record which is written later.
+
+    The record's arguments and exception may change until it's written, so
+    they are replaced by the rendered message and traceback.
+
+    Args:
+        record (LogRecord): instance representing the event being logged.
+    """
+    record.msg = record.getMessage()
+    record.args = None
+    if record.exc_info:
+        record.exc_text = EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.exc_info = None
+
+
+class LogListener(threading.Thread):
+    """Thread which writes queued log records using their target handlers.
+
+    Attributes:
+        queue (Queue.Queue): bounded queue of tuples of a target handler and a
+            record to handle, or of None and an event to set (flush marker).
+    """
+    def __init__(self, queue_size=ASYNC_LOG_QUEUE_SIZE):
+        """Initialize the listener.
+
+        Args:
+            queue_size (number): maximal amount of queued records.
+        """
+        super(LogListener, self).__init__(name="LogListener")
+        self.daemon = True
+        self.queue = Queue.Queue(maxsize=queue_size)
+
+    def run(self):
+        """Handle the queued records by order."""
+        while True:
+            target, item = self.queue.get()
+            if target is None:
+                item.set()
+
+            else:
+                target.handle(item)
+
+    def flush(self):
+        """Wait until all the records queued so far are handled."""
+        flushed = threading.Event()
+        self.queue.put((None, flushed))
+        flushed.wait()
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def get_log_listener():
+    """Return the log listener of this process, starting it if needed.
+
+    Returns:
+        LogListener. the running log listener.
+    """
+    global _listener, _listener_pid
+    with _listener_lock:
+        # Forked processes don't inherit the listener's thread
+        if _listener is None or _listener_pid != os.getpid():
+            _listener = LogListener()
+            _listener_pid = os.getpid()
+            _listener.start()
+
+        return _listener
+
+
+class AsyncHandler(logging.Handler):
+    """Handler which queues records, to be written by the log listener.
+
+    Formatting the records and writing them is left to the wrapped handler,
+    in the listener's thread. Only the message and the exception's traceback
+    are rendered when the record is queued, since their arguments may change
+    until the record is written.
+
+    The listener is looked up on every use rather than kept, since a forked
+    process (e.g. a multiprocess worker) has to start a listener of its own.
+
+    Attributes:
+        target (logging.Handler): the handler which writes the records.
+        overflow (str): what to do with records when the queue is full,
+            'block' to wait for a free place or 'drop' to discard them.
+        dropped (number): amount of records discarded since the last flush.
+    """
+    BLOCK = "block"
+    DROP = "drop"
+
+    def __init__(self, target, overflow=ASYNC_LOG_OVERFLOW):
+        """Initialize the handler.
+
+        Args:
+            target (logging.Handler): the handler which writes the records.
+            overflow (str): 'block' to wait for a free place in the queue when
+                it's full, or 'drop' to discard the record.
+        """
+        if overflow not in (self.BLOCK, self.DROP):
+            raise ValueError("Unknown log overflow policy %r, should be %r "
+                             "or %r" % (overflow, self.BLOCK, self.DROP))
+
+        super(AsyncHandler, self).__init__(target.level)
+        self.target = target
+        self.overflow = overflow
+        self.dropped = 0
+
+    def emit(self, record):
+        """Queue the record, to be written by the listener.
+
+        Args:
+            record (LogRecord): instance representing the event being logged.
+        """
+        try:
+            render_record(record)
+            get_log_listener().queue.put((self.target, record),
+                                         block=self.overflow == self.BLOCK)
+
+        except Queue.Full:
+            self.dropped += 1
+
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def flush(self):
+        """Wait until the queued records are written, and flush the target."""
+        get_log_listener().flush()
+        if self.dropped > 0:
+            dropped, self.dropped = self.dropped, 0
+            self.target.handle(logging.makeLogRecord({
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": "%d log records were dropped since the log queue "
+                       "was full" % dropped}))
+
+        self.target.flush()
+
+    def close(self):
+        """Write the queued records, and close the target."""
+        self.flush()
+        self.target.close()
+        super(AsyncHandler, self).close()
+
+
+class DebugBufferHandler(logging.Handler):
+    """Handler which holds back debug records until they're asked for.
+
+    Records below INFO level are kept in a bounded buffer, which keeps only
+    the latest ones, and are written only when :meth:`write_buffer` is called
+    (e.g. when the test fails). Other records are written immediately.
+
+    Once the buffer was written, the handler passes all the following records
+    through to the target, so the debug records of the rest of the test (e.g.
+    of its tearDown) are written too.
+
+    Attributes:
+        target (logging.Handler): the handler which writes the records.
+        records (collections.deque): the held back debug records.
+        discarded (number): amount of debug records pushed out of the buffer.
+        passthrough (bool): whether the buffer was written, and the records
+            are no longer held back.
+    """
+    BUFFERED_LEVEL = logging.INFO
+
+    def __init__(self, target, capacity=DEBUG_LOG_BUFFER_SIZE):
+        """Initialize the handler.
+
+        Args:
+            target (logging.Handler): the handler which writes the records.
+            capacity (number): maximal amount of held back debug records.
+        """
+        super(DebugBufferHandler, self).__init__(target.level)
+        self.target = target
+        self.records = deque(maxlen=capacity)
+        self.discarded = 0
+        self.passthrough = False
+
+    def emit(self, record):
+        """Hold back debug records, and write the other ones.
+
+        Args:
+            record (LogRecord): instance representing the event being logged.
+        """
+        if self.passthrough or record.levelno >= self.BUFFERED_LEVEL:
+            self.target.handle(record)
+            return
+
+        try:
+            render_record(record)
+            if len(self.records) == self.records.maxlen:
+                self.discarded += 1
+
+            self.records.append(record)
+
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def write_buffer(self):
+        """Write the held back debug records, and stop holding them back."""
+        self.passthrough = True
+        if len(self.records) == 0:
+            return
+
+        self.target.handle(logging.makeLogRecord({
+            "levelno": logging.INFO,
+            "levelname": logging.getLevelName(logging.INFO),
+            "msg": "Writing %d held back debug records (%d earlier ones "
+                   "were discarded)" % (len(self.records), self.discarded)}))
+
+        while len(self.records) > 0:
+            self.target.handle(self.records.popleft())
+
+        self.discarded = 0
+
+    def flush(self):
+        """Flush the target handler."""
+        self.target.flush()
+
+    def close(self):
+        """Discard the held back debug records, and close the target."""
+        self.records.clear()
+        self.target.close()
+        super(DebugBufferHandler, self).close()
+
+
+def write_debug_buffers(logger):
+    """Write the held back debug records of the logger's handlers.
+
+    Args:
+        logger (logging.Logger): logger to write the debug records of.
+    """
+    for handler in logger.handlers:
+        if isinstance(handler, DebugBufferHandler):
+            handler.write_buffer()
+
 
 def define_logger(log_name, log_dir, log_level=logging.DEBUG,
                   log_format=LOG_FORMAT, rotating=True,
-                  max_bytes=0, backup_count=0, is_colored=True):
+                  max_bytes=0, backup_count=0, is_colored=True,
+                  is_async=ASYNC_LOGGING, debug_buffer_size=0):
     """Define logger.
 
     Args:
@@ -89,6 +335,11 @@ def define_logger(log_name, log_dir, log_level=logging.DEBUG,
         max_bytes (int): max length for log file
         backup_count (int) : number of old log files to save
         is_colored (bool): define colored logger or not.
+        is_async (bool): whether to write the records in the log listener's
+            thread, instead of in the logging thread.
+        debug_buffer_size (number): amount of latest debug records to hold
+            back until :func:`write_debug_buffers` is called, 0 to write
+            debug records immediately.
 
     Returns:
         logging.Logger. logger
@@ -111,6 +362,13 @@ def define_logger(log_name, log_dir, log_level=logging.DEBUG,
     current_log_stream.setLevel(log_level)
     formatter = colored_to_formatters[is_colored](log_format)
     current_log_stream.setFormatter(formatter)
+    if is_async:
+        current_log_stream = AsyncHandler(current_log_stream)
+
+    if debug_buffer_size > 0:
+        current_log_stream = DebugBufferHandler(current_log_stream,
+                                                debug_buffer_size)
+
     logger.addHandler(current_log_stream)
 
     return logger
@@ -158,7 +416,9 @@ def get_test_logger(logger_basename, log_dir):
     """Define test_logger using define_logger method.
 
     This log will be written to work_dir, and will contain all necessary
-    information about current test.
+    information about current test. If a debug log buffer size is
+    configured, the test's debug records are held back, to be written only
+    if the test fails (see :func:`write_debug_buffers`).
 
     Args:
         logger_basename (str): This is the logger name
@@ -171,6 +431,59 @@ def get_test_logger(logger_basename, log_dir):
 
     logger = define_logger(log_name, log_dir, rotating=True,
                            max_bytes=CORE_LOG_MAX_BYTES,
-                           backup_count=CORE_LOG_BACKUP_COUNT)
+                           backup_count=CORE_LOG_BACKUP_COUNT,
+                           debug_buffer_size=DEBUG_LOG_BUFFER_SIZE)
 
     return logger
+
+
+def close_test_logger(logger):
+    """Close the handlers of a test logger, and forget the logger.
+
+    Closing the handlers releases their log files, and removing the logger
+    from the logging manager lets it be garbage collected, so running many
+    tests won't accumulate open files and loggers. Loggers of sub-tests which
+    are still alive are attached to the parent of the removed logger, as if
+    it was never defined.
+
+    Args:
+        logger (logging.Logger): the test logger to close.
+    """
+    for handler in logger.handlers[:]:
+        handler.close()
+        logger.removeHandler(handler)
+
+    # pylint: disable=protected-access
+    logging._acquireLock()
+    try:
+        logger_dict = logger.manager.loggerDict
+        if logger_dict.get(logger.name) is not logger:
+            return
+
+        # Placeholders of ancestors without loggers reference the logger too
+        name_parts = logger.name.split(".")
+        for index in xrange(1, len(name_parts)):
+            ancestor_name = ".".join(name_parts[:index])
+            ancestor = logger_dict.get(ancestor_name)
+            if isinstance(ancestor, logging.PlaceHolder):
+                ancestor.loggerMap.pop(logger, None)
+                if len(ancestor.loggerMap) == 0:
+                    del logger_dict[ancestor_name]
+
+        children = [child for child in logger_dict.itervalues()
+                    if isinstance(child, logging.Logger) and
+                    child.parent is logger]
+
+        if len(children) == 0:
+            del logger_dict[logger.name]
+            return
+
+        placeholder = logging.PlaceHolder(children[0])
+        for child in children:
+            placeholder.append(child)
+            child.parent = logger.parent
+
+        logger_dict[logger.name] = placeholder
+
+    finally:
+        logging._releaseLock()
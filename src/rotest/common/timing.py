@@ -0,0 +1,249 @@
+"""Measure the durations of the phases of tests.
+
+The phases of a test are measured with a monotonic clock, so they aren't
+affected by changes of the system's time. The phases are exclusive: the time
+of a phase measured during another phase (e.g. releasing resources while
+storing their states) is deducted from the outer phase.
+"""
+# pylint: disable=invalid-name,too-few-public-methods
+import sys
+import json
+import time
+import ctypes
+import ctypes.util
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+# Phases of the test
+LOCK = "lock"
+PREPARE = "prepare"
+SETUP = "setup"
+TEST = "test"
+TEARDOWN = "teardown"
+STORE_STATE = "store_state"
+RELEASE = "release"
+PHASES = (LOCK, PREPARE, SETUP, TEST, TEARDOWN, STORE_STATE, RELEASE)
+
+# Phases of each of the test's resources
+CONNECT = "connect"
+VALIDATE = "validate"
+INITIALIZE = "initialize"
+FINALIZE = "finalize"
+RESOURCE_PHASES = (CONNECT, VALIDATE, INITIALIZE, FINALIZE)
+
+# Values of CLOCK_MONOTONIC by platform
+MONOTONIC_CLOCK_IDS = {"linux": 1, "darwin": 6}
+
+
+class _TimeSpec(ctypes.Structure):
+    """The 'timespec' struct of clock_gettime."""
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+def _get_monotonic_clock():
+    """Return a function which returns the time of a monotonic clock.
+
+    Returns:
+        function. returns the clock's time in seconds, the system's time is
+            used if the platform has no supported monotonic clock.
+    """
+    platform = sys.platform.rstrip("0123456789")
+    if platform not in MONOTONIC_CLOCK_IDS:
+        return time.time
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        clock_gettime = libc.clock_gettime
+
+    except (OSError, AttributeError):
+        return time.time
+
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_TimeSpec)]
+    clock_id = MONOTONIC_CLOCK_IDS[platform]
+
+    def get_clock_time():
+        """Return the time of the monotonic clock, in seconds."""
+        time_spec = _TimeSpec()
+        if clock_gettime(clock_id, ctypes.byref(time_spec)) != 0:
+            return time.time()
+
+        return time_spec.tv_sec + time_spec.tv_nsec * 1e-9
+
+    return get_clock_time
+
+
+monotonic_time = _get_monotonic_clock()
+
+
+def get_phase_order(item):
+    """Return the sorting key of a phase, by the order of the test's phases.
+
+    Args:
+        item (tuple): the name of the phase and its duration.
+
+    Returns:
+        number. the index of the phase, unknown phases are last.
+    """
+    phase, _ = item
+    if phase in PHASES:
+        return PHASES.index(phase)
+
+    return len(PHASES)
+
+
+def format_durations(durations):
+    """Return a short description of phases' durations.
+
+    Args:
+        durations (dict): durations in seconds, by the phases' names.
+
+    Returns:
+        str. the phases and their durations, e.g. 'lock 1.20s, test 3.05s'.
+    """
+    return ", ".join("%s %.2fs" % (phase, duration)
+                     for phase, duration in durations.iteritems())
+
+
+class PhaseTimer(object):
+    """Accumulate the durations of the phases of a test and its resources.
+
+    Attributes:
+        phases (OrderedDict): durations of the test's phases in seconds, by
+            the phases' names, in the order of the phases in the test.
+        resources (OrderedDict): durations of the resources' phases, by the
+            resources' names (each value is a dict like 'phases').
+    """
+    def __init__(self):
+        self.phases = OrderedDict()
+        self.resources = OrderedDict()
+
+        self._starts = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add(self, phase, duration):
+        """Add time to a phase of the test.
+
+        Args:
+            phase (str): name of the phase.
+            duration (number): time to add, in seconds.
+        """
+        with self._lock:
+            if phase in self.phases:
+                self.phases[phase] += duration
+                return
+
+            # Keep the phases in the order they happen in the test
+            self.phases[phase] = duration
+            self.phases = OrderedDict(sorted(self.phases.iteritems(),
+                                             key=get_phase_order))
+
+    def add_resource(self, resource_name, phase, duration):
+        """Add time to a phase of a resource.
+
+        Args:
+            resource_name (str): name of the resource.
+            phase (str): name of the phase.
+            duration (number): time to add, in seconds.
+        """
+        with self._lock:
+            phases = self.resources.setdefault(resource_name, OrderedDict())
+            phases[phase] = phases.get(phase, 0) + duration
+
+    @contextmanager
+    def measure(self, phase):
+        """Measure the time of the code in the context as a phase of the test.
+
+        The time of phases measured within the context (in the same thread)
+        is deducted from the phase.
+
+        Args:
+            phase (str): name of the phase.
+        """
+        stack = self._local.__dict__.setdefault("nested_times", [])
+        stack.append(0)
+        start_time = monotonic_time()
+        try:
+            yield
+
+        finally:
+            duration = monotonic_time() - start_time
+            nested_time = stack.pop()
+            if len(stack) > 0:
+                stack[-1] += duration
+
+            self.add(phase, duration - nested_time)
+
+    @contextmanager
+    def measure_resource(self, resource_name, phase):
+        """Measure the time of the code in the context as a resource's phase.
+
+        Args:
+            resource_name (str): name of the resource.
+            phase (str): name of the phase.
+        """
+        start_time = monotonic_time()
+        try:
+            yield
+
+        finally:
+            self.add_resource(resource_name, phase,
+                              monotonic_time() - start_time)
+
+    def start(self, phase):
+        """Start measuring a phase which ends in another call.
+
+        Args:
+            phase (str): name of the phase.
+        """
+        self._starts[phase] = monotonic_time()
+
+    def stop(self, phase):
+        """Stop measuring a phase started using 'start'.
+
+        Args:
+            phase (str): name of the phase.
+        """
+        start_time = self._starts.pop(phase, None)
+        if start_time is not None:
+            self.add(phase, monotonic_time() - start_time)
+
+    def dumps(self):
+        """Return the measured durations, encoded as JSON.
+
+        Returns:
+            str. JSON of the test's and the resources' phases.
+        """
+        with self._lock:
+            return json.dumps({"phases": self.phases,
+                               "resources": self.resources})
+
+    def loads(self, phase_times):
+        """Replace the measured durations with the encoded ones.
+
+        Args:
+            phase_times (str): durations encoded using 'dumps'.
+        """
+        durations = load_phase_times(phase_times)
+        with self._lock:
+            self.phases = durations["phases"]
+            self.resources = durations["resources"]
+
+
+def load_phase_times(phase_times):
+    """Decode the durations of phases, encoded using 'PhaseTimer.dumps'.
+
+    Args:
+        phase_times (str): the encoded durations, may be None or empty.
+
+    Returns:
+        dict. the test's phases ('phases') and the resources' phases
+            ('resources'), ordered as measured.
+    """
+    durations = {}
+    if phase_times:
+        durations = json.loads(phase_times, object_pairs_hook=OrderedDict)
+
+    return {"phases": durations.get("phases", OrderedDict()),
+            "resources": durations.get("resources", OrderedDict())}
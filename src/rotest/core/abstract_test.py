@@ -6,16 +6,28 @@
 # pylint: disable=too-many-public-methods
 import os
 import sys
+import gzip
+import time
+import Queue
+import shutil
 import unittest
+import threading
 from bdb import BdbQuit
 from functools import wraps
 from itertools import count
+from multiprocessing.pool import ThreadPool
 
 from ipdbugger import debug
 from attrdict import AttrDict
 
+from rotest.common import core_log
 from rotest.core.models.case_data import TestOutcome
+from rotest.common.timing import (PhaseTimer, TEARDOWN, STORE_STATE,
+                                  RELEASE)
+from rotest.core.event_loop import (EventLoop, is_coroutine_method,
+                                    make_synchronous)
 from rotest.management.base_resource import BaseResource
+from rotest.core.utils.profiler import create_profiler, get_profile_mode
 from rotest.management.client.manager import ResourceRequest
 from rotest.management.client.manager import ClientResourceManager
 
@@ -42,9 +54,23 @@ class AbstractTest(unittest.TestCase):
             upon any exception in a test statement.
         skip_init (bool): True to skip resources initialize and validation.
         resource_manager (ClientResourceManager): client resource manager.
+        event_loop (rotest.core.event_loop.EventLoop): the loop to run the
+            coroutine methods on, set by the test's runner.
         TAGS (list): list of tags by which the test may be filtered.
         IS_COMPLEX (bool): if this test is complex (may contain sub-tests).
         TIMEOUT (number): timeout for flow run, None means no timeout.
+        STATE_TIMEOUT (number): seconds to wait for the state of each resource
+            to be stored, unless the resource defines its own STATE_TIMEOUT.
+        COMPRESS_STATE (bool): whether to compress the files of the stored
+            states.
+        metrics (dict): buffers of the samples monitors took during the test,
+            by the metrics' names.
+        metrics_summary (dict): statistics of the test's metrics, sent by the
+            worker which ran the test in multiprocess runs.
+        phase_timer (PhaseTimer): durations of the test's phases (e.g. lock,
+            setup, test and teardown) and its resources' phases.
+        profiler (object): profiler of the test's setUp, test and tearDown
+            methods, None if the test isn't profiled.
     """
     SETUP_METHOD_NAME = 'setUp'
     TEARDOWN_METHOD_NAME = 'tearDown'
@@ -57,6 +83,9 @@ class AbstractTest(unittest.TestCase):
     IS_COMPLEX = False
 
     STATE_DIR_NAME = "state"
+    STATE_TIMEOUT = 600  # 10 minutes
+    COMPRESS_STATE = False
+    COMPRESSED_EXTENSION = ".gz"
 
     def __init__(self, indexer=count(), methodName='runTest', save_state=True,
                  force_initialize=False, config=None, parent=None,
@@ -85,9 +114,15 @@ class AbstractTest(unittest.TestCase):
 
         self.all_resources = AttrDict()
         self.locked_resources = AttrDict()
+        self.metrics = {}
+        self.metrics_summary = None
+        self.phase_timer = PhaseTimer()
+        self.profiler = None
+        self._is_profiling = False
 
         self._is_client_local = False
         self.resource_manager = resource_manager
+        self.event_loop = None
 
         if parent is not None:
             parent.addTest(self)
@@ -149,6 +184,17 @@ class AbstractTest(unittest.TestCase):
         """
         return ClientResourceManager()
 
+    def set_resource_manager(self, resource_manager):
+        """Use a resource manager client owned by someone else (e.g. a runner).
+
+        The test won't disconnect the given client when it ends.
+
+        Args:
+            resource_manager (ClientResourceManager): the client to use.
+        """
+        self._is_client_local = False
+        self.resource_manager = resource_manager
+
     def expect(self, expression, msg=None):
         """Check an expression and fail the test at the end if it's False.
 
@@ -205,7 +251,8 @@ class AbstractTest(unittest.TestCase):
                                         base_work_dir=self.work_dir,
                                         requests=resources_to_request,
                                         enable_debug=self.enable_debug,
-                                        force_initialize=self.force_initialize)
+                                        force_initialize=self.force_initialize,
+                                        phase_timer=self.phase_timer)
 
         self.add_resources(requested_resources)
         self.locked_resources.update(requested_resources)
@@ -216,7 +263,7 @@ class AbstractTest(unittest.TestCase):
             self.result.updateResources(self)
 
     def release_resources(self, resources=None, dirty=False,
-                          force_release=True):
+                          force_release=True, finalize=True):
         """Release given resources using the client.
 
         Args:
@@ -226,6 +273,8 @@ class AbstractTest(unittest.TestCase):
                 compromised, and it should be re-validated.
             force_release (bool): whether to always release to resources
                 or enable saving them for next tests.
+            finalize (bool): whether to finalize the resources before
+                releasing them.
         """
         if resources is None:
             resources = self.locked_resources.keys()
@@ -238,13 +287,17 @@ class AbstractTest(unittest.TestCase):
                           for name, resource in self.locked_resources.items()
                           if name in resources}
 
-        self.resource_manager.release_resources(resources_dict,
-                                                dirty=dirty,
-                                                force_release=force_release)
+        with self.phase_timer.measure(RELEASE):
+            self.resource_manager.release_resources(
+                                            resources_dict,
+                                            dirty=dirty,
+                                            force_release=force_release,
+                                            phase_timer=self.phase_timer,
+                                            finalize=finalize)
 
         # Remove the resources from the test's resource to avoid double release
-        for resource in resources_dict.itervalues():
-            self.locked_resources.pop(resource, None)
+        for name in resources_dict:
+            self.locked_resources.pop(name, None)
 
     def _get_parents_count(self):
         """Get the number of ancestors.
@@ -271,6 +324,62 @@ class AbstractTest(unittest.TestCase):
         """
         self.data.update_result(test_outcome, details)
 
+    def _wrap_coroutine_methods(self):
+        """Make the coroutine setUp, test and tearDown methods synchronous.
+
+        Coroutine methods are run on the runner's event loop, so the rest of
+        the test flow (including the setUp and tearDown decorations) is
+        unchanged. Tests that run without a runner get a loop of their own.
+        """
+        if self.event_loop is None:
+            self.event_loop = EventLoop()
+
+        for method_name in (self._testMethodName, self.SETUP_METHOD_NAME,
+                            self.TEARDOWN_METHOD_NAME):
+
+            method = getattr(self, method_name)
+            if is_coroutine_method(method):
+                setattr(self, method_name,
+                        make_synchronous(method, self.event_loop))
+
+    def _start_profiling(self):
+        """Start or resume profiling, if the test's run is configured to.
+
+        Only tests which aren't complex are profiled, since the profile of a
+        complex test would include its sub tests.
+        """
+        if self._is_profiling:
+            return
+
+        if self.profiler is None:
+            mode = get_profile_mode(self)
+            if mode is None or self.IS_COMPLEX:
+                return
+
+            self.profiler = create_profiler(mode)
+
+        self.profiler.start()
+        self._is_profiling = True
+
+    def _pause_profiling(self):
+        """Stop profiling until the next '_start_profiling' call."""
+        if self._is_profiling:
+            self.profiler.stop()
+            self._is_profiling = False
+
+    def _save_profile(self):
+        """Stop profiling and save the profile in the test's work directory.
+
+        The profile is saved before the test stops, so the result handlers
+        (e.g. the artifact handler) get it in the work directory.
+        """
+        self._pause_profiling()
+        if self.profiler is not None:
+            file_path = self.profiler.save(self.work_dir)
+            core_log.debug("Saved the profile of test %r to %r",
+                           self.data.name, file_path)
+            self.profiler = None
+
     def _decorate_teardown(self, teardown_method, result):
         """Decorate the tearDown method to handle resource release.
 
@@ -286,18 +395,25 @@ class AbstractTest(unittest.TestCase):
             """tearDown method wrapper.
 
             * Executes the original tearDown method.
+            * Saves the profile of the test, if it's profiled.
             * Releases the test resources.
             * Closes the client if needed
             """
+            self._pause_profiling()
             self.result.startTeardown(self)
             try:
-                teardown_method(*args, **kwargs)
+                self._start_profiling()
+                with self.phase_timer.measure(TEARDOWN):
+                    teardown_method(*args, **kwargs)
 
             except Exception:
                 result.addError(self, sys.exc_info())
 
             finally:
-                self.store_state()
+                self._save_profile()
+                with self.phase_timer.measure(STORE_STATE):
+                    self.store_state(release_stored=True)
+
                 self.release_resources(
                        dirty=self.data.exception_type == TestOutcome.ERROR,
                        force_release=False)
@@ -308,30 +424,168 @@ class AbstractTest(unittest.TestCase):
 
         return teardown_method_wrapper
 
-    def store_state(self):
-        """Store the state of the resources in the work dir."""
-        status = self.data.exception_type
-        if (not self.save_state or status is None or
-                status in TestOutcome.POSITIVE_RESULTS):
-
-            self.logger.debug("Skipping saving error state")
-            return
+    def _create_state_dir(self):
+        """Create a new directory to store the resources' states in.
 
+        Returns:
+            str. path of the created directory.
+        """
         store_dir = os.path.join(self.work_dir, self.STATE_DIR_NAME)
 
         # In case a state dir already exists, create a new one.
         state_dir_index = 1
-        while os.path.exists(store_dir):
+        while True:
+            try:
+                os.makedirs(store_dir)
+                return store_dir
+
+            except OSError:
+                if not os.path.isdir(store_dir):
+                    raise
+
             state_dir_index += 1
             store_dir = os.path.join(self.work_dir,
                                      self.STATE_DIR_NAME + str(
                                          state_dir_index))
 
-        self.logger.debug("Creating state dir %r", store_dir)
-        os.makedirs(store_dir)
+    def _compress_state_dir(self, store_dir):
+        """Compress the files of the stored states, each to a gzip file.
 
-        for resource in self.all_resources.itervalues():
-            resource.store_state(store_dir)
+        Args:
+            store_dir (str): path of the state directory.
+        """
+        def compress_file(file_path):
+            """Replace a file with its compressed version."""
+            with open(file_path, "rb") as state_file, \
+                    gzip.open(file_path + self.COMPRESSED_EXTENSION,
+                              "wb") as compressed_file:
+                shutil.copyfileobj(state_file, compressed_file)
+
+            os.remove(file_path)
+
+        file_paths = [os.path.join(root, item)
+                      for root, _, files in os.walk(store_dir)
+                      for item in files
+                      if not item.endswith(self.COMPRESSED_EXTENSION)]
+
+        if len(file_paths) == 0:
+            return
+
+        self.logger.debug("Compressing %d state files", len(file_paths))
+        pool = ThreadPool(min(len(file_paths), len(self.all_resources) or 1))
+        try:
+            pool.map(compress_file, file_paths)
+
+        finally:
+            pool.close()
+            pool.join()
+
+    def store_state(self, release_stored=False):
+        """Store the state of the resources in the work dir.
+
+        The states of the resources are stored concurrently, each in its own
+        thread. Each resource has its own deadline, by its STATE_TIMEOUT (or
+        the test's one, if it doesn't define it). Resources whose state wasn't
+        stored by their deadline are left behind, and are released as dirty
+        at once, so they won't be kept for the next tests while their state
+        is still being stored (and the states aren't compressed). Only their
+        locks are released then, they're finalized by their storing threads
+        once the storing finishes, since the resources are still in use.
+
+        Args:
+            release_stored (bool): whether to release each locked resource as
+                soon as its state is stored, so other tests won't wait for
+                the states of the rest of the resources.
+        """
+        status = self.data.exception_type
+        if (not self.save_state or status is None or
+                status in TestOutcome.POSITIVE_RESULTS):
+
+            self.logger.debug("Skipping saving error state")
+            return
+
+        store_dir = self._create_state_dir()
+        self.logger.debug("Created state dir %r", store_dir)
+
+        stored_resources = Queue.Queue()
+        finished_resources = set()
+        timed_out_resources = set()
+        timeout_lock = threading.Lock()
+
+        def store_resource_state(name, resource):
+            """Store the resource's state, and report that it's done."""
+            try:
+                resource.store_state(store_dir)
+
+            except Exception:
+                self.logger.exception("Storing the state of resource %r "
+                                      "failed", name)
+
+            finally:
+                with timeout_lock:
+                    finished_resources.add(name)
+                    timed_out = name in timed_out_resources
+
+                stored_resources.put(name)
+
+            if timed_out:
+                try:
+                    resource.finalize()
+
+                except Exception:
+                    self.logger.exception("Resource %r failed to finalize",
+                                          name)
+
+        for name, resource in self.all_resources.iteritems():
+            thread = threading.Thread(target=store_resource_state,
+                                      args=(name, resource),
+                                      name="StoreState-%s" % name)
+            thread.daemon = True
+            thread.start()
+
+        start_time = time.time()
+        deadlines = {}
+        for name, resource in self.all_resources.iteritems():
+            state_timeout = getattr(resource, "STATE_TIMEOUT", None)
+            if state_timeout is None:
+                state_timeout = self.STATE_TIMEOUT
+
+            deadlines[name] = start_time + state_timeout
+
+        pending_resources = set(self.all_resources.iterkeys())
+        while len(pending_resources) > 0:
+            next_deadline = min(deadlines[name] for name in pending_resources)
+            try:
+                name = stored_resources.get(
+                    timeout=max(next_deadline - time.time(), 0))
+
+            except Queue.Empty:
+                with timeout_lock:
+                    timed_out = sorted(name for name in pending_resources
+                                       if deadlines[name] <= time.time() and
+                                       name not in finished_resources)
+                    timed_out_resources.update(timed_out)
+
+                if len(timed_out) == 0:
+                    continue
+
+                self.logger.error("Storing the state of resources %s timed "
+                                  "out", ", ".join(timed_out))
+
+                pending_resources.difference_update(timed_out)
+                self.release_resources([name for name in timed_out
+                                        if name in self.locked_resources],
+                                       dirty=True, finalize=False)
+                continue
+
+            pending_resources.discard(name)
+            if release_stored and name in self.locked_resources:
+                self.release_resources([name],
+                                       dirty=status == TestOutcome.ERROR,
+                                       force_release=False)
+
+        if self.COMPRESS_STATE and len(timed_out_resources) == 0:
+            self._compress_state_dir(store_dir)
 
     def _wrap_assert(self, assert_method, *args, **kwargs):
         try:
@@ -2,7 +2,8 @@
 
 Used in order to modify the appearance of tables in the admin site.
 """
-# pylint: disable=too-many-public-methods
+# pylint: disable=too-many-public-methods,old-style-class,no-init
+from django import forms
 from django.contrib import admin
 
 from rotest.core.models import RunData, SuiteData, CaseData, SignatureData
@@ -23,18 +24,51 @@ class TestDataInline(admin.TabularInline):
     readonly_fields = fields
 
 
+class CaseDataForm(forms.ModelForm):
+    """Form of :class:`rotest.core.models.CaseData`, editing its traceback.
+
+    The traceback is stored deduplicated and compressed, so it's edited
+    through the model's 'traceback' property instead of a model field.
+    """
+    traceback = forms.CharField(widget=forms.Textarea, required=False)
+
+    class Meta:
+        """Define the model of the form."""
+        model = CaseData
+        exclude = []
+
+    def __init__(self, *args, **kwargs):
+        super(CaseDataForm, self).__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial['traceback'] = self.instance.traceback
+
+    def save(self, commit=True):
+        """Set the edited traceback, and save the case data.
+
+        Args:
+            commit (bool): whether to save the case data to the DB.
+
+        Returns:
+            CaseData. the edited case data.
+        """
+        self.instance.traceback = self.cleaned_data['traceback']
+        return super(CaseDataForm, self).save(commit)
+
+
 class CaseDataAdmin(TestDataAdmin):
     """ModelAdmin for :class:`rotest.core.models.CaseData` model.
 
     Note:
         Resources list is set as "readonly" because of display issues.
     """
+    form = CaseDataForm
     list_display = TestDataAdmin.list_display + ['parent_link',
                                                  'exception_type',
                                                  'resources_names']
     fields = ['name', 'success', 'status', 'start_time', 'end_time',
-              'exception_type', 'traceback', 'resources']
-    readonly_fields = ['resources']
+              'phase_times', 'exception_type', 'traceback', 'signature',
+              'resources']
+    readonly_fields = ['phase_times', 'signature', 'resources']
 
 
 class SignatureDataAdmin(admin.ModelAdmin):
@@ -7,6 +7,7 @@ from functools import wraps
 from itertools import count
 
 from rotest.common import core_log
+from rotest.common.timing import SETUP
 from rotest.common.utils import get_work_dir
 from rotest.common.config import ROTEST_WORK_DIR
 from rotest.core.models.case_data import CaseData
@@ -127,10 +128,16 @@ class TestCase(AbstractTest):
                                    use_previous=True)
 
             try:
-                setup_method(*args, **kwargs)
+                self._start_profiling()
+                with self.phase_timer.measure(SETUP):
+                    setup_method(*args, **kwargs)
+
+                self._pause_profiling()
                 self.result.setupFinished(self)
+                self._start_profiling()
 
             except Exception:
+                self._save_profile()
                 self.release_resources(dirty=True)
                 raise
 
@@ -150,6 +157,7 @@ class TestCase(AbstractTest):
         # method signature, but the Rotest test case does not support it.
         self.assertIsNotNone(result, 'TestCase must run inside a TestSuite')
         self.result = result
+        self._wrap_coroutine_methods()
 
         # === Decorate the setUp, test and tearDown methods. ===
         setup_method = getattr(self, self.SETUP_METHOD_NAME)
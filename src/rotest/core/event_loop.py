@@ -0,0 +1,225 @@
+"""Event loop for running coroutine tests methods.
+
+Test methods, setUp and tearDown methods that are generators are treated as
+coroutines (in the style of Twisted's `inlineCallbacks`): they may yield
+deferreds (e.g. of network calls or `twisted.internet.task.deferLater`) and
+are resumed with their results, without blocking other coroutines meanwhile.
+
+Such methods are run to completion on the event loop of the test's runner,
+so the rest of the test flow (result reports, resources requests and
+releases) stays synchronous and unchanged. Tests that run at the same time
+have their coroutines scheduled on the same loop, and interleave on it.
+
+Only the threaded runner (``--threads``) runs tests at the same time. The
+base runner and the multiprocess workers run their tests one after the
+other, so coroutines of different tests don't interleave there.
+"""
+import inspect
+from functools import wraps
+from threading import Thread, Lock
+from Queue import Queue, Empty
+
+from rotest.common import core_log
+
+
+def get_reactor():
+    """Return the process' reactor.
+
+    The reactor is imported lazily, so processes that don't run coroutine
+    tests (e.g. the multiprocess runner's manager) won't create it.
+
+    Returns:
+        twisted.internet.interfaces.IReactorCore. the reactor.
+    """
+    from twisted.internet import reactor
+    return reactor
+
+
+class CoroutineResult(object):
+    """Outcome of a coroutine scheduled on an event loop.
+
+    Attributes:
+        POLLING_INTERVAL (number): seconds to wait for the outcome in each
+            attempt, to keep the waiting thread responsive to signals.
+    """
+    POLLING_INTERVAL = 0.5
+
+    def __init__(self):
+        self._outcome = Queue()
+
+    def set(self, value):
+        """Set the outcome of the coroutine.
+
+        Args:
+            value (object): the returned value, or a failure.
+        """
+        self._outcome.put(value)
+
+    def wait(self):
+        """Wait for the coroutine to finish and return its value.
+
+        Returns:
+            object. the value the coroutine returned.
+
+        Raises:
+            Exception. the exception the coroutine raised, with its original
+                traceback.
+        """
+        from twisted.python.failure import Failure
+
+        while True:
+            try:
+                value = self._outcome.get(timeout=self.POLLING_INTERVAL)
+                break
+
+            except Empty:
+                pass
+
+        if isinstance(value, Failure):
+            raise value.type, value.value, value.tb
+
+        return value
+
+
+class EventLoop(object):
+    """Scheduler of the coroutines of a runner's tests.
+
+    Each runner owns an event loop, which it propagates to its tests. The
+    coroutines of all the tests that run at the same time (e.g. in the
+    threads of the threaded runner) are scheduled on it together, and
+    interleave whenever they wait for a deferred.
+
+    The coroutines run on Twisted's reactor in a background thread. The
+    reactor is a per process singleton that can't be restarted, thus its
+    thread is started on first use and keeps running for the rest of the
+    process' lifetime (the thread is a daemon), and is shared by the loops.
+
+    Attributes:
+        pending (set): deferreds of the coroutines that haven't finished.
+    """
+    _reactor_thread = None
+    _start_lock = Lock()
+
+    def __init__(self):
+        self.pending = set()
+        self._pending_lock = Lock()
+
+    @classmethod
+    def start(cls):
+        """Start running the reactor in a background thread, if not yet."""
+        with cls._start_lock:
+            if cls._reactor_thread is not None:
+                return
+
+            core_log.debug("Starting coroutines event loop")
+            run_kwargs = {"installSignalHandlers": False}
+            cls._reactor_thread = Thread(target=get_reactor().run,
+                                         kwargs=run_kwargs,
+                                         name="EventLoop")
+            cls._reactor_thread.daemon = True
+            cls._reactor_thread.start()
+
+    def schedule(self, coroutine_method, *args, **kwargs):
+        """Schedule a coroutine method on the loop, without waiting for it.
+
+        Args:
+            coroutine_method (function): generator method to run.
+
+        Returns:
+            CoroutineResult. the outcome of the coroutine.
+        """
+        from twisted.internet.defer import inlineCallbacks, maybeDeferred
+
+        self.start()
+        result = CoroutineResult()
+
+        def run_coroutine():
+            """Start the coroutine and register for its result."""
+            deferred = maybeDeferred(inlineCallbacks(coroutine_method),
+                                     *args, **kwargs)
+            if deferred.called:
+                deferred.addBoth(result.set)
+                return
+
+            with self._pending_lock:
+                self.pending.add(deferred)
+
+            deferred.addBoth(self._finish, deferred, result)
+
+        get_reactor().callFromThread(run_coroutine)
+        return result
+
+    def _finish(self, value, deferred, result):
+        """Forget a finished coroutine and set its outcome.
+
+        Args:
+            value (object): the returned value, or a failure.
+            deferred (twisted.internet.defer.Deferred): the coroutine's
+                deferred.
+            result (CoroutineResult): the outcome to set.
+        """
+        with self._pending_lock:
+            self.pending.discard(deferred)
+
+        result.set(value)
+
+    def run_until_complete(self, coroutine_method, *args, **kwargs):
+        """Run a coroutine method on the loop and wait for its result.
+
+        Only the calling thread waits, the coroutines of other tests keep
+        running on the loop meanwhile.
+
+        Args:
+            coroutine_method (function): generator method to run.
+
+        Returns:
+            object. the value the coroutine returned.
+
+        Raises:
+            Exception. the exception the coroutine raised, with its original
+                traceback.
+        """
+        return self.schedule(coroutine_method, *args, **kwargs).wait()
+
+    def close(self):
+        """Cancel the coroutines of the loop that haven't finished."""
+        with self._pending_lock:
+            pending = list(self.pending)
+
+        if len(pending) == 0:
+            return
+
+        core_log.debug("Cancelling %d unfinished coroutines", len(pending))
+        for deferred in pending:
+            get_reactor().callFromThread(deferred.cancel)
+
+
+def is_coroutine_method(method):
+    """Return whether the given method is a coroutine (generator) method.
+
+    Args:
+        method (function): method to check.
+
+    Returns:
+        bool. True if the method is a coroutine method.
+    """
+    return inspect.isgeneratorfunction(method)
+
+
+def make_synchronous(coroutine_method, event_loop):
+    """Wrap a coroutine method so calling it would run it to completion.
+
+    Args:
+        coroutine_method (function): generator method to wrap.
+        event_loop (EventLoop): the loop to run the coroutine on.
+
+    Returns:
+        function. the wrapped method.
+    """
+    @wraps(coroutine_method)
+    def synchronous_wrapper(*args, **kwargs):
+        """Run the coroutine method on the event loop."""
+        return event_loop.run_until_complete(coroutine_method,
+                                             *args, **kwargs)
+
+    return synchronous_wrapper
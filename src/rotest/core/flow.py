@@ -2,9 +2,13 @@
 # pylint: disable=protected-access
 # pylint: disable=dangerous-default-value,unused-variable,too-many-arguments
 from itertools import count
+from threading import Thread
+from Queue import Queue, Empty
 
 from rotest.core.block import TestBlock
 from rotest.common.config import ROTEST_WORK_DIR
+from rotest.core.result.result import SynchronizedResult
+from rotest.management.client.manager import SynchronizedResourceManager
 from rotest.core.flow_component import (AbstractFlowComponent, MODE_CRITICAL,
                                         MODE_FINALLY, MODE_OPTIONAL)
 
@@ -42,7 +46,12 @@ class TestFlow(AbstractFlowComponent):
 
     Note:
         Blocks will run in the order in which they are defined in the
-        `blocks` tuple.
+        `blocks` tuple, unless PARALLEL_BLOCKS is set. In that case, each
+        component will start in its own thread once all the components it
+        depends on have finished (see :meth:`get_dependencies`). Components
+        that start after a critical component failed are skipped, as in a
+        serial flow, and the calls to the flow's resource manager client are
+        serialized between the threads.
 
     Attributes:
         save_state (bool): flag to determine if storing the states of
@@ -69,12 +78,17 @@ class TestFlow(AbstractFlowComponent):
         TAGS (list): list of tags by which the test may be filtered.
         IS_COMPLEX (bool): if this test is complex (may contain sub-tests).
         TIMEOUT (number): timeout for flow run, None means no timeout.
+        PARALLEL_BLOCKS (bool): whether to run independent components of the
+            flow concurrently, in different threads.
     """
     blocks = ()
 
     TAGS = []
     TIMEOUT = 1800  # 30 min
     IS_COMPLEX = True
+    PARALLEL_BLOCKS = False
+
+    PARALLEL_POLLING_INTERVAL = 0.5  # Seconds
 
     TEST_METHOD_NAME = "test_run_blocks"
 
@@ -217,10 +231,138 @@ class TestFlow(AbstractFlowComponent):
         return (any(block.had_error() for block in self) or
                 super(TestFlow, self).had_error())
 
+    @staticmethod
+    def _get_component_footprint(component, flow_resources):
+        """Return the data fields and resources a component uses.
+
+        Args:
+            component (AbstractFlowComponent): sub component of the flow.
+            flow_resources (set): names of the flow's resource requests.
+
+        Returns:
+            tuple. sets of the fields it reads, the fields it writes and the
+                resources it uses, or None if the component must run alone
+                (sub-flows and MODE_FINALLY components).
+        """
+        if component.IS_COMPLEX or component.mode == MODE_FINALLY:
+            return None
+
+        reads = set(component.get_inputs())
+        reads.update(component._pipes.itervalues())
+        writes = set(component.get_outputs())
+
+        resources = set(request.name for request in
+                        component.get_resource_requests())
+        resources.update(reads & flow_resources)
+
+        return reads, writes, resources
+
+    @staticmethod
+    def _footprints_conflict(footprint, previous):
+        """Return whether a component depends on a previous sibling.
+
+        Args:
+            footprint (tuple): the footprint of the component.
+            previous (tuple): the footprint of the previous sibling.
+
+        Returns:
+            bool. True if the component should run after the sibling.
+        """
+        if footprint is None or previous is None:
+            return True
+
+        reads, writes, resources = footprint
+        previous_reads, previous_writes, previous_resources = previous
+        return bool(writes & (previous_reads | previous_writes) or
+                    reads & previous_writes or
+                    resources & previous_resources)
+
+    def get_dependencies(self):
+        """Derive the dependencies between the components of the flow.
+
+        A component depends on a previous sibling if:
+
+        * One of them reads a field the other writes (via BlockInput,
+          BlockOutput or PipeTo), or both write the same field.
+        * Both use the same resource, either one they request or one of the
+          flow's resources they get as input.
+        * Either of them is a sub-flow or a MODE_FINALLY component, since
+          those run after all the previous siblings and before the next ones.
+
+        Returns:
+            list. for each component (by its index in the flow), the set of
+                indexes of the components it depends on.
+        """
+        flow_resources = set(request.name for request in
+                             self.get_resource_requests())
+
+        footprints = [self._get_component_footprint(component, flow_resources)
+                      for component in self]
+
+        return [set(previous_index for previous_index in xrange(index)
+                    if self._footprints_conflict(footprint,
+                                                 footprints[previous_index]))
+                for index, footprint in enumerate(footprints)]
+
+    def _run_component(self, index, result, finished_queue):
+        """Run a component of the flow and report its index when done.
+
+        Args:
+            index (number): index of the sub component to run.
+            result (SynchronizedResult): result object to report to.
+            finished_queue (Queue.Queue): queue to put the index of the
+                component in once it finished running.
+        """
+        try:
+            self._tests[index](result)
+
+        finally:
+            finished_queue.put(index)
+
+    def _run_blocks_in_parallel(self):
+        """Run the components of the flow according to their dependencies.
+
+        Each component starts in its own thread once all the components
+        it depends on have finished running.
+        """
+        dependencies = self.get_dependencies()
+        result = SynchronizedResult(self.result)
+        resource_manager = SynchronizedResourceManager(self.resource_manager)
+        for component in self:
+            component.resource_manager = resource_manager
+
+        finished_queue = Queue()
+        finished_indexes = set()
+        pending_indexes = range(len(self._tests))
+
+        while len(finished_indexes) < len(self._tests):
+            ready_indexes = [index for index in pending_indexes
+                             if dependencies[index] <= finished_indexes]
+
+            for index in ready_indexes:
+                pending_indexes.remove(index)
+                component_thread = Thread(target=self._run_component,
+                                          args=(index,
+                                                result,
+                                                finished_queue))
+                component_thread.daemon = True
+                component_thread.start()
+
+            try:
+                finished_indexes.add(finished_queue.get(
+                                    timeout=self.PARALLEL_POLLING_INTERVAL))
+
+            except Empty:
+                pass
+
     def test_run_blocks(self):
         """Main test method, run the blocks under the test-flow."""
-        for test in self:
-            test(self.result)
+        if self.PARALLEL_BLOCKS:
+            self._run_blocks_in_parallel()
+
+        else:
+            for test in self:
+                test(self.result)
 
         if self.had_error():
             error_blocks_list = [block.data.name for block in self if
@@ -259,8 +401,10 @@ class TestFlow(AbstractFlowComponent):
         super(TestFlow, self).run(result)
 
 
-def create_flow(blocks, name="AnonymousFlow", mode=MODE_CRITICAL, common={}):
+def create_flow(blocks, name="AnonymousFlow", mode=MODE_CRITICAL, common={},
+                parallel_blocks=False):
     """Auxiliary function to create test flows on the spot."""
     return type(name, (TestFlow,), {'mode': mode,
                                     'common': common,
-                                    'blocks': blocks})
+                                    'blocks': blocks,
+                                    'PARALLEL_BLOCKS': parallel_blocks})
@@ -8,9 +8,11 @@ from functools import wraps
 from itertools import count
 
 from rotest.common import core_log
+from rotest.common.timing import SETUP
 from rotest.common.utils import get_work_dir
 from rotest.common.config import ROTEST_WORK_DIR
 from rotest.core.abstract_test import AbstractTest
+from rotest.core.models.general_data import GeneralData
 from rotest.management.common.errors import ServerError
 from rotest.core.models.case_data import TestOutcome, CaseData
 
@@ -173,6 +175,30 @@ class AbstractFlowComponent(AbstractTest):
 
         return test_names[0]
 
+    def _previous_failed(self):
+        """Return whether a sibling that ran before this component failed.
+
+        In a parallel flow, all the siblings that already finished ran before
+        this component, regardless of their order in the flow.
+
+        Returns:
+            bool. True if a sibling that ran before fails the flow.
+        """
+        for component in self.parent:
+            if self.parent.PARALLEL_BLOCKS:
+                if (component is self or
+                        component.data.status != GeneralData.FINISHED):
+                    # The component is still running or pending
+                    continue
+
+            elif component is self:
+                break
+
+            if component.is_failing():
+                return True
+
+        return False
+
     def _decorate_setup(self, setup_method):
         """Decorate setUp method to handle skips, and resources requests.
 
@@ -196,17 +222,10 @@ class AbstractFlowComponent(AbstractTest):
                     self.skip_sub_components(skip_reason)
                     self.skipTest(skip_reason)
 
-            else:
-                if self.mode in (MODE_CRITICAL, MODE_OPTIONAL):
-                    siblings = list(self.parent)
-                    for component in siblings:
-                        if component is self:
-                            break
-
-                        if component.is_failing():
-                            self.skip_sub_components(
-                                                self.PREVIOUS_FAILED_MESSAGE)
-                            self.skipTest(self.PREVIOUS_FAILED_MESSAGE)
+            elif (self.mode in (MODE_CRITICAL, MODE_OPTIONAL) and
+                  self._previous_failed()):
+                self.skip_sub_components(self.PREVIOUS_FAILED_MESSAGE)
+                self.skipTest(self.PREVIOUS_FAILED_MESSAGE)
 
             try:
                 self.request_resources(self.get_resource_requests(),
@@ -233,10 +252,16 @@ class AbstractFlowComponent(AbstractTest):
                     # Validate all required inputs were passed
                     self.validate_inputs()
 
-                setup_method(*args, **kwargs)
+                self._start_profiling()
+                with self.phase_timer.measure(SETUP):
+                    setup_method(*args, **kwargs)
+
+                self._pause_profiling()
                 self.result.setupFinished(self)
+                self._start_profiling()
 
             except Exception:
+                self._save_profile()
                 self.release_resources(self.locked_resources, dirty=True)
                 raise
 
@@ -246,10 +271,15 @@ class AbstractFlowComponent(AbstractTest):
         """TearDown method."""
         pass
 
-    def store_state(self):
-        """Store the state of the resources in the work dir."""
+    def store_state(self, release_stored=False):
+        """Store the state of the resources in the work dir.
+
+        Args:
+            release_stored (bool): whether to release each locked resource as
+                soon as its state is stored.
+        """
         if self.is_main:
-            super(AbstractFlowComponent, self).store_state()
+            super(AbstractFlowComponent, self).store_state(release_stored)
 
     def run(self, result=None):
         """Run the test component.
@@ -261,6 +291,7 @@ class AbstractFlowComponent(AbstractTest):
             result (rotest.core.result.result.Result): test result information.
         """
         self.result = result
+        self._wrap_coroutine_methods()
 
         # === Decorate the setUp and tearDown methods ===
         setup_method = getattr(self, self.SETUP_METHOD_NAME)
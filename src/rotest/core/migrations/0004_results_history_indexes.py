@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import rotest.common.django_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_rundata_config'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='casedata',
+            name='exception_type',
+            field=models.IntegerField(blank=True, null=True, db_index=True, choices=[(0, b'OK'), (1, b'Error'), (2, b'Failed'), (3, b'Skipped'), (4, b'Expected Failure'), (5, b'Unexpected Success')]),
+            preserve_default=True,
+        ),
+        migrations.AlterField(
+            model_name='rundata',
+            name='run_name',
+            field=rotest.common.django_utils.fields.NameField(db_index=True, max_length=150, null=True, blank=True),
+            preserve_default=True,
+        ),
+        migrations.AlterIndexTogether(
+            name='generaldata',
+            index_together=set([('name', 'start_time'), ('run_data', 'start_time')]),
+        ),
+    ]
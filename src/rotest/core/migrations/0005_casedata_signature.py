@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_results_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casedata',
+            name='last_checked_signature',
+            field=models.IntegerField(null=True, blank=True),
+            preserve_default=True,
+        ),
+        migrations.AddField(
+            model_name='casedata',
+            name='signature',
+            field=models.ForeignKey(related_name='cases', on_delete=django.db.models.deletion.SET_NULL, blank=True, to='core.SignatureData', null=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+from __future__ import unicode_literals
+
+import zlib
+import hashlib
+
+from django.db import models, migrations
+import django.db.models.deletion
+
+TEXT_ENCODING = "utf-8"
+UPDATE_CHUNK_SIZE = 500
+
+
+# The helpers are frozen here, so that later changes in the traceback model
+# wouldn't change this migration.
+def normalize_traceback(traceback):
+    """Return the traceback with unified line endings, encoded in UTF-8."""
+    if isinstance(traceback, unicode):
+        traceback = traceback.encode(TEXT_ENCODING)
+
+    return traceback.replace(b"\r\n", b"\n")
+
+
+def get_fingerprint(normalized_traceback):
+    """Return the hex digest of the normalized traceback's SHA-1 hash."""
+    return hashlib.sha1(normalized_traceback).hexdigest()
+
+
+def compress_traceback(normalized_traceback):
+    """Return the compressed normalized traceback."""
+    return zlib.compress(normalized_traceback)
+
+
+def decompress_traceback(body):
+    """Return the text of a compressed traceback."""
+    return zlib.decompress(body).decode(TEXT_ENCODING)
+
+
+def store_tracebacks(apps, schema_editor):
+    """Move the cases' tracebacks to the deduplicated tracebacks table."""
+    CaseData = apps.get_model('core', 'CaseData')
+    TracebackData = apps.get_model('core', 'TracebackData')
+
+    fingerprint_to_id = {}
+    traceback_to_cases = {}
+    cases = CaseData.objects.exclude(traceback="").values_list('pk',
+                                                               'traceback')
+    for case_id, traceback in cases.iterator():
+        normalized_traceback = normalize_traceback(traceback)
+        fingerprint = get_fingerprint(normalized_traceback)
+        if fingerprint not in fingerprint_to_id:
+            traceback_id = TracebackData.objects.create(
+                fingerprint=fingerprint,
+                body=compress_traceback(normalized_traceback)).pk
+
+            fingerprint_to_id[fingerprint] = traceback_id
+            traceback_to_cases[traceback_id] = []
+
+        traceback_to_cases[fingerprint_to_id[fingerprint]].append(case_id)
+
+    for traceback_id, cases_ids in traceback_to_cases.iteritems():
+        for index in xrange(0, len(cases_ids), UPDATE_CHUNK_SIZE):
+            CaseData.objects.filter(
+                pk__in=cases_ids[index:index + UPDATE_CHUNK_SIZE]).update(
+                traceback_data=traceback_id)
+
+
+def restore_tracebacks(apps, schema_editor):
+    """Copy the deduplicated tracebacks back to the cases."""
+    CaseData = apps.get_model('core', 'CaseData')
+    TracebackData = apps.get_model('core', 'TracebackData')
+
+    for traceback_data in TracebackData.objects.iterator():
+        CaseData.objects.filter(traceback_data=traceback_data).update(
+            traceback=decompress_traceback(traceback_data.body))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_casedata_signature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TracebackData',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('fingerprint', models.CharField(unique=True, max_length=40)),
+                ('body', models.BinaryField()),
+            ],
+            options={
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AddField(
+            model_name='casedata',
+            name='traceback_data',
+            field=models.ForeignKey(related_name='cases', on_delete=django.db.models.deletion.PROTECT, blank=True, to='core.TracebackData', null=True),
+            preserve_default=True,
+        ),
+        migrations.RunPython(store_tracebacks, restore_tracebacks),
+        migrations.RemoveField(
+            model_name='casedata',
+            name='traceback',
+        ),
+    ]
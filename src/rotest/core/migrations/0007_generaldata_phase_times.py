@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_traceback_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generaldata',
+            name='phase_times',
+            field=models.TextField(default=b'{}', null=True, blank=True),
+            preserve_default=True,
+        ),
+    ]
@@ -10,3 +10,4 @@ from .case_data import CaseData
 from .suite_data import SuiteData
 from .signature import SignatureData
 from .general_data import GeneralData
+from .traceback_data import TracebackData
@@ -2,8 +2,10 @@
 # pylint: disable=no-member,no-init,too-few-public-methods
 # pylint: disable=too-many-public-methods,no-init,old-style-class
 from django.db import models
+from django.db.models import Max
 
 from .general_data import GeneralData
+from .traceback_data import TracebackData
 
 
 class TestOutcome(object):
@@ -34,15 +36,25 @@ class CaseData(GeneralData):
 
     Attributes:
         resources (list): List of contained resources data.
-        traceback (str): Textual description of the test problem.
+        traceback (str): Textual description of the test problem. It's stored
+            deduplicated and compressed, see :attr:`traceback_data`.
+        traceback_data (TracebackData): the stored traceback of the test,
+            shared with the other tests with the same traceback.
         exception_type (number): The code of the test exception (0-5),
             which are constants in the class :class:`TestOutcome`:
             SUCCESS, ERROR, FAILED, SKIPPED, EXPECTED_FAILURE,
             UNEXPECTED_SUCCESS.
+        signature (SignatureData): the known issue signature the traceback
+            matches, as classified by
+            :mod:`rotest.core.utils.signature_classifier`.
+        last_checked_signature (number): primary key of the last signature
+            the traceback was matched against, so classifications would only
+            match it against newer signatures.
     """
     MAX_CHAR_LEN = 1000
     TB_SEPARATOR = 80 * '-' + '\n'
     _RUNTIME_ORDER = '-start_time'
+    _NAMES_CHUNK_SIZE = 500
 
     RESULT_CHOICES = {TestOutcome.SUCCESS: 'OK',
                       TestOutcome.ERROR: 'Error',
@@ -52,14 +64,72 @@ class CaseData(GeneralData):
                       TestOutcome.UNEXPECTED_SUCCESS: 'Unexpected Success'}
 
     resources = models.ManyToManyField('management.ResourceData')
-    traceback = models.TextField(max_length=MAX_CHAR_LEN, blank=True)
+    traceback_data = models.ForeignKey(TracebackData, null=True, blank=True,
+                                       on_delete=models.PROTECT,
+                                       related_name='cases')
     exception_type = models.IntegerField(choices=RESULT_CHOICES.items(),
-                                         blank=True, null=True)
+                                         blank=True, null=True,
+                                         db_index=True)
+    signature = models.ForeignKey('core.SignatureData', null=True, blank=True,
+                                  on_delete=models.SET_NULL,
+                                  related_name='cases')
+    last_checked_signature = models.IntegerField(null=True, blank=True)
+
+    # The traceback's text, None if it wasn't loaded from the DB yet
+    _traceback = None
+    _traceback_changed = False
 
     class Meta:
         """Define the Django application for this model."""
         app_label = 'core'
 
+    @property
+    def traceback(self):
+        """Return the traceback's text, loading it from the DB if needed.
+
+        Returns:
+            str. the traceback of the test.
+        """
+        if self._traceback is None:
+            if self.traceback_data_id is None:
+                self._traceback = ""
+
+            else:
+                self._traceback = self.traceback_data.text
+
+        return self._traceback
+
+    @traceback.setter
+    def traceback(self, traceback):
+        """Set the traceback's text, to be stored when the data is saved.
+
+        Args:
+            traceback (str): the new traceback of the test.
+        """
+        self._traceback = traceback
+        self._traceback_changed = True
+
+    def save(self, *args, **kwargs):
+        """Store the changed traceback, and save the data.
+
+        The previous traceback of the case is deleted, unless other cases
+        share it.
+        """
+        previous_traceback_id = self.traceback_data_id
+        if self._traceback_changed:
+            self.traceback_data = None
+            if self._traceback:
+                self.traceback_data = \
+                    TracebackData.get_or_create_by_text(self._traceback)
+
+            self._traceback_changed = False
+
+        super(CaseData, self).save(*args, **kwargs)
+
+        if previous_traceback_id not in (None, self.traceback_data_id):
+            TracebackData.objects.filter(pk=previous_traceback_id,
+                                         cases__isnull=True).delete()
+
     @classmethod
     def should_skip(cls, test_name, run_data=None, exclude_pk=None):
         """Validate given test's last run was successful.
@@ -97,6 +167,57 @@ class CaseData(GeneralData):
 
         return matches.count() > 0 and matches.first().success
 
+    @classmethod
+    def get_delta_manifest(cls, test_names, run_data=None):
+        """Return the outcome of the last run of each of the given tests.
+
+        Uses the same criteria as :meth:`should_skip` (ignoring skipped
+        runs of the cases, and filtering by the run name if there is one),
+        but for all the run's tests at once, excluding the given run's tests.
+
+        The last start time of each test is aggregated by the DB, and only
+        the runs that started at those times are fetched. The names are
+        queried in chunks, to stay below the DB's query parameters limit.
+
+        Args:
+            test_names (iterable): names of the tests to get the outcomes of.
+            run_data (RunData): test run data object, leave None to not filter
+                by run data parameters.
+
+        Returns:
+            dict. maps a test's name to the success of its last run.
+        """
+        query_set = CaseData.objects.filter(start_time__isnull=False).exclude(
+            exception_type=TestOutcome.SKIPPED)
+
+        if run_data is not None:
+            if run_data.run_name is not None:
+                query_set = query_set.filter(
+                    run_data__run_name=run_data.run_name)
+
+            if run_data.pk is not None:
+                query_set = query_set.exclude(run_data=run_data)
+
+        test_names = sorted(set(test_names))
+        manifest = {}
+        for index in xrange(0, len(test_names), cls._NAMES_CHUNK_SIZE):
+            names_query_set = query_set.filter(
+                name__in=test_names[index:index + cls._NAMES_CHUNK_SIZE])
+
+            last_start_times = dict(names_query_set.values_list(
+                'name').annotate(Max('start_time')).order_by())
+
+            last_runs = names_query_set.filter(
+                start_time__in=set(last_start_times.itervalues()))
+
+            for name, start_time, success in last_runs.values_list(
+                    'name', 'start_time', 'success').iterator():
+
+                if start_time == last_start_times[name]:
+                    manifest[name] = success
+
+        return manifest
+
     def resources_names(self):
         """Return a string representing the resources this test used.
 
@@ -1,8 +1,9 @@
 """Define GeneralData model class."""
-# pylint: disable=no-init,old-style-class,unused-argument
+# pylint: disable=no-init,old-style-class,unused-argument,protected-access
 from datetime import datetime
 
-from django.db import models
+from django.db.models import Max
+from django.db import models, connection
 
 from rotest.common.django_utils import linked_unicode
 from rotest.common.django_utils.fields import NameField
@@ -25,6 +26,8 @@ class GeneralData(models.Model):
         end_time (datetime): date and time of the test end.
         success (bool): indicate if the test was successful.
         run_data (RunData): run data of the test.
+        phase_times (str): JSON of the durations of the test's phases and
+            its resources' phases (see :mod:`rotest.common.timing`).
     """
     parent = models.ForeignKey('self', null=True, blank=True,
                                related_name='tests')
@@ -40,13 +43,20 @@ class GeneralData(models.Model):
     start_time = models.DateTimeField(null=True)
     end_time = models.DateTimeField(null=True)
     success = models.NullBooleanField(null=True)
+    phase_times = models.TextField(blank=True, null=True, default="{}")
 
     run_data = models.ForeignKey('core.RunData', null=True, blank=True,
                                  related_name='tests')
 
     class Meta:
-        """Define the Django application for this model."""
+        """Define the Django application for this model.
+
+        The indexes serve the results history queries (e.g. run delta),
+        which filter by the test's name and run and order by start time.
+        """
         app_label = 'core'
+        index_together = (('name', 'start_time'),
+                          ('run_data', 'start_time'))
 
     def __unicode__(self):
         """Django version of __str__"""
@@ -162,6 +172,127 @@ class GeneralData(models.Model):
         """
         return False
 
+    @classmethod
+    def _get_inheritance_chain(cls, data_type):
+        """Return the concrete models of the data type, below GeneralData.
+
+        Args:
+            data_type (type): test data model class.
+
+        Returns:
+            list. the models, ordered from the base to the data type itself.
+        """
+        return [model for model in reversed(data_type.__mro__)
+                if issubclass(model, cls) and model is not cls and
+                not model._meta.abstract and not model._meta.proxy]
+
+    @staticmethod
+    def _insert_model_rows(model, datas):
+        """Insert the rows of the datas in the model's own table at once.
+
+        Django 1.7's bulk_create refuses multi-table inherited models, so the
+        rows are inserted using a single 'executemany' of the fields' values,
+        prepared by the fields themselves.
+
+        Args:
+            model (type): concrete data model class, whose parent rows were
+                already inserted.
+            datas (list): the test datas to insert the rows of.
+        """
+        fields = model._meta.local_concrete_fields
+        quote_name = connection.ops.quote_name
+        query = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote_name(model._meta.db_table),
+            ", ".join(quote_name(field.column) for field in fields),
+            ", ".join(["%s"] * len(fields)))
+
+        rows = [[field.get_db_prep_save(field.pre_save(data, add=True),
+                                        connection=connection)
+                 for field in fields]
+                for data in datas]
+
+        connection.cursor().executemany(query, rows)
+
+    @classmethod
+    def _insert_level(cls, level, run_data, last_id):
+        """Insert the base rows of a level of the tests tree at once.
+
+        Django 1.7 doesn't set the pks of bulk created rows, so they are read
+        back by their run data, in the insertion order.
+
+        Args:
+            level (list): (test data, parent data) tuples of the level.
+            run_data (RunData): run data of the tests.
+            last_id (number): pk of the last row of the run inserted before.
+        """
+        base_fields = [field for field in cls._meta.local_concrete_fields
+                       if not field.primary_key]
+
+        for test_data, parent_data in level:
+            if parent_data is not None:
+                test_data.parent_id = parent_data.id
+
+        cls.objects.bulk_create(
+            [cls(**{field.attname: getattr(test_data, field.attname)
+                    for field in base_fields})
+             for test_data, _ in level])
+
+        level_ids = (cls.objects.filter(run_data=run_data, pk__gt=last_id)
+                     .order_by("pk").values_list("pk", flat=True))
+
+        for (test_data, _), data_id in zip(level, level_ids):
+            test_data.id = data_id
+            for model in cls._get_inheritance_chain(type(test_data)):
+                for link_field in model._meta.parents.itervalues():
+                    setattr(test_data, link_field.attname, data_id)
+
+            test_data._state.adding = False
+            test_data._state.db = connection.alias
+
+    @classmethod
+    def bulk_create_tree(cls, levels):
+        """Insert the datas of a tests tree using a few bulk inserts.
+
+        * Inserts the base rows level by level, each level using a single
+          bulk_create, already linked to their parents' rows.
+        * Inserts the rows of each concrete data type at once.
+
+        The datas must share the same run data, and no other tests of the
+        run may be inserted meanwhile. Datas without a run data can't be read
+        back, and saved datas need to be updated instead, so in these cases
+        the datas are saved one by one.
+
+        Args:
+            levels (list): the levels of the tree, from its root. Each level
+                is a list of (test data, parent data) tuples.
+        """
+        run_data = levels[0][0][0].run_data
+        if run_data is None or any(test_data.pk is not None
+                                   for level in levels
+                                   for test_data, _ in level):
+            for level in levels:
+                for test_data, parent_data in level:
+                    test_data.parent = parent_data
+                    test_data.save()
+
+            return
+
+        last_id = cls.objects.filter(run_data=run_data).aggregate(
+            last_id=Max("pk"))["last_id"] or 0
+
+        for level in levels:
+            cls._insert_level(level, run_data, last_id)
+            last_id = level[-1][0].id
+
+        datas_by_model = {}
+        for level in levels:
+            for test_data, _ in level:
+                for model in cls._get_inheritance_chain(type(test_data)):
+                    datas_by_model.setdefault(model, []).append(test_data)
+
+        for model, model_datas in datas_by_model.iteritems():
+            cls._insert_model_rows(model, model_datas)
+
     def __iter__(self):
         """Iterate over the sub tests of the data.
 
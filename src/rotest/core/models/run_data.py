@@ -24,7 +24,7 @@ class RunData(models.Model):
         GLOBAL_FIELDS (tuple): names of fields that are not local (not foreign
             keys to instances of the local DB for example).
     """
-    run_name = NameField(null=True, blank=True)
+    run_name = NameField(null=True, blank=True, db_index=True)
     artifact_path = PathField(null=True, blank=True)
     run_delta = models.NullBooleanField(default=False)
     main_test = models.ForeignKey(GeneralData, null=True, blank=True,
@@ -1,6 +1,9 @@
 """Define SignatureData model class."""
-# pylint: disable=no-init,old-style-class
+# pylint: disable=no-init,old-style-class,unused-argument
 from django.db import models
+from django.dispatch import receiver
+from django.db.models.signals import pre_delete
+
 from rotest.common.django_utils.fields import NameField
 
 
@@ -36,3 +39,17 @@ class SignatureData(models.Model):
     def __repr__(self):
         """Unique Representation for data"""
         return self.name
+
+
+@receiver(pre_delete, sender=SignatureData)
+def reset_signature_cases(sender, instance, **kwargs):
+    """Let the cases of a deleted signature be classified again.
+
+    Deleting the signature unlinks its cases, but they should also be matched
+    against all the other signatures again, and not only the newer ones.
+
+    Args:
+        sender (type): the deleted model class.
+        instance (SignatureData): the deleted signature.
+    """
+    instance.cases.update(last_checked_signature=None)
@@ -0,0 +1,111 @@
+"""Define TracebackData model class."""
+# pylint: disable=no-init,old-style-class
+import zlib
+import hashlib
+
+from django.db import models
+
+TEXT_ENCODING = "utf-8"
+
+
+def normalize_traceback(traceback):
+    """Return the normalized form of the traceback, in which it's stored.
+
+    Args:
+        traceback (str): the traceback text.
+
+    Returns:
+        str. the traceback with unified line endings, encoded in UTF-8.
+    """
+    if isinstance(traceback, unicode):
+        traceback = traceback.encode(TEXT_ENCODING)
+
+    return traceback.replace("\r\n", "\n")
+
+
+def get_fingerprint(normalized_traceback):
+    """Return the fingerprint of a normalized traceback.
+
+    Args:
+        normalized_traceback (str): the traceback, as returned by
+            :func:`normalize_traceback`.
+
+    Returns:
+        str. the hex digest of the traceback's SHA-1 hash.
+    """
+    return hashlib.sha1(normalized_traceback).hexdigest()
+
+
+def compress_traceback(normalized_traceback):
+    """Compress a normalized traceback.
+
+    Args:
+        normalized_traceback (str): the traceback, as returned by
+            :func:`normalize_traceback`.
+
+    Returns:
+        str. the compressed traceback.
+    """
+    return zlib.compress(normalized_traceback)
+
+
+def decompress_traceback(body):
+    """Return the text of a compressed traceback.
+
+    Args:
+        body (str): the compressed traceback.
+
+    Returns:
+        unicode. the traceback text.
+    """
+    return zlib.decompress(body).decode(TEXT_ENCODING)
+
+
+class TracebackData(models.Model):
+    """Contain a unique traceback of tests, compressed.
+
+    Identical tracebacks (e.g. of the same broken device) are stored once, and
+    referenced by all the tests that failed with them.
+
+    Attributes:
+        fingerprint (str): hash of the normalized traceback.
+        body (str): the normalized traceback, compressed.
+    """
+    FINGERPRINT_LENGTH = 40
+
+    fingerprint = models.CharField(max_length=FINGERPRINT_LENGTH, unique=True)
+    body = models.BinaryField()
+
+    class Meta:
+        """Define the Django application for this model."""
+        app_label = 'core'
+
+    @classmethod
+    def get_or_create_by_text(cls, traceback):
+        """Return the stored traceback with the given text, creating it if new.
+
+        Args:
+            traceback (str): the traceback text.
+
+        Returns:
+            TracebackData. the stored traceback.
+        """
+        normalized_traceback = normalize_traceback(traceback)
+        traceback_data, _ = cls.objects.get_or_create(
+            fingerprint=get_fingerprint(normalized_traceback),
+            defaults={"body": compress_traceback(normalized_traceback)})
+
+        return traceback_data
+
+    @property
+    def text(self):
+        """Return the text of the traceback.
+
+        Returns:
+            unicode. the traceback text.
+        """
+        return decompress_traceback(self.body)
+
+    def __unicode__(self):
+        """Django version of __str__"""
+        return self.fingerprint
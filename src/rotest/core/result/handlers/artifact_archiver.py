@@ -0,0 +1,527 @@
+"""Background archiving of tests' work directories."""
+# pylint: disable=protected-access,no-self-use
+import os
+import time
+import zlib
+import Queue
+import threading
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP64_LIMIT
+
+from rotest.common import core_log
+from rotest.common.config import REPORT_SAVE_INTERVAL
+from rotest.core.utils.artifact_store import ArtifactStore, write_manifest
+
+
+MAX_IN_MEMORY_FILE_SIZE = 64 * 1024 * 1024  # 64M
+
+
+def get_archive_name(file_path):
+    """Return the name of a file in the archive, as ZipFile.write names it.
+
+    Args:
+        file_path (str): path of the file.
+
+    Returns:
+        str. the name of the file in the archive.
+    """
+    archive_name = os.path.normpath(os.path.splitdrive(file_path)[1])
+    while archive_name[0] in (os.sep, os.altsep):
+        archive_name = archive_name[1:]
+
+    return archive_name
+
+
+def compress_file(file_path):
+    """Read and compress a file, to be written to the archive.
+
+    Files bigger than MAX_IN_MEMORY_FILE_SIZE aren't compressed, and are left
+    to be streamed to the archive by the writer.
+
+    Args:
+        file_path (str): path of the file to compress.
+
+    Returns:
+        tuple. the file's path, entry info and compressed content (both None
+            if the file is too big), or None if the file couldn't be read.
+    """
+    try:
+        file_stat = os.stat(file_path)
+        if file_stat.st_size > MAX_IN_MEMORY_FILE_SIZE:
+            return file_path, None, None
+
+        with open(file_path, "rb") as file_object:
+            content = file_object.read()
+
+    except (IOError, OSError) as error:
+        core_log.warning("Failed reading %r for the artifact: %s",
+                         file_path, error)
+        return None
+
+    info = ZipInfo(get_archive_name(file_path),
+                   time.localtime(file_stat.st_mtime)[:6])
+    info.external_attr = (file_stat.st_mode & 0xFFFF) << 16
+    info.compress_type = ZIP_DEFLATED
+    info.file_size = len(content)
+    info.CRC = zlib.crc32(content) & 0xffffffff
+
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION,
+                                  zlib.DEFLATED, -15)
+    compressed_content = compressor.compress(content) + compressor.flush()
+    info.compress_size = len(compressed_content)
+
+    return file_path, info, compressed_content
+
+
+class DirectoryArchiver(threading.Thread):
+    """Thread which archives the files of finished work directories.
+
+    Directories are queued by :meth:`add_directory`, their files are
+    processed by a pool of worker threads, and the results are written by
+    this thread. Each file is archived only once, even if it's contained in
+    several queued directories, unless it was modified (its modification
+    time or size changed) since it was archived, e.g. a report which is
+    written again at the end of the run. Sub-classes replace the outdated
+    version of such files.
+
+    Sub-classes define how files are processed and written, and how the
+    archive is saved.
+
+    Attributes:
+        save_interval (number): minimal seconds between two saves of the
+            archive, 0 to save after every directory.
+        archived_files (dict): the modification time and size of the files
+            which were archived, by their paths.
+    """
+    def __init__(self, workers=None, save_interval=None):
+        """Initialize the archiver.
+
+        Args:
+            workers (number): amount of processing threads, leave None to
+                use one thread per CPU.
+            save_interval (number): minimal seconds between two saves of the
+                archive, 0 to save after every directory. Leave None to use
+                the configured report save interval.
+        """
+        super(DirectoryArchiver, self).__init__(name=self.__class__.__name__)
+        self.daemon = True
+
+        if save_interval is None:
+            save_interval = REPORT_SAVE_INTERVAL
+
+        if workers is None:
+            workers = cpu_count()
+
+        self.save_interval = save_interval
+        self.archived_files = {}
+
+        self._queue = Queue.Queue()
+        self._pool = ThreadPool(workers)
+        self._chunk_size = 2 * workers
+
+    def add_directory(self, directory, recursive=True):
+        """Queue the files of a directory to be archived.
+
+        Args:
+            directory (str): path of the directory.
+            recursive (bool): whether to archive the files of the directory's
+                sub-directories too.
+        """
+        self._queue.put((directory, recursive))
+
+    def close(self):
+        """Archive the queued directories, and close the archive."""
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        """Archive the queued directories, until the archiver is closed."""
+        last_save_time = time.time()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+
+                try:
+                    self._archive_directory(*item)
+
+                except Exception:  # pylint: disable=broad-except
+                    core_log.exception("Failed archiving %r", item[0])
+
+                if self.save_interval == 0 or \
+                        (time.time() - last_save_time >= self.save_interval and
+                         self._should_save()):
+                    self._save()
+                    last_save_time = time.time()
+
+        finally:
+            self._pool.close()
+            self._pool.join()
+            self._finish()
+
+    def _get_new_files(self, directory, recursive):
+        """Return the files of the directory which weren't archived as is.
+
+        Args:
+            directory (str): path of the directory.
+            recursive (bool): whether to include the files of the directory's
+                sub-directories.
+
+        Returns:
+            list. paths of the new and modified files.
+        """
+        if recursive:
+            file_paths = [os.path.join(root, item)
+                          for root, _, files in os.walk(directory)
+                          for item in files]
+
+        else:
+            file_paths = [os.path.join(directory, item)
+                          for item in os.listdir(directory)
+                          if os.path.isfile(os.path.join(directory, item))]
+
+        new_files = []
+        for file_path in file_paths:
+            file_path = os.path.abspath(file_path)
+            try:
+                file_stat = os.stat(file_path)
+
+            except OSError:
+                continue
+
+            file_version = (file_stat.st_mtime, file_stat.st_size)
+            if self.archived_files.get(file_path) != file_version:
+                self.archived_files[file_path] = file_version
+                new_files.append(file_path)
+
+        return new_files
+
+    def _archive_directory(self, directory, recursive):
+        """Process the new files of the directory and write them.
+
+        Args:
+            directory (str): path of the directory.
+            recursive (bool): whether to archive the files of the directory's
+                sub-directories too.
+        """
+        new_files = self._get_new_files(directory, recursive)
+        for index in xrange(0, len(new_files), self._chunk_size):
+            chunk = new_files[index:index + self._chunk_size]
+            for result in self._pool.map(self._process_file, chunk):
+                if result is not None:
+                    self._write_file(*result)
+
+    def _process_file(self, file_path):
+        """Prepare a file to be written, in a worker thread.
+
+        Args:
+            file_path (str): path of the file.
+
+        Returns:
+            tuple. arguments for :meth:`_write_file`, or None to skip the file.
+        """
+        raise NotImplementedError()
+
+    def _write_file(self, *args):
+        """Write a processed file to the archive."""
+        raise NotImplementedError()
+
+    def _should_save(self):
+        """Return whether the archive should be saved, once it's time to.
+
+        Returns:
+            bool. True to save the archive.
+        """
+        return True
+
+    def _save(self):
+        """Save the archive, so it's readable if the run crashes."""
+        raise NotImplementedError()
+
+    def _finish(self):
+        """Complete the archive, after all the directories were archived."""
+        raise NotImplementedError()
+
+
+class ArtifactArchiver(DirectoryArchiver):
+    """Thread which adds finished work directories to a zip archive.
+
+    The files are read and compressed by the worker threads (zlib releases
+    the GIL while compressing).
+
+    The archive's central directory is written once in a while, so if the
+    run crashes the archive is still readable and contains the files written
+    until the last save. Zip readers look for the directory at the end of
+    the archive, so each saved directory is written after a reserved space,
+    and the next files are written into that space, never over the saved
+    directory. When a file doesn't fit in the space left, the directory is
+    saved again after a new reserved space, which is big enough for the file
+    and for DIRECTORY_SIZE_RATIO times the directory's size of new data (so
+    the directory is rewritten rarely relatively to the archive's size).
+    The last directory is written right after the files, and the unused
+    reserved space is truncated.
+
+    Attributes:
+        artifact_path (str): path of the zip archive to create.
+    """
+    DIRECTORY_SIZE_RATIO = 10
+    # The size of a central directory entry without the file's name,
+    # including the zip64 extra field of big archives
+    DIRECTORY_ENTRY_SIZE = 46 + 28
+    # The size of the end of central directory records, including zip64's
+    DIRECTORY_END_SIZE = 22 + 56 + 20
+    # Bound of the size of a file's local header without the file's name,
+    # and of the expansion of incompressible data by deflate
+    FILE_HEADER_SIZE = 30 + 20
+    MAX_EXPANSION_RATIO = 1.01
+
+    def __init__(self, artifact_path, workers=None, save_interval=None):
+        """Create the archive.
+
+        Args:
+            artifact_path (str): path of the zip archive to create.
+            workers (number): amount of compressing threads, leave None to
+                use one thread per CPU.
+            save_interval (number): minimal seconds between two saves of the
+                archive's central directory, 0 to save after every directory
+                regardless of the written data's size. Leave None to use the
+                configured report save interval.
+        """
+        super(ArtifactArchiver, self).__init__(workers, save_interval)
+        self.artifact_path = artifact_path
+
+        self._unsaved_size = 0
+        self._directory_size = self.DIRECTORY_END_SIZE
+
+        # The position to write the next file at, and the position of the
+        # saved directory, which ends the reserved space
+        self._files_end = 0
+        self._directory_offset = 0
+
+        # The file is passed to the ZipFile, so closing the ZipFile only
+        # writes the central directory, and the file remains open
+        self._file = open(artifact_path, "w+b")
+        self._zip_file = ZipFile(self._file, mode="w", allowZip64=True)
+        self._save()
+
+    def _process_file(self, file_path):
+        """Read and compress a file.
+
+        Args:
+            file_path (str): path of the file.
+
+        Returns:
+            tuple. arguments for :meth:`_write_file`, or None to skip the file.
+        """
+        return compress_file(file_path)
+
+    def _remove_entry(self, archive_name):
+        """Remove an outdated version of a file from the archive's directory.
+
+        The content of the outdated version remains in the archive, but it's
+        no longer listed, so the archive holds only the modified version.
+
+        Args:
+            archive_name (str): the name of the file in the archive.
+        """
+        outdated_info = self._zip_file.NameToInfo.pop(archive_name, None)
+        if outdated_info is not None:
+            self._zip_file.filelist.remove(outdated_info)
+
+    def _reserve(self, size):
+        """Make sure the reserved space has room for the given size.
+
+        Args:
+            size (number): the size of the data to write.
+        """
+        if self._files_end + size > self._directory_offset:
+            self._save(reserved_size=size)
+
+        self._file.seek(self._files_end)
+
+    def _write_file(self, file_path, info, compressed_content):
+        """Write a file to the archive.
+
+        Args:
+            file_path (str): path of the file.
+            info (zipfile.ZipInfo): the file's entry info, None to read and
+                compress the file while writing it.
+            compressed_content (str): the compressed content of the file.
+        """
+        archive_name = get_archive_name(file_path)
+        if info is None:
+            self._reserve(self.FILE_HEADER_SIZE + len(archive_name) +
+                          int(os.path.getsize(file_path) *
+                              self.MAX_EXPANSION_RATIO))
+            self._remove_entry(archive_name)
+            self._zip_file.write(file_path, compress_type=ZIP_DEFLATED)
+            info = self._zip_file.filelist[-1]
+
+        else:
+            self._reserve(self.FILE_HEADER_SIZE + len(archive_name) +
+                          len(compressed_content))
+            self._remove_entry(archive_name)
+
+            # Write the already compressed content, as ZipFile.writestr does
+            zip64 = info.file_size > ZIP64_LIMIT or \
+                info.compress_size > ZIP64_LIMIT
+            info.header_offset = self._files_end
+            self._zip_file._writecheck(info)
+            self._zip_file._didModify = True
+            self._file.write(info.FileHeader(zip64))
+            self._file.write(compressed_content)
+            self._zip_file.filelist.append(info)
+            self._zip_file.NameToInfo[info.filename] = info
+
+        self._unsaved_size += self._file.tell() - self._files_end
+        self._files_end = self._file.tell()
+        self._directory_size += self.DIRECTORY_ENTRY_SIZE + len(info.filename)
+
+    def _write_directory(self, offset):
+        """Write the archive's central directory at the given position.
+
+        Args:
+            offset (number): position to write the directory at.
+        """
+        self._file.seek(offset)
+        self._zip_file._didModify = True
+        self._zip_file.close()
+        self._file.flush()
+
+    def _save(self, reserved_size=0):
+        """Write the archive's central directory after a reserved space.
+
+        The directory is written after the saved one, so the archive remains
+        readable while it's written, and the files are written into the
+        reserved space before it, keeping the archive open.
+
+        Args:
+            reserved_size (number): minimal size to reserve for the next
+                files.
+        """
+        if not self._zip_file._didModify and reserved_size == 0:
+            return
+
+        reserved_size = max(reserved_size,
+                            self.DIRECTORY_SIZE_RATIO * self._directory_size)
+        self._file.seek(0, os.SEEK_END)
+        directory_offset = max(self._files_end + reserved_size,
+                               self._file.tell())
+        self._write_directory(directory_offset)
+        self._directory_offset = directory_offset
+        self._unsaved_size = 0
+
+        self._zip_file = ZipFile(self._file, mode="a", allowZip64=True)
+        self._file.seek(self._files_end)
+
+    def _should_save(self):
+        """Return whether enough data was written since the last save.
+
+        Returns:
+            bool. True to save the archive.
+        """
+        return self._unsaved_size >= \
+            self.DIRECTORY_SIZE_RATIO * self._directory_size
+
+    def _finish(self):
+        """Write the archive's central directory, and close the archive.
+
+        The directory is written right after the files, unless it may
+        overwrite the saved directory, which must remain valid until the
+        archive is truncated.
+        """
+        if self._files_end + self._directory_size <= self._directory_offset:
+            self._write_directory(self._files_end)
+            self._file.truncate()
+
+        else:
+            self._file.seek(0, os.SEEK_END)
+            self._write_directory(self._file.tell())
+
+        self._file.close()
+
+
+class ManifestArchiver(DirectoryArchiver):
+    """Thread which adds finished work directories to an artifact store.
+
+    The files are hashed and stored by the worker threads, and the run's
+    manifest lists their names and hashes. The manifest is rewritten once in
+    a while, so if the run crashes it lists the files stored until then.
+
+    Attributes:
+        manifest_path (str): path of the manifest to create.
+        store (ArtifactStore): the store of the files.
+        files (list): dicts describing the archived files, as listed in the
+            manifest.
+    """
+    def __init__(self, manifest_path, store=None, workers=None,
+                 save_interval=None):
+        """Create the manifest.
+
+        Args:
+            manifest_path (str): path of the manifest to create.
+            store (ArtifactStore): the store of the files, leave None to use
+                the default objects directory.
+            workers (number): amount of storing threads, leave None to use
+                one thread per CPU.
+            save_interval (number): minimal seconds between two saves of the
+                manifest, 0 to save after every directory. Leave None to use
+                the configured report save interval.
+        """
+        super(ManifestArchiver, self).__init__(workers, save_interval)
+        if store is None:
+            store = ArtifactStore()
+
+        self.manifest_path = manifest_path
+        self.store = store
+        self.files = []
+        self._files_indexes = {}
+        self._save()
+
+    def _process_file(self, file_path):
+        """Store a file.
+
+        Args:
+            file_path (str): path of the file.
+
+        Returns:
+            tuple. arguments for :meth:`_write_file`, or None to skip the file.
+        """
+        try:
+            file_stat = os.stat(file_path)
+            content_hash = self.store.store(file_path)
+
+        except (IOError, OSError) as error:
+            core_log.warning("Failed storing %r for the artifact: %s",
+                             file_path, error)
+            return None
+
+        return ({"name": get_archive_name(file_path),
+                 "hash": content_hash,
+                 "size": file_stat.st_size,
+                 "mtime": file_stat.st_mtime,
+                 "mode": file_stat.st_mode},)
+
+    def _write_file(self, file_entry):
+        """Add a stored file to the manifest, replacing its outdated version.
+
+        Args:
+            file_entry (dict): description of the file.
+        """
+        file_index = self._files_indexes.get(file_entry["name"])
+        if file_index is not None:
+            self.files[file_index] = file_entry
+            return
+
+        self._files_indexes[file_entry["name"]] = len(self.files)
+        self.files.append(file_entry)
+
+    def _save(self):
+        """Write the manifest."""
+        write_manifest(self.manifest_path, self.files)
+
+    def _finish(self):
+        """Write the complete manifest."""
+        self._save()
@@ -1,16 +1,19 @@
 """Artifact creating handler."""
 import os
-from zipfile import ZipFile
 
 from rotest.common import config
+from rotest.core.utils.artifact_store import MANIFEST_EXTENSION
 from .abstract_handler import AbstractResultHandler
+from .artifact_archiver import ArtifactArchiver, ManifestArchiver
 
 
 class ArtifactHandler(AbstractResultHandler):
     """Artifact creating result handler.
 
-    At the end of the test, this handler creates a zip of the work directory,
-    and updates the run data.
+    At the end of each test, this handler adds the test's work directory to
+    a zip of the run's work directory, and updates the run data. The files
+    are archived by a background archiver, so the tests don't wait for them
+    to be compressed.
 
     Attributes:
         artifacts_path (str): base dir to create the artifacts in.
@@ -18,6 +21,7 @@ class ArtifactHandler(AbstractResultHandler):
             e.g. '.zip'.
         DEFAULT_PROJECT_FOLDER (str): default project dir for the artifact. If
             the user specified a run name, it would be used as project dir.
+        archiver (ArtifactArchiver): the archiver which writes the artifact.
     """
     NAME = 'artifact'
     EXTENSTION = '.zip'
@@ -47,36 +51,55 @@ class ArtifactHandler(AbstractResultHandler):
                              os.path.basename(self.main_test.work_dir)) \
                              + self.EXTENSTION
 
-        with ZipFile(self.artifact_path, mode='w', allowZip64=True):
-            pass
+        self.archiver = self.create_archiver()
+        self.archiver.start()
 
         run_data.artifact_path = self.artifact_path
         if run_data.pk is not None:
             run_data.save()
 
+    def create_archiver(self):
+        """Create the archiver which writes the artifact.
+
+        Returns:
+            DirectoryArchiver. archiver of the work directories.
+        """
+        return ArtifactArchiver(self.artifact_path)
+
     def stop_test(self, test):
-        """Add the case dir to the artifact.
+        """Queue the case dir to be added to the artifact.
 
         Args:
             test (object): test item instance.
         """
-        with ZipFile(self.artifact_path, mode='a',
-                     allowZip64=True) as artifact:
-
-            for root, _, files in os.walk(test.work_dir):
-                for item in files:
-                    file_path = os.path.join(root, item)
-                    artifact.write(file_path)
+        self.archiver.add_directory(test.work_dir)
 
     def stop_test_run(self):
         """Add the files of the main work directory to the artifact.
 
         This is used to copy global files of the run, such as results excel.
+        The artifact is complete when this method returns.
         """
-        with ZipFile(self.artifact_path, mode='a',
-                     allowZip64=True) as artifact:
+        self.archiver.add_directory(self.main_test.work_dir, recursive=False)
+        self.archiver.close()
+
 
-            for item in os.listdir(self.main_test.work_dir):
-                file_path = os.path.join(self.main_test.work_dir, item)
-                if os.path.isfile(file_path):
-                    artifact.write(file_path)
+class ArtifactStoreHandler(ArtifactHandler):
+    """Artifact store result handler.
+
+    Instead of creating a zip of the work directory, this handler stores its
+    files by their content in the artifacts store shared between the runs,
+    and creates a manifest listing them. Repeated files (e.g. resources'
+    states) are stored once across all the runs. Use 'rotest export' to
+    create a zip from the manifest.
+    """
+    NAME = 'artifact_store'
+    EXTENSTION = MANIFEST_EXTENSION
+
+    def create_archiver(self):
+        """Create the archiver which stores the files and the manifest.
+
+        Returns:
+            DirectoryArchiver. archiver of the work directories.
+        """
+        return ManifestArchiver(self.artifact_path)
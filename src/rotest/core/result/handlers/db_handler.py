@@ -1,5 +1,14 @@
 """Database result handler."""
-# pylint: disable=unused-argument
+# pylint: disable=unused-argument,broad-except
+from threading import Thread, Condition
+from collections import OrderedDict
+
+from django.db import connection, transaction
+
+from rotest.common import core_log
+from rotest.core.models.case_data import CaseData
+from rotest.core.models.general_data import GeneralData
+
 from .abstract_handler import AbstractResultHandler
 
 
@@ -8,11 +17,19 @@ class DBHandler(AbstractResultHandler):
 
     Overrides result handler's methods to update the Rotest's database
     values on each event change in the main result object.
+
+    Attributes:
+        delta_manifest (dict): maps a test's name to the success of its last
+            run, fetched at the start of delta runs.
     """
     NAME = 'db'
 
     SKIP_DELTA_MESSAGE = "Previous run passed according to local DB"
 
+    def __init__(self, *args, **kwargs):
+        super(DBHandler, self).__init__(*args, **kwargs)
+        self.delta_manifest = None
+
     @staticmethod
     def _save_resource(resource, test):
         """Save a copy of the resource to the DB and link it to the Case.
@@ -30,21 +47,59 @@ class DBHandler(AbstractResultHandler):
         test.logger.debug("Resource %r duplicated with name %r",
                           resource.name, copy_resource.name)
 
-    @classmethod
-    def _save_sub_tests(cls, test, run_data):
+    @staticmethod
+    def save_test_data(test):
+        """Save the test's data to the DB.
+
+        Args:
+            test (object): test item instance.
+        """
+        test.data.save()
+
+    @staticmethod
+    def _save_sub_tests(test, run_data):
         """Assign the tests' datas with the saved run data and save them.
 
+        The datas are inserted level by level using bulk inserts (see
+        :meth:`rotest.core.models.general_data.GeneralData.bulk_create_tree`).
+
         Args:
             test (object): test item instance.
             run_data (rotest.core.models.run_data.RunData): test run data.
         """
-        test.data.run_data = run_data
-        test.data.save()
+        levels = []
+        level = [(test, None)]
+        while len(level) > 0:
+            levels.append([(sub_test.data, parent_data)
+                           for sub_test, parent_data in level])
+            next_level = []
+            for sub_test, _ in level:
+                sub_test.data.run_data = run_data
+                if sub_test.IS_COMPLEX:
+                    for child in sub_test:
+                        sub_test.data.add_sub_test_data(child.data)
+                        next_level.append((child, sub_test.data))
+
+            level = next_level
+
+        GeneralData.bulk_create_tree(levels)
+
+    @classmethod
+    def _get_tests_names(cls, test):
+        """Return the names of the test and all its sub tests.
 
+        Args:
+            test (object): test item instance.
+
+        Returns:
+            list. the names of the tests.
+        """
+        names = [test.data.name]
         if test.IS_COMPLEX:
             for sub_test in test:
-                test.data.add_sub_test_data(sub_test.data)
-                cls._save_sub_tests(sub_test, run_data)
+                names.extend(cls._get_tests_names(sub_test))
+
+        return names
 
     def start_test_run(self):
         """Save all the test datas and the run data."""
@@ -56,27 +111,33 @@ class DBHandler(AbstractResultHandler):
             # Save the run data so it'll have a pk.
             run_data.save()
 
-        # Save all the test datas so they'll have a pk.
-        self._save_sub_tests(self.main_test, run_data)
+        # Save all the test datas so they'll have a pk, in one transaction.
+        with transaction.atomic():
+            self._save_sub_tests(self.main_test, run_data)
 
         if run_data is not None:
             # Repoint to the main test, now that it has a pk.
             run_data.main_test = self.main_test.data
             run_data.save()
 
+            if run_data.run_delta:
+                self.delta_manifest = CaseData.get_delta_manifest(
+                    self._get_tests_names(self.main_test), run_data)
+
     def start_test(self, test):
         """Update the test data to 'in progress' state and set the start time.
 
         Args:
             test (object): test item instance.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def should_skip(self, test):
         """Check if the test passed in the last run.
 
-        The result is based on querying the local DB for the last run. If the
-        last run was successful, then the test should be skipped.
+        The result is based on the last runs' outcomes, which are queried from
+        the local DB once, when the run starts. If the last run was
+        successful, then the test should be skipped.
 
         Args:
             test (object): test item instance.
@@ -84,10 +145,8 @@ class DBHandler(AbstractResultHandler):
         Returns:
             str. Skip reason if the test should be skipped, None otherwise.
         """
-        if (test.data.run_data is not None and
-                test.data.run_data.run_delta and
-                test.data.should_skip(test.data.name, test.data.run_data,
-                                      test.data.pk)):
+        if (self.delta_manifest is not None and
+                self.delta_manifest.get(test.data.name, False)):
             return self.SKIP_DELTA_MESSAGE
 
         return None
@@ -109,7 +168,7 @@ class DBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def start_composite(self, test):
         """Update the test data to 'in progress' state and set the start time.
@@ -125,7 +184,7 @@ class DBHandler(AbstractResultHandler):
         Args:
             test (TestSuite): test item instance.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def add_success(self, test):
         """Save the test data result as success.
@@ -133,7 +192,7 @@ class DBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def add_skip(self, test, reason):
         """Save the test data result as skip.
@@ -142,7 +201,7 @@ class DBHandler(AbstractResultHandler):
             test (object): test item instance.
             reason (str): skip reason description.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def add_failure(self, test, exception_str):
         """Save the test data result as failure.
@@ -151,7 +210,7 @@ class DBHandler(AbstractResultHandler):
             test (object): test item instance.
             exception_str (str): exception traceback string.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def add_error(self, test, exception_str):
         """Save the test data result as error.
@@ -160,7 +219,7 @@ class DBHandler(AbstractResultHandler):
             test (object): test item instance.
             exception_str (str): exception traceback string.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def add_expected_failure(self, test, exception_str):
         """Save the test data result as expected failure.
@@ -169,7 +228,7 @@ class DBHandler(AbstractResultHandler):
             test (object): test item instance.
             exception_str (str): exception traceback string.
         """
-        test.data.save()
+        self.save_test_data(test)
 
     def add_unexpected_success(self, test):
         """Save the test data result as unexpected success.
@@ -177,4 +236,142 @@ class DBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        test.data.save()
+        self.save_test_data(test)
+
+
+class BatchDBHandler(DBHandler):
+    """Write-behind database result handler.
+
+    Instead of saving the test's data on each event, the handler marks it
+    as pending, and a background writer thread saves the pending datas in
+    batched transactions. Multiple changes of the same data between two
+    flushes are coalesced into a single save.
+
+    The pending datas are flushed once more when the run ends, so the DB
+    is up to date when the run finishes. Datas whose save failed are kept
+    pending, and are retried in the next flush.
+
+    Attributes:
+        FLUSH_INTERVAL (number): maximal seconds between two flushes.
+        BATCH_SIZE (number): number of pending datas that triggers a flush.
+    """
+    NAME = 'batchdb'
+
+    FLUSH_INTERVAL = 1
+    BATCH_SIZE = 100
+
+    def __init__(self, *args, **kwargs):
+        super(BatchDBHandler, self).__init__(*args, **kwargs)
+
+        self._stopped = False
+        self._writer = None
+        self._pending_datas = OrderedDict()
+        self._pending_condition = Condition()
+
+    def save_test_data(self, test):
+        """Mark the test's data as pending, to be saved by the writer.
+
+        Args:
+            test (object): test item instance.
+        """
+        with self._pending_condition:
+            self._pending_datas[id(test.data)] = test.data
+            if len(self._pending_datas) >= self.BATCH_SIZE:
+                self._pending_condition.notify()
+
+    def _requeue_datas(self, datas):
+        """Mark datas as pending again, ahead of the newly pending datas.
+
+        Args:
+            datas (list): test datas whose save failed.
+        """
+        with self._pending_condition:
+            pending_datas = OrderedDict((id(data), data) for data in datas)
+            pending_datas.update(self._pending_datas)
+            self._pending_datas = pending_datas
+
+    def flush(self):
+        """Save all the pending datas to the DB in a single transaction.
+
+        If the transaction fails, each data is saved in its own transaction,
+        and the datas whose save failed are pending again, to be retried in
+        the next flush.
+
+        Returns:
+            bool. whether all the pending datas were saved.
+        """
+        with self._pending_condition:
+            datas = self._pending_datas.values()
+            self._pending_datas.clear()
+
+        if len(datas) == 0:
+            return True
+
+        try:
+            with transaction.atomic():
+                for data in datas:
+                    data.save()
+
+            return True
+
+        except Exception:
+            core_log.exception("Failed saving %d test datas to the DB, "
+                               "saving them one by one", len(datas))
+
+        failed_datas = []
+        for data in datas:
+            try:
+                with transaction.atomic():
+                    data.save()
+
+            except Exception:
+                core_log.exception("Failed saving the data of %r",
+                                   data.name)
+                failed_datas.append(data)
+
+        if len(failed_datas) == 0:
+            return True
+
+        self._requeue_datas(failed_datas)
+        return False
+
+    def _write_pending_datas(self):
+        """Flush the pending datas periodically, until the run stops."""
+        try:
+            while True:
+                with self._pending_condition:
+                    if self._stopped:
+                        break
+
+                    if len(self._pending_datas) < self.BATCH_SIZE:
+                        self._pending_condition.wait(self.FLUSH_INTERVAL)
+
+                self.flush()
+
+        finally:
+            # Django opens a database connection per thread
+            connection.close()
+
+    def start_test_run(self):
+        """Save all the test datas and start the writer thread."""
+        super(BatchDBHandler, self).start_test_run()
+
+        self._stopped = False
+        self._writer = Thread(target=self._write_pending_datas,
+                              name="DBWriter")
+        self._writer.daemon = True
+        self._writer.start()
+
+    def stop_test_run(self):
+        """Stop the writer thread and flush the remaining pending datas."""
+        if self._writer is not None:
+            with self._pending_condition:
+                self._stopped = True
+                self._pending_condition.notify()
+
+            self._writer.join()
+            self._writer = None
+
+        if not self.flush():
+            core_log.error("Couldn't save %d test datas to the DB",
+                           len(self._pending_datas))
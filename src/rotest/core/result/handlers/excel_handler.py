@@ -7,9 +7,11 @@ import xlwt
 from xlwt.Style import easyxf
 
 from rotest.core.suite import TestSuite
+from rotest.common.timing import load_phase_times, format_durations
 from rotest.core.flow_component import AbstractFlowComponent
 from rotest.core.result.handlers.db_handler import DBHandler
 from rotest.core.models.case_data import CaseData, TestOutcome
+from rotest.core.result.handlers.report_saver import ReportSaver
 from rotest.core.result.handlers.remote_db_handler import RemoteDBHandler
 from rotest.core.result.handlers.abstract_handler import AbstractResultHandler
 
@@ -27,6 +29,7 @@ class ExcelHandler(AbstractResultHandler):
         output_file_path (str): the Excel report path.
         workbook (xlwt.Workbook): Excel workbook object.
         sheet (xlwt.Sheet): Excel sheet object.
+        saver (ReportSaver): saves the workbook periodically.
     """
     NAME = 'excel'
 
@@ -71,8 +74,9 @@ class ExcelHandler(AbstractResultHandler):
     TRACEBACK = 'Traceback'
     START_TIME = 'Start time'
     DESCRIPTION = 'Description'
+    PHASE_TIMES = 'Phase times'
     HEADERS = (NAME_HEADER, RESULT, START_TIME, END_TIME, TRACEBACK,
-               DESCRIPTION, RESOURCES, ASSIGNEE, COMMENTS)
+               DESCRIPTION, RESOURCES, ASSIGNEE, COMMENTS, PHASE_TIMES)
 
     CHAR_LENGTH = 256  # Character length is in units of 1/256
     MAX_TRACEBACK_LENGTH = 32767  # Max length of Excel cell content
@@ -84,7 +88,8 @@ class ExcelHandler(AbstractResultHandler):
                        TRACEBACK: CHAR_LENGTH * 82,
                        START_TIME: CHAR_LENGTH * 26,
                        DESCRIPTION: CHAR_LENGTH * 82,
-                       NAME_HEADER: CHAR_LENGTH * 75}
+                       NAME_HEADER: CHAR_LENGTH * 75,
+                       PHASE_TIMES: CHAR_LENGTH * 82}
 
     ROW_HEIGHT = 20 * 13  # 13pt
     FONT_COLOR = "font:colour %s;"
@@ -98,18 +103,19 @@ class ExcelHandler(AbstractResultHandler):
 
     DEFAULT_CELL_STYLE = easyxf(CELL_STYLE % (DEFAULT_COLOR, BLACK_COLOR))
     BOLDED_CELL_STYLE = easyxf(THICK_CELL_BORDERS + HEIGHT_STYLE)
+    CONTENT_TO_COLORS = OrderedDict([
+        (IN_PROGRESS, (IN_PROGRESS_COLOR, WHITE_COLOR)),
+        (DID_NOT_RUN, (DID_NOT_RUN_COLOR, BLACK_COLOR)),
+        (SUCCESS, (SUCCESS_COLOR, BLACK_COLOR)),
+        (PASSED, (PASSED_COLOR, BLACK_COLOR)),
+        (FAILED, (FAILED_COLOR, WHITE_COLOR)),
+        (ERROR, (ERROR_COLOR, WHITE_COLOR)),
+        (SKIPPED, (SKIPPED_COLOR, BLACK_COLOR)),
+        (EXPECTED_FAILURE, (EXPECTED_FAILURE_COLOR, BLACK_COLOR)),
+        (UNEXPECTED_SUCCESS, (UNEXPECTED_SUCCESS_COLOR, BLACK_COLOR))])
     CONTENT_TO_STYLE = OrderedDict([
-        (IN_PROGRESS, easyxf(CELL_STYLE % (IN_PROGRESS_COLOR, WHITE_COLOR))),
-        (DID_NOT_RUN, easyxf(CELL_STYLE % (DID_NOT_RUN_COLOR, BLACK_COLOR))),
-        (SUCCESS, easyxf(CELL_STYLE % (SUCCESS_COLOR, BLACK_COLOR))),
-        (PASSED, easyxf(CELL_STYLE % (PASSED_COLOR, BLACK_COLOR))),
-        (FAILED, easyxf(CELL_STYLE % (FAILED_COLOR, WHITE_COLOR))),
-        (ERROR, easyxf(CELL_STYLE % (ERROR_COLOR, WHITE_COLOR))),
-        (SKIPPED, easyxf(CELL_STYLE % (SKIPPED_COLOR, BLACK_COLOR))),
-        (EXPECTED_FAILURE, easyxf(CELL_STYLE % (EXPECTED_FAILURE_COLOR,
-                                               BLACK_COLOR))),
-        (UNEXPECTED_SUCCESS, easyxf(CELL_STYLE % (UNEXPECTED_SUCCESS_COLOR,
-                                                 BLACK_COLOR)))])
+        (content, easyxf(CELL_STYLE % colors))
+        for content, colors in CONTENT_TO_COLORS.iteritems()])
 
     LOCAL_DB_SKIP_MESSAGE = DBHandler.SKIP_DELTA_MESSAGE
     REMOTE_DB_SKIP_MESSAGE = RemoteDBHandler.SKIP_DELTA_MESSAGE
@@ -128,7 +134,8 @@ class ExcelHandler(AbstractResultHandler):
 
     MAX_SUMMERIZE_SIZE = len(CONTENT_TO_STYLE) + ROWS_TO_SKIP + 1
 
-    def __init__(self, main_test, output_file_path=None, *args, **kwargs):
+    def __init__(self, main_test, output_file_path=None, save_interval=None,
+                 *args, **kwargs):
         """Initialize Excel workbook and Sheet.
 
         Args:
@@ -136,6 +143,9 @@ class ExcelHandler(AbstractResultHandler):
                 or TestFlow instance).
             output_file_path (str): path to create the excel file in. Leave
                 None to create at the test's working dir with the default name.
+            save_interval (number): minimal seconds between saves of the file,
+                0 to save on every event. Leave None to use the configured
+                report save interval.
         """
         super(ExcelHandler, self).__init__(main_test)
 
@@ -146,10 +156,21 @@ class ExcelHandler(AbstractResultHandler):
             self.output_file_path = os.path.join(self.main_test.work_dir,
                                                  self.EXCEL_WORKBOOK_NAME)
 
+        self.workbook = None
+        self.sheet = None
+        self._create_workbook()
+        self.saver = ReportSaver(self._save_workbook, save_interval)
+
+    def _create_workbook(self):
+        """Create the Excel workbook and sheet."""
         self.workbook = xlwt.Workbook(encoding=self.EXCEL_FILE_ENCODING)
         self.sheet = self.workbook.add_sheet(self.EXCEL_SHEET_NAME,
                                              cell_overwrite_ok=True)
 
+    def _save_workbook(self):
+        """Write the workbook to the Excel file."""
+        self.workbook.save(self.output_file_path)
+
     def start_test(self, test):
         """Update the Excel that a test case starts.
 
@@ -157,8 +178,7 @@ class ExcelHandler(AbstractResultHandler):
             test (object): test item instance.
         """
         self._write_test_result(test)
-
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def stop_test(self, test):
         """Called when the given test has been run.
@@ -167,8 +187,7 @@ class ExcelHandler(AbstractResultHandler):
             test (object): test item instance.
         """
         self._write_test_result(test)
-
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def start_test_run(self):
         """Generate initial Excel report according to the root test.
@@ -181,26 +200,24 @@ class ExcelHandler(AbstractResultHandler):
         self._create_result_summary()
         self._align_columns()
 
-        self.workbook.save(self.output_file_path)
+        self.saver.save()
 
         self.row_number += 1
 
+    def stop_test_run(self):
+        """Save the remaining changes to the Excel file."""
+        self.saver.flush()
+
     def update_resources(self, test):
         """Write the test's resources to the Excel file.
 
         Args:
             test (object): test item instance.
         """
-        # write resources
-        if test.locked_resources is not None:
-            resources = '\n'.join("%s:%s" % (request_name, resource.name)
-                                  for (request_name, resource) in
-                                  test.locked_resources.iteritems())
-        else:
-            resources = ''
-
         self._write_to_cell(self.test_to_row[test.identifier], self.RESOURCES,
-                            self.DEFAULT_CELL_STYLE, resources)
+                            self.DEFAULT_CELL_STYLE,
+                            self._get_resources(test))
+        self.saver.update()
 
     def add_success(self, test):
         """Update the test Excel entry's result to success.
@@ -209,7 +226,7 @@ class ExcelHandler(AbstractResultHandler):
             test (object): test item instance.
         """
         self._write_test_result(test)
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def add_skip(self, test, reason):
         """Update the test Excel entry's result to skip.
@@ -219,7 +236,7 @@ class ExcelHandler(AbstractResultHandler):
             reason (str): skip reason description.
         """
         self._write_test_result(test)
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def add_failure(self, test, exception_str):
         """Update the test Excel entry's result to failure.
@@ -229,7 +246,7 @@ class ExcelHandler(AbstractResultHandler):
             exception_str (str): exception traceback string.
         """
         self._write_test_result(test)
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def add_error(self, test, exception_str):
         """Update the test Excel entry's result to error.
@@ -239,7 +256,7 @@ class ExcelHandler(AbstractResultHandler):
             exception_str (str): exception traceback string.
         """
         self._write_test_result(test)
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def add_expected_failure(self, test, exception_str):
         """Update the test Excel entry's result to expected failure.
@@ -249,7 +266,7 @@ class ExcelHandler(AbstractResultHandler):
             exception_str (str): exception traceback string.
         """
         self._write_test_result(test)
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def add_unexpected_success(self, test):
         """Update the test Excel entry's result to unexpected success.
@@ -258,7 +275,7 @@ class ExcelHandler(AbstractResultHandler):
             test (object): test item instance.
         """
         self._write_test_result(test)
-        self.workbook.save(self.output_file_path)
+        self.saver.update()
 
     def _generate_initial_excel(self, test):
         """Create an initial Excel test result.
@@ -295,29 +312,88 @@ class ExcelHandler(AbstractResultHandler):
             for sub_test in test:
                 self._generate_initial_excel(sub_test)
 
-    def _write_test_result(self, test):
-        """Write a single test entry to the Excel file.
+    def _get_test_status(self, test):
+        """Return the status of the test, as displayed in the report.
 
         Args:
             test (object): test item instance.
+
+        Returns:
+            tuple. the status (one of the keys of CONTENT_TO_STYLE) and its
+                description.
         """
-        # write result status
-        row_num = self.test_to_row[test.identifier]
         if test.data.exception_type is None:
             status = self.IN_PROGRESS
 
         else:
             status = self.RESULT_CHOICES[test.data.exception_type]
 
-        status_desc = status
-        tb_str = test.data.traceback
+        if (status == self.SKIPPED and
+                test.data.traceback in self.PASSED_MESSAGES):
 
-        if status == self.SKIPPED and tb_str in self.PASSED_MESSAGES:
-            status = status_desc = self.PASSED
+            status = self.PASSED
 
+        status_desc = status
         if isinstance(test, AbstractFlowComponent) and not test.is_main:
             status_desc = self.BLOCK_PREFIX + status
 
+        return status, status_desc
+
+    def _get_traceback(self, test):
+        """Return the traceback of the test, trimmed to fit in a cell.
+
+        Args:
+            test (object): test item instance.
+
+        Returns:
+            str. the end of the test's traceback.
+        """
+        tb_str = test.data.traceback
+        if tb_str is not None and len(tb_str) > self.MAX_TRACEBACK_LENGTH:
+            tb_str = tb_str[-1 * self.MAX_TRACEBACK_LENGTH:]
+
+        return tb_str
+
+    @staticmethod
+    def _get_phase_times(test):
+        """Return the description of the durations of the test's phases.
+
+        Args:
+            test (object): test item instance.
+
+        Returns:
+            str. the test's phases and their durations.
+        """
+        return format_durations(
+            load_phase_times(test.data.phase_times)["phases"])
+
+    @staticmethod
+    def _get_resources(test):
+        """Return the description of the test's locked resources.
+
+        Args:
+            test (object): test item instance.
+
+        Returns:
+            str. the request name and resource name of each locked resource.
+        """
+        if test.locked_resources is None:
+            return ''
+
+        return '\n'.join("%s:%s" % (request_name, resource.name)
+                         for (request_name, resource) in
+                         test.locked_resources.iteritems())
+
+    def _write_test_result(self, test):
+        """Write a single test entry to the Excel file.
+
+        Args:
+            test (object): test item instance.
+        """
+        # write result status
+        row_num = self.test_to_row[test.identifier]
+        status, status_desc = self._get_test_status(test)
+
         if test.data.start_time is not None:
             self._write_to_cell(row_num, self.START_TIME,
                                 self.DEFAULT_CELL_STYLE,
@@ -331,11 +407,12 @@ class ExcelHandler(AbstractResultHandler):
         self._write_to_cell(row_num, self.RESULT,
                             self.CONTENT_TO_STYLE[status], status_desc)
 
-        if tb_str is not None and len(tb_str) > self.MAX_TRACEBACK_LENGTH:
-            tb_str = tb_str[-1 * self.MAX_TRACEBACK_LENGTH:]
-
         self._write_to_cell(row_num, self.TRACEBACK,
-                            self.DEFAULT_CELL_STYLE, tb_str)
+                            self.DEFAULT_CELL_STYLE, self._get_traceback(test))
+
+        self._write_to_cell(row_num, self.PHASE_TIMES,
+                            self.DEFAULT_CELL_STYLE,
+                            self._get_phase_times(test))
 
         # set row's height
         self.sheet.row(row_num).height_mismatch = True
@@ -0,0 +1,87 @@
+"""Profiled tests summary result handler."""
+# pylint: disable=too-many-arguments,unused-argument
+from operator import itemgetter
+
+from rotest.core.utils.profiler import get_hot_functions
+from rotest.core.result.handlers.abstract_handler import AbstractResultHandler
+
+
+class ProfileHandler(AbstractResultHandler):
+    """Print the hot functions of the slowest profiled tests.
+
+    The tests are profiled when the run's 'profile' option is set (to either
+    'cprofile' or 'sampling'), and each test's profile is saved in its work
+    directory. At the end of the run, this handler prints the functions each
+    of the slowest tests spent the most time in.
+
+    Attributes:
+        SLOWEST_TESTS (number): default number of tests to print, used when
+            the run's 'profile_slowest' option isn't set.
+        HOT_FUNCTIONS (number): number of functions to print for each test.
+        stream (object): stream to write the summary to.
+        tests (list): the tests which aren't complex, by the order they ended.
+    """
+    NAME = 'profile'
+
+    SLOWEST_TESTS = 5
+    HOT_FUNCTIONS = 10
+    SEPERATOR = '=' * 70
+
+    def __init__(self, main_test=None, stream=None, *args, **kwargs):
+        super(ProfileHandler, self).__init__(main_test)
+        self.stream = stream
+        self.tests = []
+
+    def get_slowest_tests(self):
+        """Return the tests which took the longest to run.
+
+        Returns:
+            list. (test, duration in seconds) tuples, from the slowest test.
+        """
+        slowest_tests = self.SLOWEST_TESTS
+        config = getattr(self.main_test, "config", None)
+        if isinstance(config, dict):
+            slowest_tests = config.get("profile_slowest", slowest_tests)
+
+        durations = [(test, (test.data.end_time -
+                             test.data.start_time).total_seconds())
+                     for test in self.tests
+                     if test.data.start_time is not None and
+                     test.data.end_time is not None]
+
+        durations.sort(key=itemgetter(1), reverse=True)
+        return durations[:slowest_tests]
+
+    def stop_test(self, test):
+        """Save the test, to print its profile at the end of the run.
+
+        Args:
+            test (rotest.core.abstract_test.AbstractTest): test item instance.
+        """
+        if not test.IS_COMPLEX:
+            self.tests.append(test)
+
+    def print_errors(self, tests_run, errors, skipped, failures,
+                     expected_failures, unexpected_successes):
+        """Print the hot functions of the slowest tests to the stream."""
+        if self.stream is None:
+            return
+
+        slowest_tests = self.get_slowest_tests()
+        if len(slowest_tests) == 0:
+            return
+
+        self.stream.writeln(self.SEPERATOR)
+        self.stream.writeln("Slowest tests' hot functions (own time):")
+        for test, duration in slowest_tests:
+            self.stream.writeln("%s (%.2fs), profile in %s" %
+                                (test.data.name, duration, test.work_dir))
+
+            hot_functions = get_hot_functions(test.work_dir,
+                                              self.HOT_FUNCTIONS)
+            if len(hot_functions) == 0:
+                self.stream.writeln("    No profile was found")
+
+            for function, fraction in hot_functions:
+                self.stream.writeln("    %5.1f%%  %s" %
+                                    (fraction * 100, function))
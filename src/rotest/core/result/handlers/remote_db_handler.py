@@ -1,7 +1,22 @@
 """Remote database result handler."""
+# pylint: disable=too-many-instance-attributes
+import os
+import json
+import time
+from threading import Thread, Condition
+from collections import deque
+
+from requests import RequestException
+
+from rotest.common import core_log
 from rotest.core.models.case_data import TestOutcome
 from rotest.management.client.result_client import ClientResultManager
 from rotest.core.result.handlers.abstract_handler import AbstractResultHandler
+from rotest.api.test_control.add_test_events import (START_TEST, STOP_TEST,
+                                                     START_COMPOSITE,
+                                                     STOP_COMPOSITE,
+                                                     ADD_RESULT,
+                                                     UPDATE_RESOURCES)
 
 
 class RemoteDBHandler(AbstractResultHandler):
@@ -9,22 +24,276 @@ class RemoteDBHandler(AbstractResultHandler):
 
     Overrides result handler's methods to update a remote Rotest database
     values on each event change in the main result object.
+
+    The tests' events are not sent on the test's critical path. Instead they
+    are buffered and sent in ordered batches by a background uploader thread,
+    which retries sending them while the result server is unreachable.
+    Events that exceed the buffer's size are spilled to a file in the main
+    test's work directory (and loaded back in order), so a slow or briefly
+    unavailable server doesn't stall the run.
+
+    When the server fails applying a batch, none of its events are applied
+    (they're applied in a single transaction), so the batch is split and its
+    halves are sent again, until the failing events are sent on their own.
+    Such an event is dropped after MAX_EVENT_ATTEMPTS attempts, and the other
+    events of the batch are still sent.
+
+    Attributes:
+        MAX_BUFFERED_EVENTS (number): maximal number of events to keep in
+            memory before spilling them to the file.
+        BATCH_SIZE (number): maximal number of events to send in a request.
+        UPLOAD_INTERVAL (number): maximal seconds between two uploads.
+        RETRY_INTERVAL (number): seconds to wait before resending a batch.
+        MAX_EVENT_ATTEMPTS (number): times to send an event the server fails
+            on, before dropping it.
+        FLUSH_TIMEOUT (number): seconds to keep trying to send the remaining
+            events when the run ends.
+        SPILL_FILE_NAME (str): name of the events spill file.
+
+        tests_to_skip (set): identifiers of the tests that passed in their
+            last run, fetched at the start of delta runs.
     """
     NAME = 'remote'
     SKIP_DELTA_MESSAGE = "Previous run passed according to remote DB"
 
+    MAX_BUFFERED_EVENTS = 1000
+    BATCH_SIZE = 100
+    UPLOAD_INTERVAL = 1
+    RETRY_INTERVAL = 2
+    MAX_EVENT_ATTEMPTS = 3
+    FLUSH_TIMEOUT = 60
+    SPILL_FILE_NAME = "remote_events.spill"
+
     def __init__(self, *args, **kwargs):
         """Initialize the result handler and connect to the result server."""
         super(RemoteDBHandler, self).__init__(*args, **kwargs)
         self.client = ClientResultManager()
         self.client.connect()
 
+        self._stopped = False
+        self._uploader = None
+        self._events = deque()
+        self._events_condition = Condition()
+
+        self._spill_path = None
+        self._spill_offset = 0
+        self._spilled_events = 0
+
+        self.tests_to_skip = None
+
+    def _add_event(self, event, test, **parameters):
+        """Queue an event to be sent to the result server.
+
+        Args:
+            event (str): name of the event.
+            test (object): test item instance.
+            parameters (dict): parameters of the event.
+        """
+        parameters.update(event=event, test_id=test.identifier,
+                          time=time.time())
+
+        with self._events_condition:
+            if (self._spilled_events > 0 or
+                    len(self._events) >= self.MAX_BUFFERED_EVENTS):
+
+                self._spill_event(parameters)
+
+            else:
+                self._events.append(parameters)
+
+            if len(self._events) >= self.BATCH_SIZE:
+                self._events_condition.notify()
+
+    def _spill_event(self, event):
+        """Write an event to the spill file, to be sent later.
+
+        Args:
+            event (dict): the event to spill.
+        """
+        if self._spill_path is None:
+            self._spill_path = os.path.join(self.main_test.work_dir,
+                                            self.SPILL_FILE_NAME)
+
+        with open(self._spill_path, "ab") as spill_file:
+            spill_file.write(json.dumps(event) + "\n")
+
+        self._spilled_events += 1
+
+    def _load_spilled_events(self):
+        """Move the next spilled events (by order) into the buffer."""
+        with open(self._spill_path, "rb") as spill_file:
+            spill_file.seek(self._spill_offset)
+            for _ in xrange(min(self.BATCH_SIZE, self._spilled_events)):
+                self._events.append(json.loads(spill_file.readline()))
+                self._spilled_events -= 1
+
+            self._spill_offset = spill_file.tell()
+
+        if self._spilled_events == 0:
+            os.remove(self._spill_path)
+            self._spill_offset = 0
+
+    def _get_batch(self):
+        """Return the next batch of events to send (without removing it).
+
+        Returns:
+            list. the oldest pending events, up to BATCH_SIZE events.
+        """
+        with self._events_condition:
+            if len(self._events) == 0 and self._spilled_events > 0:
+                self._load_spilled_events()
+
+            return list(self._events)[:self.BATCH_SIZE]
+
+    def _remove_events(self, amount):
+        """Remove the oldest pending events, once they were handled.
+
+        Args:
+            amount (number): number of events to remove.
+        """
+        with self._events_condition:
+            for _ in xrange(amount):
+                self._events.popleft()
+
+    def _send_event(self, event):
+        """Send a single event, dropping it if the server keeps failing on it.
+
+        Args:
+            event (dict): the event to send.
+
+        Raises:
+            requests.RequestException: the result server is unreachable.
+        """
+        for attempt in xrange(1, self.MAX_EVENT_ATTEMPTS + 1):
+            try:
+                self.client.add_test_events([event])
+                break
+
+            except (RuntimeError, KeyError, ValueError) as error:
+                core_log.warning("Result server failed on event %r (attempt "
+                                 "%d of %d): %s", event["event"], attempt,
+                                 self.MAX_EVENT_ATTEMPTS, error)
+
+        else:
+            core_log.error("Dropping event %r of test %r, after the result "
+                           "server failed on it %d times", event["event"],
+                           event["test_id"], self.MAX_EVENT_ATTEMPTS)
+
+        self._remove_events(1)
+
+    def _send_events(self, events):
+        """Send events to the result server, isolating the failing ones.
+
+        Sent and dropped events are removed from the pending events right
+        away, so they aren't sent again if the server becomes unreachable.
+
+        Args:
+            events (list): the oldest pending events, in order.
+
+        Raises:
+            requests.RequestException: the result server is unreachable.
+        """
+        if len(events) == 1:
+            self._send_event(events[0])
+            return
+
+        try:
+            self.client.add_test_events(events)
+
+        except (RuntimeError, KeyError, ValueError) as error:
+            core_log.warning("Result server failed on a batch of %d events, "
+                             "sending it in parts: %s", len(events), error)
+            middle = len(events) // 2
+            self._send_events(events[:middle])
+            self._send_events(events[middle:])
+            return
+
+        self._remove_events(len(events))
+
+    def _send_batch(self, batch):
+        """Send a batch of events to the result server.
+
+        Args:
+            batch (list): events to send.
+
+        Returns:
+            bool. True if the batch was handled (sent, or its failing events
+                dropped), False if the server is unreachable and the remaining
+                events should be sent again.
+        """
+        try:
+            self._send_events(batch)
+
+        except RequestException as error:
+            core_log.warning("Failed sending events to the result server, "
+                             "retrying in %d seconds: %s",
+                             self.RETRY_INTERVAL, error)
+            return False
+
+        return True
+
+    def _has_pending_events(self):
+        """Return whether there are events that weren't sent yet.
+
+        Returns:
+            bool. True if there are pending events.
+        """
+        with self._events_condition:
+            return len(self._events) > 0 or self._spilled_events > 0
+
+    def _upload_events(self):
+        """Send the pending events periodically, until the run stops."""
+        while True:
+            with self._events_condition:
+                if self._stopped:
+                    return
+
+                if len(self._events) < self.BATCH_SIZE:
+                    self._events_condition.wait(self.UPLOAD_INTERVAL)
+
+            batch = self._get_batch()
+            if len(batch) > 0 and not self._send_batch(batch):
+                time.sleep(self.RETRY_INTERVAL)
+
+    def flush(self, timeout=FLUSH_TIMEOUT):
+        """Send all the pending events to the result server.
+
+        Args:
+            timeout (number): seconds to keep trying to send the events.
+        """
+        end_time = time.time() + timeout
+        while self._has_pending_events():
+            if not self._send_batch(self._get_batch()):
+                if time.time() > end_time:
+                    core_log.error("Couldn't send the remaining events to "
+                                   "the result server")
+                    return
+
+                time.sleep(self.RETRY_INTERVAL)
+
     def start_test_run(self):
         """Save all the test datas and the run data in the remote db."""
         self.client.start_test_run(self.main_test)
+        if self.main_test.data.run_data.run_delta:
+            self.tests_to_skip = self.client.get_delta_manifest()
+
+        self._stopped = False
+        self._uploader = Thread(target=self._upload_events,
+                                name="RemoteEventsUploader")
+        self._uploader.daemon = True
+        self._uploader.start()
 
     def stop_test_run(self):
-        """Disconnect from the result server."""
+        """Send the remaining events and disconnect from the result server."""
+        if self._uploader is not None:
+            with self._events_condition:
+                self._stopped = True
+                self._events_condition.notify()
+
+            self._uploader.join()
+            self._uploader = None
+
+        self.flush(self.FLUSH_TIMEOUT)
         self.client.update_run_data(self.main_test.data.run_data)
         self.client.disconnect()
 
@@ -34,13 +303,14 @@ class RemoteDBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        self.client.start_test(test)
+        self._add_event(START_TEST, test)
 
     def should_skip(self, test):
         """Check if the test passed in the last run according to the remote DB.
 
-        The result is based on querying the results DB for the last run. If the
-        last run was successful, then the test should be skipped.
+        The result is based on the last runs' outcomes, which are queried from
+        the results DB once, when the run starts. If the last run was
+        successful, then the test should be skipped.
 
         Args:
             test (object): test item instance.
@@ -48,8 +318,8 @@ class RemoteDBHandler(AbstractResultHandler):
         Returns:
             str. Skip reason if the test should be skipped, None otherwise.
         """
-        if (test.data.run_data is not None and test.data.run_data.run_delta and
-                self.client.should_skip(test)):
+        if (self.tests_to_skip is not None and
+                test.identifier in self.tests_to_skip):
 
             return self.SKIP_DELTA_MESSAGE
 
@@ -61,7 +331,8 @@ class RemoteDBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        self.client.update_resources(test)
+        descriptors = self.client.get_resources_descriptors(test)
+        self._add_event(UPDATE_RESOURCES, test, descriptors=descriptors)
 
     def stop_test(self, test):
         """Finalize the remote test's data.
@@ -69,7 +340,7 @@ class RemoteDBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        self.client.stop_test(test)
+        self._add_event(STOP_TEST, test, phase_times=test.data.phase_times)
 
     def start_composite(self, test):
         """Update the remote test data to 'in progress' and set the start time.
@@ -77,7 +348,7 @@ class RemoteDBHandler(AbstractResultHandler):
         Args:
             test (rotest.core.suite.TestSuite): test item instance.
         """
-        self.client.start_composite(test)
+        self._add_event(START_COMPOSITE, test)
 
     def stop_composite(self, test):
         """Save the remote composite test's data.
@@ -85,7 +356,7 @@ class RemoteDBHandler(AbstractResultHandler):
         Args:
             test (rotest.core.suite.TestSuite): test item instance.
         """
-        self.client.stop_composite(test)
+        self._add_event(STOP_COMPOSITE, test)
 
     def add_success(self, test):
         """Save the remote test data result as success.
@@ -93,7 +364,7 @@ class RemoteDBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        self.client.add_result(test, TestOutcome.SUCCESS)
+        self._add_event(ADD_RESULT, test, result_code=TestOutcome.SUCCESS)
 
     def add_skip(self, test, reason):
         """Save the remote test data result as skip.
@@ -102,7 +373,8 @@ class RemoteDBHandler(AbstractResultHandler):
             test (object): test item instance.
             reason (str): skip reason description.
         """
-        self.client.add_result(test, TestOutcome.SKIPPED, reason)
+        self._add_event(ADD_RESULT, test, result_code=TestOutcome.SKIPPED,
+                        info=reason)
 
     def add_failure(self, test, exception_str):
         """Save the remote test data result as failure.
@@ -111,8 +383,8 @@ class RemoteDBHandler(AbstractResultHandler):
             test (object): test item instance.
             exception_str (str): exception traceback string.
         """
-        self.client.add_result(test, TestOutcome.FAILED,
-                               exception_str)
+        self._add_event(ADD_RESULT, test, result_code=TestOutcome.FAILED,
+                        info=exception_str)
 
     def add_error(self, test, exception_str):
         """Save the remote test data result as error.
@@ -121,8 +393,8 @@ class RemoteDBHandler(AbstractResultHandler):
             test (object): test item instance.
             exception_str (str): exception traceback string.
         """
-        self.client.add_result(test, TestOutcome.ERROR,
-                               exception_str)
+        self._add_event(ADD_RESULT, test, result_code=TestOutcome.ERROR,
+                        info=exception_str)
 
     def add_expected_failure(self, test, exception_str):
         """Save the remote test data result as expected failure.
@@ -131,8 +403,9 @@ class RemoteDBHandler(AbstractResultHandler):
             test (object): test item instance.
             exception_str (str): exception traceback string.
         """
-        self.client.add_result(test, TestOutcome.EXPECTED_FAILURE,
-                               exception_str)
+        self._add_event(ADD_RESULT, test,
+                        result_code=TestOutcome.EXPECTED_FAILURE,
+                        info=exception_str)
 
     def add_unexpected_success(self, test):
         """Save the remote test data result as unexpected success.
@@ -140,4 +413,5 @@ class RemoteDBHandler(AbstractResultHandler):
         Args:
             test (object): test item instance.
         """
-        self.client.add_result(test, TestOutcome.UNEXPECTED_SUCCESS)
+        self._add_event(ADD_RESULT, test,
+                        result_code=TestOutcome.UNEXPECTED_SUCCESS)
@@ -0,0 +1,55 @@
+"""Debounced saving of report files."""
+import time
+
+from rotest.common.config import REPORT_SAVE_INTERVAL
+
+
+class ReportSaver(object):
+    """Save a report that is built in memory once in a while.
+
+    Reports that are rewritten as a whole on every save (e.g. Excel files)
+    would make the report generation quadratic in the run's size if they
+    were saved on every test event. Instead, the changes are accumulated and
+    the report is saved when enough time has passed or enough events have
+    occurred since the last save.
+
+    Attributes:
+        save_method (function): method that writes the report to the disk.
+        save_interval (number): minimal seconds between two saves, 0 to save
+            on every event.
+        max_pending_events (number): events after which the report is saved,
+            regardless of the time passed.
+    """
+    MAX_PENDING_EVENTS = 500
+
+    def __init__(self, save_method, save_interval=None,
+                 max_pending_events=MAX_PENDING_EVENTS):
+        if save_interval is None:
+            save_interval = REPORT_SAVE_INTERVAL
+
+        self.save_method = save_method
+        self.save_interval = save_interval
+        self.max_pending_events = max_pending_events
+
+        self._pending_events = 0
+        self._last_save_time = time.time()
+
+    def update(self):
+        """Register a change in the report, and save it if it's time to."""
+        self._pending_events += 1
+
+        if (self._pending_events >= self.max_pending_events or
+                time.time() - self._last_save_time >= self.save_interval):
+
+            self.save()
+
+    def flush(self):
+        """Save the report if it has unsaved changes."""
+        if self._pending_events > 0:
+            self.save()
+
+    def save(self):
+        """Save the report now."""
+        self.save_method()
+        self._pending_events = 0
+        self._last_save_time = time.time()
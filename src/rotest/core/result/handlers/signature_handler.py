@@ -1,11 +1,11 @@
 """Known issues result handler."""
-import re
 import os
 
 import xlwt
 from xlwt.Style import easyxf
 
-from rotest.core.models.signature import SignatureData
+from rotest.core.signature_matcher import get_signature_matcher
+from rotest.core.result.handlers.report_saver import ReportSaver
 from rotest.core.result.handlers.abstract_handler import AbstractResultHandler
 
 
@@ -46,26 +46,40 @@ class SignatureHandler(AbstractResultHandler):
     EXCEL_SHEET_NAME = "MatchingSignatures"
     EXCEL_WORKBOOK_NAME = "signatures.xls"
 
-    def __init__(self, main_test=None, *args, **kwargs):
+    def __init__(self, main_test=None, save_interval=None, *args, **kwargs):
         """Initialize the result handler.
 
         Note:
-            Loads the signatures from the DB.
+            Loads the precompiled signatures of the DB.
 
         Args:
             main_test (object): the main test instance.
+            save_interval (number): minimal seconds between saves of the file,
+                0 to save on every match. Leave None to use the configured
+                report save interval.
         """
         super(SignatureHandler, self).__init__(main_test, *args, **kwargs)
 
         self.row_number = 0
-        self.signatures = SignatureData.objects.all()
+        self.matcher = get_signature_matcher()
         self.output_file_path = os.path.join(self.main_test.work_dir,
                                              self.EXCEL_WORKBOOK_NAME)
 
+        self.workbook = None
+        self.sheet = None
+        self._create_workbook()
+        self.saver = ReportSaver(self._save_workbook, save_interval)
+        self._prepare_excel_file()
+
+    def _create_workbook(self):
+        """Create the Excel workbook and sheet."""
         self.workbook = xlwt.Workbook(encoding=self.EXCEL_FILE_ENCODING)
         self.sheet = self.workbook.add_sheet(self.EXCEL_SHEET_NAME,
                                              cell_overwrite_ok=True)
-        self._prepare_excel_file()
+
+    def _save_workbook(self):
+        """Write the workbook to the Excel file."""
+        self.workbook.save(self.output_file_path)
 
     def _write_to_cell(self, header, style, content):
         """Write content to a specific cell.
@@ -95,7 +109,7 @@ class SignatureHandler(AbstractResultHandler):
         self._write_headers()
         self._align_columns()
 
-        self.workbook.save(self.output_file_path)
+        self.saver.save()
 
     def _match_signatures(self, exception_str):
         """Return the name of the matched signature.
@@ -106,11 +120,7 @@ class SignatureHandler(AbstractResultHandler):
         Returns:
             SignatureData. the signature of the given exception.
         """
-        for signature in self.signatures:
-            signature_reg = re.compile(signature.pattern,
-                                       re.DOTALL | re.MULTILINE)
-            if signature_reg.match(exception_str):
-                return signature
+        return self.matcher.match(exception_str)
 
     def _register_result_of_known_issues(self, test, exception_str):
         """Register the name of the matched signature.
@@ -143,7 +153,11 @@ class SignatureHandler(AbstractResultHandler):
 
             self.row_number += 1
 
-            self.workbook.save(self.output_file_path)
+            self.saver.update()
+
+    def stop_test_run(self):
+        """Save the remaining matches to the Excel file."""
+        self.saver.flush()
 
     def add_error(self, test, exception_str):
         """Check if the test error matches any known issues.
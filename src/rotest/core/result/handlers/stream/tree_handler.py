@@ -1,7 +1,9 @@
 """Tree format stream output handler."""
 # pylint: disable=invalid-name,too-few-public-methods,arguments-differ
 # pylint: disable=too-many-arguments,super-init-not-called,unused-argument
-from rotest.common.constants import GREEN, YELLOW, RED, BOLD, CYAN, BLUE
+from rotest.common.timing import format_durations
+from rotest.common.constants import (GREEN, YELLOW, RED, BOLD, CYAN, BLUE,
+                                     GREY)
 from rotest.core.result.handlers.stream.base_handler import \
                                                 BaseStreamHandler, NEW_LINE
 
@@ -10,7 +12,8 @@ class TreeHandler(BaseStreamHandler):
     """Stream tree layout result handler.
 
     Overrides result handler's methods to print each event change in
-    the main result object in a tree layout to the given stream.
+    the main result object in a tree layout to the given stream, with the
+    durations of the phases of each test case and block.
     """
     NAME = 'tree'
 
@@ -37,6 +40,16 @@ class TreeHandler(BaseStreamHandler):
         """
         self.stream.write(NEW_LINE + self.get_description(test))
 
+    def stop_test(self, test):
+        """Write the durations of the test's phases to the stream.
+
+        Args:
+            test (TestCase): test item instance.
+        """
+        if not test.IS_COMPLEX and len(test.phase_timer.phases) > 0:
+            self.stream.write(
+                "(%s)" % format_durations(test.phase_timer.phases), GREY)
+
     def start_composite(self, test):
         """Called when the given TestSuite or TestCase is about to be run.
 
@@ -0,0 +1,319 @@
+"""Streaming XLSX result handlers.
+
+Unlike the xlwt based handlers, which keep the whole workbook in memory and
+are limited to 65,536 rows, these handlers write .xlsx files row by row in
+constant memory. Since written rows can't be changed, the results report is
+written once the run ends, while the signatures report rows are written as
+the matches are found.
+"""
+# pylint: disable=unused-argument
+import xlsxwriter
+
+from rotest.core.suite import TestSuite
+from rotest.core.models.case_data import CaseData
+from rotest.core.flow_component import AbstractFlowComponent
+from rotest.core.result.handlers.excel_handler import ExcelHandler
+from rotest.core.result.handlers.signature_handler import SignatureHandler
+
+# RGB values of the xlwt colors used by the Excel handlers
+COLOR_TO_RGB = {"black": "#000000",
+                "white": "#FFFFFF",
+                "red": "#FF0000",
+                "lime": "#99CC00",
+                "brown": "#993300",
+                "yellow": "#FFFF00",
+                "grey25": "#C0C0C0",
+                "dark_red": "#800000",
+                "turquoise": "#00FFFF",
+                "bright_green": "#00FF00"}
+
+THIN_BORDER = 1
+THICK_BORDER = 5
+TWIPS_IN_POINT = 20
+
+
+def create_workbook(file_path):
+    """Create a workbook which is written to the file row by row.
+
+    Args:
+        file_path (str): path of the .xlsx file to create.
+
+    Returns:
+        xlsxwriter.Workbook. the created workbook.
+    """
+    return xlsxwriter.Workbook(file_path, {"constant_memory": True,
+                                           "strings_to_formulas": False})
+
+
+def create_cell_format(workbook, background_color, font_color):
+    """Create the format of a regular cell.
+
+    Args:
+        workbook (xlsxwriter.Workbook): workbook to create the format in.
+        background_color (str): xlwt name of the cell's color.
+        font_color (str): xlwt name of the cell's font color.
+
+    Returns:
+        xlsxwriter.format.Format. the cell's format.
+    """
+    return workbook.add_format({"pattern": 1,
+                                "border": THIN_BORDER,
+                                "bg_color": COLOR_TO_RGB[background_color],
+                                "font_color": COLOR_TO_RGB[font_color]})
+
+
+def create_header_format(workbook, row_height):
+    """Create the format of a header cell.
+
+    Args:
+        workbook (xlsxwriter.Workbook): workbook to create the format in.
+        row_height (number): height of the header's font, in twips.
+
+    Returns:
+        xlsxwriter.format.Format. the header's format.
+    """
+    return workbook.add_format({"bold": True,
+                                "border": THICK_BORDER,
+                                "font_size": row_height / TWIPS_IN_POINT})
+
+
+class XlsxHandler(ExcelHandler):
+    """Streaming XLSX result handler.
+
+    Generates the same report as the Excel handler (columns, colors and
+    results summary), in an .xlsx file that is written once the run ends.
+
+    Attributes:
+        style_to_format (dict): match between the xlwt styles of the Excel
+            handler and the matching xlsx formats.
+        test_to_resources (dict): match between test identifier and the
+            description of its locked resources.
+    """
+    NAME = 'xlsx'
+
+    EXCEL_WORKBOOK_NAME = "results.xlsx"
+
+    def __init__(self, *args, **kwargs):
+        self.style_to_format = {}
+        self.test_to_resources = {}
+        super(XlsxHandler, self).__init__(*args, **kwargs)
+
+    def _create_workbook(self):
+        """Create the XLSX workbook, sheet and cells formats."""
+        self.workbook = create_workbook(self.output_file_path)
+        self.sheet = self.workbook.add_worksheet(self.EXCEL_SHEET_NAME)
+
+        self.style_to_format = {
+            self.DEFAULT_CELL_STYLE: create_cell_format(self.workbook,
+                                                        self.DEFAULT_COLOR,
+                                                        self.BLACK_COLOR),
+            self.BOLDED_CELL_STYLE: create_header_format(self.workbook,
+                                                         self.ROW_HEIGHT)}
+
+        for content, (color, font_color) in self.CONTENT_TO_COLORS.items():
+            self.style_to_format[self.CONTENT_TO_STYLE[content]] = \
+                create_cell_format(self.workbook, color, font_color)
+
+    def _save_workbook(self):
+        """Do nothing, since the file is written once, when the run ends."""
+        pass
+
+    def start_test_run(self):
+        """Do nothing, since the report is written once the run ends."""
+        pass
+
+    def stop_test_run(self):
+        """Write the report and close the XLSX file."""
+        self._align_columns()
+        self._write_headers()
+        self._write_tests_rows(self.main_test)
+        self._create_result_summary()
+
+        self.workbook.close()
+
+    def update_resources(self, test):
+        """Save the test's resources for the report.
+
+        Args:
+            test (object): test item instance.
+        """
+        self.test_to_resources[test.identifier] = self._get_resources(test)
+
+    def _write_test_result(self, test):
+        """Do nothing, since the results are written when the run ends.
+
+        Args:
+            test (object): test item instance.
+        """
+        pass
+
+    def _write_tests_rows(self, test):
+        """Write the rows of the test and its sub tests, with their results.
+
+        Args:
+            test (object): test item instance.
+        """
+        self.row_number += 1
+
+        self._write_to_cell(self.row_number, self.NAME_HEADER,
+                            self.DEFAULT_CELL_STYLE,
+                            (test.parents_count * self.SPACES) +
+                            test.data.name)
+
+        self._write_to_cell(self.row_number, self.DESCRIPTION,
+                            self.DEFAULT_CELL_STYLE,
+                            test.__doc__)
+
+        if not isinstance(test, TestSuite):
+            self.test_to_row[test.identifier] = self.row_number
+            self.sheet.set_row(self.row_number,
+                               self.ROW_HEIGHT / TWIPS_IN_POINT)
+
+            if isinstance(test.data, CaseData):
+                self._write_test_row_result(test)
+
+            else:
+                self._write_to_cell(self.row_number, self.RESULT,
+                                    self.CONTENT_TO_STYLE[self.DID_NOT_RUN],
+                                    self.DID_NOT_RUN)
+
+        if test.IS_COMPLEX:
+            for sub_test in test:
+                self._write_tests_rows(sub_test)
+
+    def _write_test_row_result(self, test):
+        """Write the result, times, traceback, resources and phases of a test.
+
+        Args:
+            test (object): test item instance.
+        """
+        if (test.data.exception_type is None and
+                test.data.start_time is None):
+
+            status = status_desc = self.DID_NOT_RUN
+            if isinstance(test, AbstractFlowComponent) and not test.is_main:
+                status_desc = self.BLOCK_PREFIX + status
+
+        else:
+            status, status_desc = self._get_test_status(test)
+
+        self._write_to_cell(self.row_number, self.RESULT,
+                            self.CONTENT_TO_STYLE[status], status_desc)
+
+        if test.data.start_time is not None:
+            self._write_to_cell(self.row_number, self.START_TIME,
+                                self.DEFAULT_CELL_STYLE,
+                                str(test.data.start_time))
+
+        if test.data.end_time is not None:
+            self._write_to_cell(self.row_number, self.END_TIME,
+                                self.DEFAULT_CELL_STYLE,
+                                str(test.data.end_time))
+
+        self._write_to_cell(self.row_number, self.TRACEBACK,
+                            self.DEFAULT_CELL_STYLE,
+                            self._get_traceback(test))
+
+        self._write_to_cell(self.row_number, self.RESOURCES,
+                            self.DEFAULT_CELL_STYLE,
+                            self.test_to_resources.get(test.identifier, ''))
+
+        self._write_to_cell(self.row_number, self.PHASE_TIMES,
+                            self.DEFAULT_CELL_STYLE,
+                            self._get_phase_times(test))
+
+    def _write_to_cell(self, row_number, header, style, content):
+        """Write content to a specific cell.
+
+        Args:
+            row_number (number): cell's row number.
+            header (str): header of the cell's column.
+            style (xlwt.Style): the Excel handler's style of the cell.
+            content (str): content to be written to the cell.
+        """
+        self.sheet.write(row_number, self.HEADERS.index(header), content,
+                         self.style_to_format[style])
+
+    def _align_columns(self):
+        """Align the columns width."""
+        for header, col_width in self.HEADER_TO_WIDTH.items():
+            column = self.HEADERS.index(header)
+            self.sheet.set_column(column, column,
+                                  float(col_width) / self.CHAR_LENGTH)
+
+    def _create_result_summary(self):
+        """Create result summary at the end of the Excel report."""
+        self.row_number += self.ROWS_TO_SKIP
+
+        for result_type in self.CONTENT_TO_STYLE:
+            self._write_to_cell(self.row_number,
+                                self.SUMMARY_RESULT_TYPE_COLUMN,
+                                self.CONTENT_TO_STYLE[result_type],
+                                result_type)
+
+            formula = "=" + self.FORMULA_PATTERN % (self.RESULT_COLUMN,
+                                                    self.RESULT_COLUMN,
+                                                    self.row_number,
+                                                    result_type)
+            self.sheet.write_formula(
+                self.row_number,
+                self.HEADERS.index(self.SUMMARY_RESULT_COUNTER_COLUMN),
+                formula,
+                self.style_to_format[self.DEFAULT_CELL_STYLE])
+
+            self.row_number += 1
+
+
+class XlsxSignatureHandler(SignatureHandler):
+    """Streaming XLSX failures signatures result handler.
+
+    Writes each match to the .xlsx file once it's found. The file is complete
+    once the run ends.
+
+    Attributes:
+        style_to_format (dict): match between the xlwt styles of the
+            signatures handler and the matching xlsx formats.
+    """
+    NAME = 'xlsx_signature'
+
+    EXCEL_WORKBOOK_NAME = "signatures.xlsx"
+
+    def __init__(self, *args, **kwargs):
+        self.style_to_format = {}
+        super(XlsxSignatureHandler, self).__init__(*args, **kwargs)
+
+    def _create_workbook(self):
+        """Create the XLSX workbook, sheet and cells formats."""
+        self.workbook = create_workbook(self.output_file_path)
+        self.sheet = self.workbook.add_worksheet(self.EXCEL_SHEET_NAME)
+
+        self.style_to_format = {
+            self.DEFAULT_CELL_STYLE: create_cell_format(self.workbook,
+                                                        self.DEFAULT_COLOR,
+                                                        self.BLACK_COLOR),
+            self.BOLDED_CELL_STYLE: create_header_format(self.workbook,
+                                                         self.ROW_HEIGHT)}
+
+    def _save_workbook(self):
+        """Do nothing, since the rows are written as they are added."""
+        pass
+
+    def stop_test_run(self):
+        """Close the XLSX file."""
+        self.workbook.close()
+
+    def _write_to_cell(self, header, style, content):
+        """Write content to a specific cell.
+
+        Args:
+            header (str): header of the cell's column.
+            style (xlwt.Style): the signatures handler's style of the cell.
+            content (str): content to be written to the cell.
+        """
+        self.sheet.write(self.row_number, self.HEADERS.index(header), content,
+                         self.style_to_format[style])
+
+    def _align_columns(self):
+        """Align the columns width."""
+        self.sheet.set_column(0, len(self.HEADERS) - 1,
+                              float(self.COL_WIDTH) / self.CHAR_LENGTH)
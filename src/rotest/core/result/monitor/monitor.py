@@ -9,6 +9,7 @@ from functools import wraps
 from rotest.core.case import TestCase
 from rotest.core.flow import TestFlow
 from rotest.core.block import TestBlock
+from rotest.core.utils.metrics import MetricBuffer
 from rotest.core.result.monitor.server import MonitorServer
 from rotest.core.result.handlers.abstract_handler import AbstractResultHandler
 
@@ -85,10 +86,17 @@ class AbstractMonitor(AbstractResultHandler):
     if not implemented, the monitor will be a basic one (cyclic monitors can
     react to tests' event too).
 
+    Monitors can record the values they sample using 'record_metric'. The
+    samples are written to the test's work directory when it ends, and their
+    statistics are available to the result handlers using
+    :func:`rotest.core.utils.metrics.get_metrics_summary`.
+
     Attributes:
         CYCLE (number): sleep time in seconds between monitor runs.
         SINGLE_FAILURE (bool): whether to continue running the monitor after
             it had failed or not.
+        METRICS_CAPACITY (number): maximal amount of samples kept for each
+            metric of a test, older samples are dropped.
 
     Note:
         When running in multiprocess, regular output handlers will be used by
@@ -98,6 +106,7 @@ class AbstractMonitor(AbstractResultHandler):
     """
     SINGLE_FAILURE = True
     CYCLE = NotImplemented
+    METRICS_CAPACITY = 3600
 
     def __init__(self, *args, **kwargs):
         super(AbstractMonitor, self).__init__(*args, **kwargs)
@@ -148,7 +157,25 @@ class AbstractMonitor(AbstractResultHandler):
                 (isinstance(test, TestFlow) and test.is_main):
 
             test.logger.debug("Unregistering monitor %r", self.NAME)
-            MonitorServer.unregister_monitor(self)
+            MonitorServer.unregister_monitor(self, test)
+
+    def record_metric(self, test, name, value, typecode="d"):
+        """Record a sample of a metric of the test.
+
+        Args:
+            test (object): test item instance.
+            name (str): name of the metric, e.g. 'cpu_percent'.
+            value (number): the sampled value.
+            typecode (str): array typecode of the metric's values, used when
+                recording its first sample, e.g. 'd' for floats or 'L' for
+                counters.
+        """
+        metric = test.metrics.get(name)
+        if metric is None:
+            metric = test.metrics.setdefault(
+                name, MetricBuffer(name, typecode, self.METRICS_CAPACITY))
+
+        metric.record(value)
 
     def fail_test(self, test, message):
         """Add a monitor failure to the test without stopping it.
@@ -1,30 +1,145 @@
 """Monitors management module."""
+import os
+import time
+import heapq
+from itertools import count
 from functools import partial
-from threading import Event, Thread
+from multiprocessing.pool import ThreadPool
+from threading import Event, Thread, Condition, Lock
 
 
-class RepeatingTimer(Thread):
-    """A cyclic timer thread."""
+class MonitorRegistration(object):
+    """A cyclic monitor run of a test.
+
+    Attributes:
+        cycle (number): sleep time in seconds between the runs.
+        func (function): the monitor run.
+        cancelled (bool): whether the registration was cancelled.
+        idle (threading.Event): set while the monitor isn't running.
+    """
     def __init__(self, cycle, func, *args, **kwargs):
-        Thread.__init__(self)
-        self.daemon = True
         self.cycle = cycle
         self.func = partial(func, *args, **kwargs)
-        self.finished = Event()
+        self.cancelled = False
+        self.idle = Event()
+        self.idle.set()
+
+
+class MonitorScheduler(Thread):
+    """Thread which runs all the cyclic monitors, by a time-ordered heap.
+
+    The scheduler only dispatches the due monitors' runs to a small pool of
+    worker threads, so slow monitors don't delay the others. Each monitor
+    run is scheduled again CYCLE seconds after it ends.
+
+    Cancelled registrations are left in the heap and discarded when they
+    reach its top, so both scheduling and cancelling take O(log n).
+    """
+    MAX_WORKERS = 4
+
+    def __init__(self, workers=MAX_WORKERS):
+        super(MonitorScheduler, self).__init__(name="MonitorScheduler")
+        self.daemon = True
+
+        self._heap = []
+        self._counter = count()
+        self._condition = Condition()
+        self._pool = ThreadPool(workers)
+
+    def schedule(self, registration, delay=0):
+        """Schedule a run of the monitor.
+
+        Args:
+            registration (MonitorRegistration): the monitor to run.
+            delay (number): seconds to wait before running it.
+        """
+        with self._condition:
+            # The counter keeps registrations with the same time from being
+            # compared to each other
+            heapq.heappush(self._heap, (time.time() + delay,
+                                        next(self._counter), registration))
+            self._condition.notify()
+
+    def cancel(self, registration):
+        """Cancel the monitor's runs, and wait for its current run to end.
+
+        The registration is cancelled under the scheduler's lock, so once it
+        is, the scheduler can't dispatch another run of the monitor.
+
+        Args:
+            registration (MonitorRegistration): the monitor to cancel.
+        """
+        with self._condition:
+            registration.cancelled = True
+
+        registration.idle.wait()
 
     def run(self):
-        while not self.finished.is_set():
-            self.func()
-            self.finished.wait(self.cycle)
+        """Dispatch the monitors' runs when they are due."""
+        while True:
+            with self._condition:
+                if len(self._heap) == 0:
+                    self._condition.wait()
+                    continue
+
+                run_time, _, registration = self._heap[0]
+                if registration.cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+
+                delay = run_time - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                registration.idle.clear()
+
+            self._pool.apply_async(self._run_monitor, (registration,))
+
+    def _run_monitor(self, registration):
+        """Run the monitor and schedule its next run.
+
+        Args:
+            registration (MonitorRegistration): the monitor to run.
+        """
+        try:
+            if not registration.cancelled:
+                registration.func()
 
-    def cancel(self):
-        self.finished.set()
+        finally:
+            registration.idle.set()
+            if not registration.cancelled:
+                self.schedule(registration, registration.cycle)
 
 
 class MonitorServer(object):
-    """Monitors manager class, for activating and deactivating monitors."""
+    """Monitors manager class, for activating and deactivating monitors.
+
+    All the cyclic monitors of the process are run by a single scheduler.
+    """
     MONITORS = {}
 
+    _scheduler = None
+    _scheduler_pid = None
+    _scheduler_lock = Lock()
+
+    @classmethod
+    def get_scheduler(cls):
+        """Return the scheduler of this process, starting it if needed.
+
+        Returns:
+            MonitorScheduler. the running scheduler.
+        """
+        with cls._scheduler_lock:
+            # Forked worker processes don't inherit the scheduler's thread
+            if cls._scheduler is None or cls._scheduler_pid != os.getpid():
+                cls._scheduler = MonitorScheduler()
+                cls._scheduler_pid = os.getpid()
+                cls._scheduler.start()
+
+            return cls._scheduler
+
     @classmethod
     def register_monitor(cls, monitor, test):
         """Start monitor.
@@ -33,21 +148,30 @@ class MonitorServer(object):
             monitor (AbstractMonitor): monitor instance.
             test (object): test item instance.
         """
-        timer = RepeatingTimer(monitor.CYCLE, monitor.safe_run_monitor, test)
-        timer.start()
-        cls.MONITORS[monitor] = timer
+        cls.unregister_monitor(monitor, test)
+        registration = MonitorRegistration(monitor.CYCLE,
+                                           monitor.safe_run_monitor, test)
+        cls.MONITORS[(monitor, test)] = registration
+        cls.get_scheduler().schedule(registration)
 
     @classmethod
-    def unregister_monitor(cls, monitor):
+    def unregister_monitor(cls, monitor, test=None):
         """Stop monitor.
 
+        Waits for the monitor's current run to end, if it's running.
+
         Args:
             monitor (AbstractMonitor): monitor instance.
+            test (object): test item instance, leave None to stop the monitor
+                for all the tests.
         """
-        if monitor not in cls.MONITORS:
-            return
+        if test is None:
+            keys = [key for key in cls.MONITORS if key[0] is monitor]
+
+        else:
+            keys = [(monitor, test)]
 
-        thread = cls.MONITORS[monitor]
-        thread.cancel()
-        thread.join()
-        cls.MONITORS.pop(monitor)
+        for key in keys:
+            registration = cls.MONITORS.pop(key, None)
+            if registration is not None:
+                cls.get_scheduler().cancel(registration)
@@ -1,13 +1,20 @@
 """Tests results handling interface."""
 # pylint: disable=invalid-name,too-few-public-methods,arguments-differ
 # pylint: disable=too-many-arguments,dangerous-default-value
+from threading import RLock
+from functools import wraps
+from collections import OrderedDict
 from unittest.result import TestResult
+
 import pkg_resources
 
 from rotest.common import core_log
+from rotest.common.timing import TEST, format_durations
+from rotest.core.utils.metrics import write_test_metrics
 from rotest.core.models.case_data import TestOutcome
 from rotest.core.flow_component import AbstractFlowComponent
-from rotest.common.log import get_test_logger, get_tree_path
+from rotest.common.log import (get_test_logger, get_tree_path,
+                               close_test_logger, write_debug_buffers)
 
 
 def get_result_handlers():
@@ -26,6 +33,8 @@ class Result(TestResult):
         result_handlers (list): the run's output handler instances.
         main_test (object): the main test instance (e.g. TestSuite instance
             or TestFlow instance).
+        phase_totals (OrderedDict): total durations of the tests' phases in
+            the run, by the phases' names.
     """
     DEFAULT_OUTPUTS = ("tree", "excel")
 
@@ -34,7 +43,9 @@ class Result(TestResult):
 
         TestResult.__init__(self, stream, descriptions)
 
+        self.stream = stream
         self.main_test = main_test
+        self.phase_totals = OrderedDict()
 
         all_result_handlers = get_result_handlers()
 
@@ -79,6 +90,7 @@ class Result(TestResult):
             test (object): test item instance.
         """
         test.logger.info("Test %r finished setup", test.data)
+        test.phase_timer.start(TEST)
         for result_handler in self.result_handlers:
             result_handler.setup_finished(test)
 
@@ -89,6 +101,7 @@ class Result(TestResult):
             test (object): test item instance.
         """
         test.logger.info("Test %r started teardown", test.data)
+        test.phase_timer.stop(TEST)
         for result_handler in self.result_handlers:
             result_handler.start_teardown(test)
 
@@ -136,15 +149,32 @@ class Result(TestResult):
 
         test.data.end()
         test.release_resource_loggers()
+        self._update_phase_times(test)
+        write_test_metrics(test)
         for result_handler in self.result_handlers:
             result_handler.stop_test(test)
 
-        # In order to avoid having too many open files we close the log file
-        # handlers at the end of each test.
-        handlers = test.logger.handlers[:]
-        for handler in handlers:
-            handler.close()
-            test.logger.removeHandler(handler)
+        # In order to avoid having too many open files and loggers we close
+        # the test's logger at the end of each test.
+        close_test_logger(test.logger)
+
+    def _update_phase_times(self, test):
+        """Save the durations of the test's phases, and add them to the run's.
+
+        The test phase of complex tests isn't added, since it's the time of
+        their sub tests.
+
+        Args:
+            test (object): test item instance.
+        """
+        test.data.phase_times = test.phase_timer.dumps()
+        test.logger.debug("Test %r phase times: %s", test.data,
+                          format_durations(test.phase_timer.phases))
+
+        for phase, duration in test.phase_timer.phases.iteritems():
+            if phase != TEST or not test.IS_COMPLEX:
+                self.phase_totals[phase] = \
+                    self.phase_totals.get(phase, 0) + duration
 
     def startComposite(self, test):
         """Called when the given TestSuite is about to be run.
@@ -240,6 +270,7 @@ class Result(TestResult):
         exception_string = self._exc_info_to_string(err, test)
         test.logger.error("Test %r ended in failure: %s",
                           test.data, exception_string)
+        write_debug_buffers(test.logger)
         test.end(test_outcome=TestOutcome.FAILED, details=exception_string)
 
         for result_handler in self.result_handlers:
@@ -258,6 +289,7 @@ class Result(TestResult):
         exception_string = self._exc_info_to_string(err, test)
         test.logger.critical("Test %r ended in error: %s",
                              test.data, exception_string)
+        write_debug_buffers(test.logger)
         test.end(test_outcome=TestOutcome.ERROR, details=exception_string)
 
         for result_handler in self.result_handlers:
@@ -308,3 +340,42 @@ class Result(TestResult):
                                         self.skipped, self.failures,
                                         self.expectedFailures,
                                         self.unexpectedSuccesses)
+
+        self.print_phases_summary()
+
+    def print_phases_summary(self):
+        """Print the total durations of the tests' phases in the run."""
+        if len(self.phase_totals) == 0:
+            return
+
+        summary = "Time by phase: %s" % format_durations(self.phase_totals)
+        core_log.info(summary)
+        if self.stream is not None:
+            self.stream.writeln(summary)
+
+
+class SynchronizedResult(object):
+    """Proxy to a result object, which serializes the calls to its methods.
+
+    Used when tests report to the same result object from several threads,
+    so that the result handlers would get the events one at a time.
+
+    Attributes:
+        result (Result): the wrapped result object.
+    """
+    def __init__(self, result):
+        self.result = result
+        self._lock = RLock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.result, name)
+        if not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        def synchronized_method(*args, **kwargs):
+            """Call the result's method while holding the lock."""
+            with self._lock:
+                return attribute(*args, **kwargs)
+
+        return synchronized_method
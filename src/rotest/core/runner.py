@@ -1,5 +1,5 @@
 """Describes Rotest's test running handler class."""
-# pylint: disable=too-many-arguments
+# pylint: disable=too-many-arguments,too-many-locals
 import os
 import sys
 from collections import defaultdict
@@ -7,6 +7,7 @@ from collections import defaultdict
 from rotest.common import core_log
 from rotest.core.utils.json_parser import parse
 from rotest.core.runners.base_runner import BaseTestRunner
+from rotest.core.runners.threaded_runner import ThreadedRunner
 from rotest.core import TestCase, TestFlow, TestBlock, TestSuite
 from rotest.core.runners.multiprocess.manager.runner import MultiprocessRunner
 
@@ -20,7 +21,9 @@ DEFAULT_CONFIG_PATH = os.path.join(FILE_FOLDER, "default_config.json")
 def get_runner(save_state=False, outputs=None, config=None,
                processes_number=None, run_delta=False, run_name=None,
                fail_fast=False, enable_debug=False, skip_init=None,
-               stream=sys.stderr):
+               stream=sys.stderr, max_jobs_per_worker=None,
+               max_worker_memory=None, min_processes=None,
+               threads_number=None):
     """Return a test runner instance.
 
     Args:
@@ -38,10 +41,37 @@ def get_runner(save_state=False, outputs=None, config=None,
             upon any exception in a test statement.
         skip_init (bool): True to skip resources initialize and validation.
         stream (file): output stream.
+        max_jobs_per_worker (number): number of jobs after which a worker
+            process is replaced by a new one, None means no limit.
+        max_worker_memory (number): RSS memory size (in MB) above which a
+            worker process is replaced by a new one, None means no limit.
+        min_processes (number): minimal number of multiprocess runner's
+            worker processes, enables autoscaling the workers between it and
+            processes_number. None means a fixed number of workers.
+        threads_number (number): number of threaded runner's threads, None
+            means that a threaded runner won't be used.
 
     Returns:
         runner. test runner instance.
     """
+    if threads_number is not None and threads_number > 0:
+        if processes_number is not None and processes_number > 0:
+            raise RuntimeError("Cannot use both threads and processes")
+
+        if enable_debug:
+            raise RuntimeError("Cannot debug in threaded runner")
+
+        return ThreadedRunner(stream=stream,
+                              config=config,
+                              outputs=outputs,
+                              run_name=run_name,
+                              failfast=fail_fast,
+                              enable_debug=False,
+                              skip_init=skip_init,
+                              run_delta=run_delta,
+                              save_state=save_state,
+                              threads_number=threads_number)
+
     if processes_number is not None and processes_number > 0:
         if enable_debug:
             raise RuntimeError("Cannot debug in multiprocess")
@@ -55,7 +85,10 @@ def get_runner(save_state=False, outputs=None, config=None,
                                   skip_init=skip_init,
                                   run_delta=run_delta,
                                   save_state=save_state,
-                                  workers_number=processes_number)
+                                  workers_number=processes_number,
+                                  max_jobs_per_worker=max_jobs_per_worker,
+                                  max_worker_memory=max_worker_memory,
+                                  min_workers=min_processes)
 
     return BaseTestRunner(stream=stream,
                           config=config,
@@ -70,7 +103,9 @@ def get_runner(save_state=False, outputs=None, config=None,
 
 def run(test_class, save_state=None, outputs=None, config=None,
         processes_number=None, delta_iterations=None, run_name=None,
-        fail_fast=None, enable_debug=None, skip_init=None):
+        fail_fast=None, enable_debug=None, skip_init=None,
+        max_jobs_per_worker=None, max_worker_memory=None,
+        min_processes=None, threads_number=None):
     """Return a test runner instance.
 
     Args:
@@ -96,6 +131,15 @@ def run(test_class, save_state=None, outputs=None, config=None,
         enable_debug (bool): whether to enable entering ipdb debugging mode
             upon any exception in a test statement.
         skip_init (bool): True to skip resources initialization and validation.
+        max_jobs_per_worker (number): number of jobs after which a worker
+            process is replaced by a new one, None means no limit.
+        max_worker_memory (number): RSS memory size (in MB) above which a
+            worker process is replaced by a new one, None means no limit.
+        min_processes (number): minimal number of multiprocess runner's
+            worker processes, enables autoscaling the workers between it and
+            processes_number. None means a fixed number of workers.
+        threads_number (number): number of threaded runner's threads, None
+            means that a threaded runner won't be used.
 
     Returns:
         list. list of RunData of the test runs.
@@ -111,7 +155,11 @@ def run(test_class, save_state=None, outputs=None, config=None,
                              save_state=save_state,
                              enable_debug=enable_debug,
                              run_delta=bool(delta_iterations),
-                             processes_number=processes_number)
+                             processes_number=processes_number,
+                             max_jobs_per_worker=max_jobs_per_worker,
+                             max_worker_memory=max_worker_memory,
+                             min_processes=min_processes,
+                             threads_number=threads_number)
 
     for _ in xrange(times_to_run):
         runs_data.append(test_runner.run(test_class))
@@ -8,6 +8,7 @@ from unittest.runner import TextTestRunner
 from rotest.common import core_log
 from rotest.core.case import TestCase
 from rotest.core.suite import TestSuite
+from rotest.core.event_loop import EventLoop
 from rotest.core.result.result import Result
 from rotest.core.models.run_data import RunData
 from rotest.management.client.manager import ClientResourceManager
@@ -33,6 +34,8 @@ class BaseTestRunner(TextTestRunner):
         run_name (str): name of the current run.
         enable_debug (bool): whether to enable entering ipdb debugging mode
             upon any exception in a test statement.
+        event_loop (rotest.core.event_loop.EventLoop): the loop the tests'
+            coroutine methods are scheduled on.
     """
     def __init__(self, save_state, config, run_delta, outputs,
                  run_name, enable_debug, skip_init=False, *args, **kwargs):
@@ -54,6 +57,7 @@ class BaseTestRunner(TextTestRunner):
         self.skip_init = skip_init
         self.save_state = save_state
         self.enable_debug = enable_debug
+        self.event_loop = EventLoop()
 
     def _makeResult(self):
         """Create test result object.
@@ -116,6 +120,19 @@ class BaseTestRunner(TextTestRunner):
         if self.resource_manager is not None:
             self.resource_manager.disconnect()
 
+        self.event_loop.close()
+
+    def _propagate_event_loop(self, test_item):
+        """Propagate the runner's event loop to all test items.
+
+        Args:
+            test_item (object): test object.
+        """
+        test_item.event_loop = self.event_loop
+        if test_item.IS_COMPLEX:
+            for sub_item in test_item:
+                self._propagate_event_loop(sub_item)
+
     def execute(self, test_item):
         """Execute the given test item.
 
@@ -125,6 +142,7 @@ class BaseTestRunner(TextTestRunner):
         Returns:
             RunData. test run data.
         """
+        self._propagate_event_loop(test_item)
         super(BaseTestRunner, self).run(test_item)
 
         return self.test_item.data.run_data
@@ -0,0 +1,131 @@
+"""Multiprocess runner workers autoscaler."""
+# pylint: disable=too-many-instance-attributes
+import time
+from collections import deque, defaultdict
+
+from rotest.common import core_log
+
+
+class WorkersAutoscaler(object):
+    """Decide when to add workers to the pool and when to drain them.
+
+    The autoscaler gets the outcome of the workers' resources lock requests
+    and uses it to balance the pool:
+
+    * A worker is added while there are pending jobs, the pool is below
+      its maximal size and enough recent jobs were run and lock requests were
+      granted without waiting (i.e. there are probably available resources
+      for more workers).
+    * A worker which was repeatedly reported blocked on unavailable resources
+      is drained (it stops waiting for the resources and stops pulling new
+      jobs), as long as the pool stays at its minimal size or above.
+
+    Workers that have no work left finish on their own.
+
+    Attributes:
+        min_workers (number): minimal number of active workers.
+        max_workers (number): maximal number of active workers.
+        lock_history (collections.deque): outcomes of the recent lock
+            requests, True for requests that were granted on first attempt
+            and for jobs that didn't request resources.
+        blocked_streaks (dict): maps a worker's pid to the number of its
+            consecutive reports of blocked lock requests.
+        last_scale_up (number): time of the last worker addition.
+
+        LOCK_HISTORY_SIZE (number): number of recent lock requests to decide
+            scaling up by, no worker is added before that many were reported.
+        BLOCKED_STREAK_LIMIT (number): number of consecutive blocked reports
+            after which a worker is drained.
+        SCALE_UP_INTERVAL (number): minimal seconds between two additions.
+    """
+    LOCK_HISTORY_SIZE = 3
+    BLOCKED_STREAK_LIMIT = 2
+    SCALE_UP_INTERVAL = 1
+
+    def __init__(self, min_workers, max_workers):
+        if min_workers < 1 or min_workers > max_workers:
+            raise ValueError("Illegal autoscaling range: %r-%r" %
+                             (min_workers, max_workers))
+
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+
+        self.last_scale_up = 0
+        self.blocked_streaks = defaultdict(int)
+        self.lock_history = deque(maxlen=self.LOCK_HISTORY_SIZE)
+
+    def report_locks(self, worker_pid, immediate_locks, blocked_locks):
+        """Record the outcome of a worker's resources lock requests.
+
+        Args:
+            worker_pid (number): worker's process id.
+            immediate_locks (number): lock requests granted on first attempt.
+            blocked_locks (number): lock requests that had to wait.
+        """
+        if immediate_locks == 0 and blocked_locks == 0:
+            # A job that didn't wait for resources, e.g. had none to lock
+            self.lock_history.append(True)
+
+        self.lock_history.extend([True] * immediate_locks +
+                                 [False] * blocked_locks)
+
+        if blocked_locks > 0 and immediate_locks == 0:
+            self.blocked_streaks[worker_pid] += 1
+
+        else:
+            self.blocked_streaks.pop(worker_pid, None)
+
+    def forget_worker(self, worker_pid):
+        """Remove the records of a worker that left the pool.
+
+        Args:
+            worker_pid (number): worker's process id.
+        """
+        self.blocked_streaks.pop(worker_pid, None)
+
+    def should_scale_up(self, active_workers, pending_jobs):
+        """Return whether a new worker should be added to the pool.
+
+        Args:
+            active_workers (number): number of workers that aren't drained.
+            pending_jobs (bool): whether there are jobs waiting for a worker.
+
+        Returns:
+            bool. True if a new worker should be added.
+        """
+        if not pending_jobs or active_workers >= self.max_workers:
+            return False
+
+        if len(self.lock_history) < self.LOCK_HISTORY_SIZE or \
+                not all(self.lock_history):
+            return False
+
+        if time.time() - self.last_scale_up < self.SCALE_UP_INTERVAL:
+            return False
+
+        self.last_scale_up = time.time()
+        core_log.debug("Scaling workers up (%d active workers)",
+                       active_workers)
+        return True
+
+    def workers_to_drain(self, active_workers_pids):
+        """Return the workers that should be drained.
+
+        Args:
+            active_workers_pids (list): pids of the workers that aren't
+                drained.
+
+        Returns:
+            list. pids of the workers to drain.
+        """
+        removable = len(active_workers_pids) - self.min_workers
+        blocked_pids = [pid for pid in active_workers_pids
+                        if self.blocked_streaks.get(pid, 0) >=
+                        self.BLOCKED_STREAK_LIMIT]
+
+        to_drain = blocked_pids[:max(removable, 0)]
+        for pid in to_drain:
+            core_log.debug("Draining blocked worker %r", pid)
+            self.forget_worker(pid)
+
+        return to_drain
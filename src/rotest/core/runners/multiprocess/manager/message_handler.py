@@ -1,6 +1,8 @@
 """Multiprocess runner message handler."""
 # pylint: disable=too-many-instance-attributes,too-few-public-methods
 # pylint: disable=expression-not-assigned,too-many-arguments,unused-argument
+import json
+
 from rotest.common import core_log
 from rotest.core.models.case_data import TestOutcome
 from rotest.core.models.general_data import GeneralData
@@ -11,14 +13,17 @@ from rotest.core.runners.multiprocess.common import (WrappedException,
 from rotest.management.common.messages import (StopTest,
                                                StartTest,
                                                AddResult,
+                                               RequeueTest,
                                                ShouldSkip,
                                                RunFinished,
+                                               RecycleWorker,
                                                SetupFinished,
                                                StartTeardown,
                                                StopComposite,
                                                StartComposite,
                                                CloneResources,
-                                               ShouldSkipReply)
+                                               ShouldSkipReply,
+                                               ResourcesLockReport)
 
 
 class RunnerMessageHandler(object):
@@ -32,6 +37,8 @@ class RunnerMessageHandler(object):
         main_test (object): main test object.
         message_handlers (dict): maps worker messages to handling methods.
         result_event_handlers (dict): maps test outcomes to result methods.
+        requeued_tests (set): identifiers of the tests that were returned to
+            the queue after they were started, and weren't started again yet.
     """
     def __init__(self, multiprocess_runner, result, main_test):
         """Initialize the message handler.
@@ -45,6 +52,7 @@ class RunnerMessageHandler(object):
         self.main_test = main_test
         self.decoder = XMLParser()
         self.runner = multiprocess_runner
+        self.requeued_tests = set()
 
         self.result_event_handlers = {
             TestOutcome.ERROR: self.result.addError,
@@ -58,6 +66,7 @@ class RunnerMessageHandler(object):
             AddResult: self._handle_end_message,
             StopTest: self._handle_stop_message,
             StartTest: self._handle_start_message,
+            RequeueTest: self._handle_requeue_message,
             ShouldSkip: self._handle_should_skip_message,
             SetupFinished: self._handle_setup_finished_message,
             StartTeardown: self._handle_start_teardown_message,
@@ -87,6 +96,12 @@ class RunnerMessageHandler(object):
         if message_type is RunFinished:
             self._handle_done_message(message)
 
+        elif message_type is RecycleWorker:
+            self._handle_recycle_message(message)
+
+        elif message_type is ResourcesLockReport:
+            self._handle_lock_report_message(message)
+
         else:
             test = get_item_by_id(self.main_test, message.test_id)
             self.message_handlers[message_type](test, message)
@@ -171,16 +186,37 @@ class RunnerMessageHandler(object):
     def _handle_start_message(self, test, message):
         """Handle StartTest of a worker.
 
+        The start of a requeued test was already reported when it was first
+        pulled, so it isn't reported again (e.g. to the result handlers).
+
         Args:
             test (object): test item to update.
             message (StartTest): worker message object.
         """
-        self.result.startTest(test)
+        if test.identifier in self.requeued_tests:
+            self.requeued_tests.remove(test.identifier)
+
+        else:
+            self.result.startTest(test)
+
         if not isinstance(test, AbstractFlowComponent) or test.is_main:
             self.runner.update_worker(worker_pid=message.msg_id, test=test)
             self.runner.update_timeout(worker_pid=message.msg_id,
                                        timeout=test.TIMEOUT)
 
+    def _handle_requeue_message(self, test, message):
+        """Handle RequeueTest of a worker.
+
+        The test stays started, and the worker that pulls it from the queue
+        continues its run (see :meth:`_handle_start_message`).
+
+        Args:
+            test (object): test item to update.
+            message (RequeueTest): worker message object.
+        """
+        self.requeued_tests.add(test.identifier)
+        self.runner.requeue_test(worker_pid=message.msg_id, test=test)
+
     def _handle_setup_finished_message(self, test, message):
         """Handle SetupFinished of a worker.
 
@@ -233,6 +269,8 @@ class RunnerMessageHandler(object):
             test (object): test item to update.
             message (StopTest): worker message object.
         """
+        test.phase_timer.loads(message.phase_times)
+        test.metrics_summary = json.loads(message.metrics_summary)
         self.result.stopTest(test)
         if not isinstance(test, AbstractFlowComponent) or test.is_main:
             self._update_parent_stop(test)
@@ -254,3 +292,23 @@ class RunnerMessageHandler(object):
             message (RunFinished): worker message object.
         """
         self.runner.finalize_worker(worker_pid=message.msg_id)
+
+    def _handle_recycle_message(self, message):
+        """Handle RecycleWorker of a worker.
+
+        Args:
+            message (RecycleWorker): worker message object.
+        """
+        self.runner.recycle_worker(worker_pid=message.msg_id,
+                                   reason=message.reason)
+
+    def _handle_lock_report_message(self, message):
+        """Handle ResourcesLockReport of a worker.
+
+        Args:
+            message (ResourcesLockReport): worker message object.
+        """
+        self.runner.report_resources_locks(
+            worker_pid=message.msg_id,
+            immediate_locks=message.immediate_locks,
+            blocked_locks=message.blocked_locks)
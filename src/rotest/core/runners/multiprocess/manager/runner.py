@@ -5,7 +5,8 @@ import os
 import time
 import datetime
 from Queue import Empty
-from multiprocessing import Queue
+from collections import Counter
+from multiprocessing import Queue, Event
 
 from rotest.common import core_log
 from rotest.core.case import TestCase
@@ -15,6 +16,8 @@ from rotest.core.result.monitor import AbstractMonitor
 from rotest.core.result.result import get_result_handlers
 from rotest.core.runners.base_runner import BaseTestRunner
 from rotest.core.runners.multiprocess.worker.process import WorkerProcess
+from rotest.core.runners.multiprocess.manager.autoscaler import \
+                                                        WorkersAutoscaler
 from rotest.core.runners.multiprocess.manager.message_handler import \
                                                         RunnerMessageHandler
 
@@ -38,7 +41,18 @@ class MultiprocessRunner(BaseTestRunner):
             last run (according to the results DB).
         outputs (list): list of the output handlers' names.
         run_name (str): name of the current run.
-        workers_number (number): number of worker processes.
+        workers_number (number): number of worker processes. When
+            autoscaling, this is the maximal number of worker processes.
+        min_workers (number): minimal number of worker processes, enables
+            autoscaling the workers pool. None means a fixed size pool.
+        autoscaler (WorkersAutoscaler): the workers pool autoscaler, None if
+            autoscaling is disabled.
+        max_jobs_per_worker (number): number of jobs after which a worker
+            would be replaced by a new one, None means no limit.
+        max_worker_memory (number): RSS memory size (in MB) above which a
+            worker would be replaced by a new one, None means no limit.
+        recycled_workers (collections.Counter): number of recycled workers,
+            by the recycle reason.
         requests_queue (multiprocessing.Queue): queue object used to transfer
             jobs to all workers processes from the main runner process.
         results_queue (multiprocessing.Queue): queue object used to transfer
@@ -53,7 +67,9 @@ class MultiprocessRunner(BaseTestRunner):
 
     def __init__(self, save_state, config, run_delta, outputs, run_name,
                  enable_debug, skip_init=False,
-                 workers_number=DEFAULT_WORKERS_NUMBER, *args, **kwargs):
+                 workers_number=DEFAULT_WORKERS_NUMBER,
+                 max_jobs_per_worker=None, max_worker_memory=None,
+                 min_workers=None, *args, **kwargs):
         """Initialize the multiprocess test runner.
 
         Initializes the workers pool, the request & results queues.
@@ -72,18 +88,33 @@ class MultiprocessRunner(BaseTestRunner):
         self.requests_queue = None
         self.message_handler = None
 
-        self.finished_workers = 0
         self.workers_number = workers_number
-        output_handlers = get_result_handlers()
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_worker_memory = max_worker_memory
+        self.recycled_workers = Counter()
 
-        # Separate monitors from regular output handlers
-        self.monitors = [handler_name for handler_name in self.outputs
-                         if issubclass(output_handlers[handler_name],
-                                       AbstractMonitor)]
+        self.autoscaler = None
+        self.min_workers = min_workers
 
+        # Separate monitors from regular output handlers
+        self.monitors = self._get_monitors(self.outputs)
         self.outputs = [handler_name for handler_name in self.outputs
                         if handler_name not in self.monitors]
 
+    @staticmethod
+    def _get_monitors(outputs):
+        """Return the monitors among the given output handlers.
+
+        Args:
+            outputs (list): list of the output handlers' names.
+
+        Returns:
+            list. names of the output handlers which are monitors.
+        """
+        output_handlers = get_result_handlers()
+        return [handler_name for handler_name in outputs
+                if issubclass(output_handlers[handler_name], AbstractMonitor)]
+
     def queue_test_jobs(self, test_item):
         """Queue all the test cases DB identifiers.
 
@@ -121,6 +152,10 @@ class MultiprocessRunner(BaseTestRunner):
                                skip_init=self.skip_init,
                                save_state=self.save_state,
                                output_handlers=self.monitors,
+                               max_jobs=self.max_jobs_per_worker,
+                               max_memory=self.max_worker_memory,
+                               drain_event=Event() if self.autoscaler
+                               else None,
                                results_queue=self.results_queue,
                                requests_queue=self.requests_queue)
 
@@ -156,20 +191,120 @@ class MultiprocessRunner(BaseTestRunner):
         worker.start_time = datetime.datetime.now()
         worker.timeout = timeout
 
+    def get_active_workers(self):
+        """Return the workers which weren't drained.
+
+        Returns:
+            list. pids of the workers that may pull more jobs.
+        """
+        return [pid for pid, worker in self.workers_pool.iteritems()
+                if worker.drain_event is None or
+                not worker.drain_event.is_set()]
+
+    def ensure_active_worker(self):
+        """Start a worker if there are pending jobs but no worker to run them.
+
+        Pending jobs may remain after all the active workers finished, when
+        a drained worker returned its test to the queue.
+        """
+        if len(self.get_active_workers()) == 0 and \
+                not self.requests_queue.empty():
+
+            core_log.debug("Starting a worker for the returned jobs")
+            self.initialize_worker()
+
     def finalize_worker(self, worker_pid):
         """Finalize the worker.
 
-        * Updates finished workers counter.
         * Removes worker from workers pool.
         * Terminates the worker process.
 
         Args:
             worker_pid (number): worker's process id.
         """
-        self.finished_workers += 1
         worker_to_terminate = self.workers_pool.pop(worker_pid)
         worker_to_terminate.terminate()
 
+        if self.autoscaler is not None:
+            self.autoscaler.forget_worker(worker_pid)
+            self.ensure_active_worker()
+
+    def requeue_test(self, worker_pid, test):
+        """Handle a test that a drained worker returned to the jobs queue.
+
+        Args:
+            worker_pid (number): worker's process id.
+            test (object): the returned test.
+        """
+        core_log.debug("Worker %r returned test %r to the queue",
+                       worker_pid, test.data.name)
+        self.update_worker(worker_pid=worker_pid, test=None)
+        self.update_timeout(worker_pid=worker_pid, timeout=None)
+        self.ensure_active_worker()
+
+    def recycle_worker(self, worker_pid, reason):
+        """Replace a worker that has reached its limits with a new one.
+
+        Unlike finalizing, the number of finished workers isn't updated,
+        since the replacement worker continues pulling the pending jobs.
+
+        Args:
+            worker_pid (number): worker's process id.
+            reason (str): the limit that the worker has reached.
+        """
+        core_log.debug("Recycling worker %r (%s)", worker_pid, reason)
+        self.recycled_workers[reason] += 1
+        worker_to_terminate = self.workers_pool.pop(worker_pid)
+        worker_to_terminate.terminate()
+
+        if self.autoscaler is not None:
+            self.autoscaler.forget_worker(worker_pid)
+
+        self.initialize_worker()
+
+    def report_resources_locks(self, worker_pid, immediate_locks,
+                               blocked_locks):
+        """Handle a worker's report about its resources lock requests.
+
+        Args:
+            worker_pid (number): worker's process id.
+            immediate_locks (number): lock requests granted on first attempt.
+            blocked_locks (number): lock requests that had to wait.
+        """
+        if self.autoscaler is not None:
+            self.autoscaler.report_locks(worker_pid=worker_pid,
+                                         immediate_locks=immediate_locks,
+                                         blocked_locks=blocked_locks)
+
+    def autoscale_workers(self):
+        """Add or drain workers according to the autoscaler's decisions."""
+        active_pids = self.get_active_workers()
+
+        for pid in self.autoscaler.workers_to_drain(active_pids):
+            self.workers_pool[pid].drain_event.set()
+            active_pids.remove(pid)
+
+        if self.autoscaler.should_scale_up(
+                active_workers=len(active_pids),
+                pending_jobs=not self.requests_queue.empty()):
+
+            self.initialize_worker()
+
+    def print_recycle_summary(self):
+        """Print the number of the recycled workers, by recycle reason."""
+        recycled_number = sum(self.recycled_workers.values())
+        if recycled_number == 0:
+            return
+
+        reasons = ", ".join("%s: %d" % (reason, count)
+                            for reason, count in
+                            sorted(self.recycled_workers.items()))
+
+        summary = "Workers recycled: %d (%s)" % (recycled_number, reasons)
+        core_log.info(summary)
+        if self.stream is not None:
+            self.stream.writeln(summary)
+
     def clear_tests_queue(self):
         """Empty the pending requests queue, preventing the tests' run."""
         core_log.debug('Clearing pending tests')
@@ -223,8 +358,6 @@ class MultiprocessRunner(BaseTestRunner):
         for worker in self.workers_pool.itervalues():
             worker.terminate()
 
-        self.finished_workers = 0
-
     def get_timeout(self):
         """Return the worker's joint timeout.
 
@@ -299,15 +432,23 @@ class MultiprocessRunner(BaseTestRunner):
                                                     main_test=self.test_item,
                                                     multiprocess_runner=self)
         result.startTestRun()
+        self.recycled_workers.clear()
 
         core_log.debug('Queuing %r tests jobs', self.test_item.data.name)
         self.queue_test_jobs(self.test_item)
 
-        core_log.debug('Creating %d workers processes', self.workers_number)
-        for _ in xrange(self.workers_number):
+        initial_workers = self.workers_number
+        if self.min_workers is not None:
+            self.autoscaler = WorkersAutoscaler(
+                                            min_workers=self.min_workers,
+                                            max_workers=self.workers_number)
+            initial_workers = self.min_workers
+
+        core_log.debug('Creating %d workers processes', initial_workers)
+        for _ in xrange(initial_workers):
             self.initialize_worker()
 
-        while self.finished_workers < self.workers_number:
+        while len(self.workers_pool) > 0:
 
             try:
                 message = self.results_queue.get(timeout=self.get_timeout())
@@ -316,7 +457,11 @@ class MultiprocessRunner(BaseTestRunner):
             except Empty:
                 self.handle_workers_events()
 
+            if self.autoscaler is not None:
+                self.autoscale_workers()
+
         result.stopTestRun()
         result.printErrors()
+        self.print_recycle_summary()
 
         return self.test_item.data.run_data
@@ -1,11 +1,14 @@
 """Multiprocess worker process."""
 # pylint: disable=invalid-name,too-many-arguments,too-many-instance-attributes
+# pylint: disable=too-many-locals
+import time
 from Queue import Empty
 from multiprocessing import Process
 
 import psutil
 
 from rotest.common import core_log
+from rotest.management.common.errors import LockWaitAbortedError
 from rotest.core.runners.multiprocess.worker.runner import WorkerRunner
 from rotest.core.runners.multiprocess.common import (get_item_by_id,
                                                      kill_process_tree)
@@ -41,11 +44,37 @@ class WorkerProcess(Process):
         start_time (datetime.datetime): the start time of the current test.
         skip_init (bool): True to skip resources initialization and validation.
         output_handlers (list): output handlers for the worker's runner.
+        max_jobs (number): number of jobs after which the worker should be
+            recycled, None means no limit.
+        max_memory (number): RSS memory size (in MB) above which the worker
+            should be recycled, None means no limit.
+        jobs_count (number): number of jobs the worker has run.
+        drain_event (multiprocessing.Event): when set, the worker stops
+            pulling new jobs and finishes its run. None means the worker
+            can't be drained.
+        queue_handler (WorkerHandler): handler of the worker's runner, used
+            to send messages to the manager.
+        lock_wait_aborted (bool): whether the worker stopped waiting for the
+            resources of its current test, since it was drained.
+        last_blocked_report (number): time of the last report about the
+            current test's blocked lock request, None if it wasn't blocked.
+
+        RECYCLE_JOBS_LIMIT (str): recycle reason of reaching the jobs limit.
+        RECYCLE_MEMORY_LIMIT (str): recycle reason of exceeding the memory
+            limit.
+        BLOCKED_REPORT_INTERVAL (number): seconds between reports about a lock
+            request that is still blocked.
     """
+    RECYCLE_JOBS_LIMIT = "jobs limit"
+    RECYCLE_MEMORY_LIMIT = "memory limit"
+    BLOCKED_REPORT_INTERVAL = 10
+
+    BYTES_IN_MB = 1024 * 1024
 
     def __init__(self, save_state, config, run_delta, run_name, requests_queue,
                  reply_queue, results_queue, root_test, failfast, parent_id,
-                 skip_init, output_handlers, *args, **kwargs):
+                 skip_init, output_handlers, max_jobs=None, max_memory=None,
+                 drain_event=None, *args, **kwargs):
 
         core_log.debug('Initializing test worker')
         super(WorkerProcess, self).__init__()
@@ -71,6 +100,15 @@ class WorkerProcess(Process):
         self.skip_init = skip_init
         self.save_state = save_state
 
+        self.jobs_count = 0
+        self.max_jobs = max_jobs
+        self.max_memory = max_memory
+        self.drain_event = drain_event
+
+        self.queue_handler = None
+        self.lock_wait_aborted = False
+        self.last_blocked_report = None
+
     def terminate(self):
         """Terminate the worker process and all of its subprocesses."""
         core_log.debug("Ending process %r", self.pid)
@@ -91,12 +129,99 @@ class WorkerProcess(Process):
             core_log.warning('Worker %r parent changed, terminating', self.pid)
             self.terminate()
 
+    def get_recycle_reason(self):
+        """Check whether the worker has reached one of its limits.
+
+        Note:
+            The limits are only checked between jobs, and only if there are
+            more jobs pending, so that a replacement worker would be started
+            instead of this one without failing any test.
+
+        Returns:
+            str. the limit that was reached, None if no limit was reached.
+        """
+        if self.max_jobs is not None and self.jobs_count >= self.max_jobs:
+            return self.RECYCLE_JOBS_LIMIT
+
+        if self.max_memory is not None:
+            memory_usage = psutil.Process(self.pid).memory_info().rss
+            if memory_usage > self.max_memory * self.BYTES_IN_MB:
+                core_log.debug("Worker %r uses %d bytes of memory",
+                               self.pid, memory_usage)
+                return self.RECYCLE_MEMORY_LIMIT
+
+        return None
+
+    def report_resources_locks(self, still_blocked=False):
+        """Report the outcome of the lock requests made since the last report.
+
+        The reports are only used for autoscaling, so they are sent only if
+        the worker can be drained.
+
+        Args:
+            still_blocked (bool): whether the worker is waiting for resources,
+                in which case the report has at least one blocked request.
+        """
+        if self.drain_event is None or self.resource_manager is None:
+            return
+
+        immediate_locks = self.resource_manager.immediate_locks
+        blocked_locks = self.resource_manager.blocked_locks
+        if still_blocked:
+            blocked_locks = max(blocked_locks, 1)
+
+        self.resource_manager.immediate_locks = 0
+        self.resource_manager.blocked_locks = 0
+        self.queue_handler.report_resources_locks(
+                                            immediate_locks=immediate_locks,
+                                            blocked_locks=blocked_locks)
+
+    def handle_blocked_lock(self):
+        """Handle a failed attempt to lock the current test's resources.
+
+        Reports the blocked request to the manager while waiting (once every
+        BLOCKED_REPORT_INTERVAL seconds), so it can drain the worker.
+
+        Raises:
+            LockWaitAbortedError: the worker was drained, and should stop
+                waiting for the resources.
+        """
+        if self.drain_event.is_set():
+            self.lock_wait_aborted = True
+            self.queue_handler.discard_events = True
+            raise LockWaitAbortedError("Worker %r was drained while waiting "
+                                       "for resources" % self.pid)
+
+        current_time = time.time()
+        if self.last_blocked_report is None or current_time - \
+                self.last_blocked_report >= self.BLOCKED_REPORT_INTERVAL:
+
+            self.last_blocked_report = current_time
+            self.report_resources_locks(still_blocked=True)
+
+    def requeue_test(self, test_id):
+        """Return a test whose run was aborted to the pending tests queue.
+
+        Args:
+            test_id (number): identifier of the test.
+        """
+        core_log.debug('Worker %r returns test %r to the queue',
+                       self.pid, test_id)
+        self.queue_handler.discard_events = False
+        self.requests_queue.put(test_id)
+        self.queue_handler.requeue_test(test_id)
+
     def _get_tests(self):
         """Try to get a new test from the pending tests queue.
 
         Returns:
-            object. a pending test, or None if queue is empty.
+            object. a pending test, or None if queue is empty or the worker
+                is being drained.
         """
+        if self.drain_event is not None and self.drain_event.is_set():
+            core_log.debug('Worker %r is drained', self.pid)
+            return None
+
         try:
             return self.requests_queue.get(block=False)
 
@@ -124,7 +249,11 @@ class WorkerProcess(Process):
                               results_queue=self.results_queue)
 
         runner.resource_manager = self.resource_manager
+        self.queue_handler = runner.queue_handler
+        if self.drain_event is not None and self.resource_manager is not None:
+            self.resource_manager.lock_wait_hook = self.handle_blocked_lock
 
+        recycle_reason = None
         try:
             for test_id in iter(self._get_tests, None):
                 self.assert_runner_is_alive()
@@ -132,14 +261,35 @@ class WorkerProcess(Process):
                 test = get_item_by_id(self.root_test, test_id)
                 core_log.debug('Worker %r is running %r',
                                self.pid, test.data.name)
+                self.last_blocked_report = None
                 runner.execute(test)
+                if self.lock_wait_aborted:
+                    self.requeue_test(test_id)
+                    break
+
                 core_log.debug('Worker %r done with %r',
                                self.pid, test.data.name)
 
+                self.report_resources_locks()
+
+                self.jobs_count += 1
+                if not self.requests_queue.empty():
+                    recycle_reason = self.get_recycle_reason()
+                    if recycle_reason is not None:
+                        break
+
         finally:
             if (self.resource_manager is not None and
                     self.resource_manager.is_connected()):
                 runner.resource_manager.disconnect()
 
-            core_log.debug('Worker %r finished working', self.pid)
-            runner.queue_handler.finish_run()
+            runner.event_loop.close()
+
+            if recycle_reason is not None:
+                core_log.debug('Worker %r reached its %s, recycling',
+                               self.pid, recycle_reason)
+                runner.queue_handler.recycle_worker(recycle_reason)
+
+            else:
+                core_log.debug('Worker %r finished working', self.pid)
+                runner.queue_handler.finish_run()
@@ -1,9 +1,11 @@
 """Multiprocess worker result handler."""
 # pylint: disable=protected-access
 import os
+import json
 import time
 
 from rotest.core.models.case_data import TestOutcome
+from rotest.core.utils.metrics import get_metrics_summary
 from rotest.management.common.parsers.xml_parser import XMLParser
 from rotest.core.result.handlers.abstract_handler import AbstractResultHandler
 from rotest.management.common.messages import (StopTest,
@@ -11,11 +13,14 @@ from rotest.management.common.messages import (StopTest,
                                                StartTest,
                                                ShouldSkip,
                                                RunFinished,
+                                               RecycleWorker,
                                                SetupFinished,
                                                StartTeardown,
                                                StopComposite,
                                                StartComposite,
-                                               CloneResources)
+                                               RequeueTest,
+                                               CloneResources,
+                                               ResourcesLockReport)
 
 
 class WorkerHandler(AbstractResultHandler):
@@ -26,6 +31,8 @@ class WorkerHandler(AbstractResultHandler):
             jobs results from all workers processes to the main runner process.
         reply_queue (multiprocessing.Queue): queue object used to transfer
             data from the main runner to this specific worker.
+        discard_events (bool): whether to drop the test events instead of
+            sending them, used for a test that will be run again.
 
         REPLY_TIMEOUT (number): maximal time to wait for the manager replies.
     """
@@ -45,6 +52,7 @@ class WorkerHandler(AbstractResultHandler):
         self.worker_pid = os.getpid()
         self.reply_queue = reply_queue
         self.results_queue = results_queue
+        self.discard_events = False
 
     def send_message(self, message):
         """Put a message in the results queue.
@@ -52,6 +60,9 @@ class WorkerHandler(AbstractResultHandler):
         Args:
             message (collections.namedtuple): message to send.
         """
+        if self.discard_events:
+            return
+
         self.results_queue.put(self.xml_parser.encode(message))
         # Wait for the lock to be released on both sides of the queue.
         time.sleep(0.1)
@@ -79,6 +90,9 @@ class WorkerHandler(AbstractResultHandler):
         Returns:
             str. skip reason if the test should be skipped, None otherwise.
         """
+        if self.discard_events:
+            return None
+
         self.send_message(ShouldSkip(msg_id=self.worker_pid,
                                      test_id=test.identifier))
         skip_reason = self.get_message().should_skip
@@ -115,7 +129,10 @@ class WorkerHandler(AbstractResultHandler):
             test (object): test item instance.
         """
         self.send_message(StopTest(msg_id=self.worker_pid,
-                                   test_id=test.identifier))
+                                   test_id=test.identifier,
+                                   phase_times=test.data.phase_times,
+                                   metrics_summary=json.dumps(
+                                       get_metrics_summary(test))))
 
     def start_composite(self, test):
         """Called when the given TestSuite is about to be run.
@@ -192,3 +209,34 @@ class WorkerHandler(AbstractResultHandler):
     def finish_run(self):
         """Called when the the worker has finished running tests."""
         self.send_message(RunFinished(msg_id=self.worker_pid))
+
+    def recycle_worker(self, reason):
+        """Called when the worker reached its limits and should be replaced.
+
+        Args:
+            reason (str): the limit that the worker has reached.
+        """
+        self.send_message(RecycleWorker(msg_id=self.worker_pid,
+                                        reason=reason))
+
+    def requeue_test(self, test_id):
+        """Notify the manager that the test was returned to the jobs queue.
+
+        Args:
+            test_id (number): identifier of the test.
+        """
+        self.send_message(RequeueTest(msg_id=self.worker_pid,
+                                      test_id=test_id))
+
+    def report_resources_locks(self, immediate_locks, blocked_locks):
+        """Notify the manager about the outcome of resources lock requests.
+
+        Args:
+            immediate_locks (number): lock requests granted on the first
+                attempt since the last report.
+            blocked_locks (number): lock requests that had to wait for
+                unavailable resources since the last report.
+        """
+        self.send_message(ResourcesLockReport(msg_id=self.worker_pid,
+                                              immediate_locks=immediate_locks,
+                                              blocked_locks=blocked_locks))
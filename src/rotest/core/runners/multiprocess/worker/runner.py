@@ -59,8 +59,7 @@ class WorkerRunner(BaseTestRunner):
         Args:
             test_item (object): test object.
         """
-        test_item._is_client_local = False
-        test_item.resource_manager = self.resource_manager
+        test_item.set_resource_manager(self.resource_manager)
         if test_item.IS_COMPLEX:
             for sub_item in test_item:
                 self._propagate_resource_manager(sub_item)
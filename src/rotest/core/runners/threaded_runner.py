@@ -0,0 +1,277 @@
+"""Rotest's threaded test runner."""
+# pylint: disable=too-many-arguments,too-many-instance-attributes,broad-except
+import sys
+from threading import Thread, Lock
+from Queue import Queue, Empty
+
+from django.db import connection
+
+from rotest.common import core_log
+from rotest.core.case import TestCase
+from rotest.core.flow import TestFlow
+from rotest.core.suite import TestSuite
+from rotest.core.models.general_data import GeneralData
+from rotest.core.result.result import SynchronizedResult
+from rotest.core.runners.base_runner import BaseTestRunner
+
+
+class ThreadedRunner(BaseTestRunner):
+    """Rotest's threaded test runner.
+
+    Runs the cases and flows of the main test concurrently, using a pool of
+    threads in the current process. Fits tests that spend most of their time
+    waiting for I/O (e.g. remote calls to the resources).
+
+    Each thread uses its own resource manager client, and all the threads
+    report to the same result object, whose calls are serialized. Each test
+    still gets its own logger (by its place in the tests tree), so the logs
+    of concurrent tests don't mix. The coroutine methods of the tests are all
+    scheduled on the runner's event loop, so the coroutines of the
+    concurrent tests interleave on it.
+
+    If a thread can't create its resource manager client, the tests that
+    haven't started yet are failed, instead of being left unrun.
+
+    Attributes:
+        DEFAULT_THREADS_NUMBER (number): default number of threads.
+        JOIN_INTERVAL (number): seconds to wait for the threads in each
+            join attempt, to keep the main thread responsive to signals.
+
+        threads_number (number): number of threads to run the tests in.
+        jobs_queue (Queue.Queue): queue of the cases and flows to run.
+    """
+    DEFAULT_THREADS_NUMBER = 2
+    JOIN_INTERVAL = 1
+
+    def __init__(self, save_state, config, run_delta, outputs, run_name,
+                 enable_debug, skip_init=False,
+                 threads_number=DEFAULT_THREADS_NUMBER, *args, **kwargs):
+
+        super(ThreadedRunner, self).__init__(save_state=save_state,
+                                             config=config,
+                                             run_delta=run_delta,
+                                             outputs=outputs,
+                                             skip_init=skip_init,
+                                             run_name=run_name,
+                                             enable_debug=enable_debug,
+                                             *args, **kwargs)
+
+        self.jobs_queue = None
+        self.threads_number = threads_number
+        self._composites_lock = Lock()
+
+    @staticmethod
+    def create_resource_manager():
+        """Suppress creating resource manager so each thread would create one.
+
+        Returns:
+            ClientResourceManager. a resource manager client.
+        """
+        return None
+
+    def queue_test_jobs(self, test_item):
+        """Queue all the cases and flows of the given test.
+
+        Args:
+            test_item (object): test object.
+        """
+        if isinstance(test_item, TestSuite):
+            for sub_test in test_item:
+                self.queue_test_jobs(sub_test)
+
+        elif isinstance(test_item, (TestCase, TestFlow)):
+            self.jobs_queue.put(test_item)
+
+    def clear_jobs_queue(self):
+        """Empty the pending jobs queue, preventing the tests' run."""
+        core_log.debug('Clearing pending tests')
+        try:
+            while True:
+                self.jobs_queue.get(block=False)
+
+        except Empty:
+            pass
+
+    def _get_test(self):
+        """Try to get a new test from the pending jobs queue.
+
+        Returns:
+            object. a pending test, or None if queue is empty.
+        """
+        try:
+            return self.jobs_queue.get(block=False)
+
+        except Empty:
+            return None
+
+    def _propagate_resource_manager(self, test_item, resource_manager):
+        """Propagate the thread's resource manager to the test items.
+
+        Args:
+            test_item (object): test object.
+            resource_manager (ClientResourceManager): the thread's client.
+        """
+        test_item.set_resource_manager(resource_manager)
+        if test_item.IS_COMPLEX:
+            for sub_item in test_item:
+                self._propagate_resource_manager(sub_item, resource_manager)
+
+    def _update_parent_start(self, test_item, result):
+        """Recursively start the parents of the test if needed.
+
+        Args:
+            test_item (object): test item to start its parents.
+            result (SynchronizedResult): result object to report to.
+        """
+        parent_test = test_item.parent
+
+        if parent_test is None:
+            return
+
+        if parent_test.data.status == GeneralData.INITIALIZED:
+            self._update_parent_start(parent_test, result)
+            result.startComposite(parent_test)
+
+    def _update_parent_stop(self, test_item, result):
+        """Recursively stop the parents of the test if they finished.
+
+        Args:
+            test_item (object): test item to stop its parents.
+            result (SynchronizedResult): result object to report to.
+        """
+        parent_test = test_item.parent
+
+        if (parent_test is None or
+                parent_test.data.status == GeneralData.FINISHED):
+            return
+
+        if all(sub_test.data.status == GeneralData.FINISHED
+               for sub_test in parent_test):
+
+            result.stopComposite(parent_test)
+            self._update_parent_stop(parent_test, result)
+
+    def _stop_unfinished_composites(self, test_item, result):
+        """Stop the composites whose tests didn't run (e.g. on failfast).
+
+        Args:
+            test_item (object): test item to go over.
+            result (Result): result object to report to.
+        """
+        if not isinstance(test_item, TestSuite):
+            return
+
+        for sub_test in test_item:
+            self._stop_unfinished_composites(sub_test, result)
+
+        if test_item.data.status == GeneralData.IN_PROGRESS:
+            result.stopComposite(test_item)
+
+    def _fail_remaining_jobs(self, result, exc_info):
+        """Fail the tests that are still in the jobs queue, without running.
+
+        Args:
+            result (SynchronizedResult): result object to report to.
+            exc_info (tuple): the error to fail the tests with.
+        """
+        for test in iter(self._get_test, None):
+            with self._composites_lock:
+                self._update_parent_start(test, result)
+
+            result.startTest(test)
+            result.addError(test, exc_info)
+            result.stopTest(test)
+
+            with self._composites_lock:
+                self._update_parent_stop(test, result)
+
+    def _run_jobs(self, result):
+        """Pull tests from the jobs queue and run them, until it's empty.
+
+        Args:
+            result (SynchronizedResult): result object to report to.
+        """
+        try:
+            resource_manager = \
+                super(ThreadedRunner, self).create_resource_manager()
+
+        except Exception:
+            core_log.exception("Failed creating a resource manager client, "
+                               "failing the remaining tests")
+            self._fail_remaining_jobs(result, sys.exc_info())
+            connection.close()
+            return
+
+        try:
+            for test in iter(self._get_test, None):
+                self._propagate_resource_manager(test, resource_manager)
+
+                with self._composites_lock:
+                    self._update_parent_start(test, result)
+
+                core_log.debug('Running %r', test.data.name)
+                try:
+                    test(result)
+
+                except Exception:
+                    core_log.exception("Running %r failed", test.data.name)
+
+                with self._composites_lock:
+                    self._update_parent_stop(test, result)
+
+                if result.shouldStop:
+                    self.clear_jobs_queue()
+
+        finally:
+            try:
+                if resource_manager.is_connected():
+                    resource_manager.disconnect()
+
+            except Exception:
+                core_log.exception("Failed disconnecting the resource "
+                                   "manager client")
+
+            # Django opens a database connection per thread
+            connection.close()
+
+    def execute(self, test_item):
+        """Execute the given test item.
+
+        * Starts the main test.
+        * Queues the cases and flows of the test.
+        * Runs the tests in the threads and waits for them to finish.
+
+        Args:
+            test_item (object): test object.
+
+        Returns:
+            RunData. test run data.
+        """
+        self._propagate_event_loop(test_item)
+        result = self._makeResult()
+        result.startTestRun()
+
+        self.jobs_queue = Queue()
+        core_log.debug('Queuing %r tests jobs', self.test_item.data.name)
+        self.queue_test_jobs(self.test_item)
+
+        synchronized_result = SynchronizedResult(result)
+
+        core_log.debug('Creating %d test threads', self.threads_number)
+        threads = [Thread(target=self._run_jobs, args=(synchronized_result,))
+                   for _ in xrange(self.threads_number)]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(self.JOIN_INTERVAL)
+
+        self._stop_unfinished_composites(self.test_item, result)
+
+        result.stopTestRun()
+        result.printErrors()
+
+        return self.test_item.data.run_data
@@ -0,0 +1,134 @@
+"""Matching of tests' tracebacks with the known issues signatures.
+
+The signatures are compiled once, and are compiled again only when the
+signatures in the DB change (by any process). Each signature is paired with a
+literal which every matching traceback must contain, so most signatures are
+ruled out by a fast substring check before their regular expression is run.
+"""
+# pylint: disable=global-statement
+import re
+import sre_parse
+import sre_constants
+from threading import Lock
+
+from rotest.common import core_log
+from rotest.core.models.signature import SignatureData
+
+
+SIGNATURE_FLAGS = re.DOTALL | re.MULTILINE
+MAX_ASCII_CODE = 127
+
+
+def get_required_literal(pattern, flags=SIGNATURE_FLAGS):
+    """Return the longest literal which every match of the pattern contains.
+
+    Only literals of the top level sequence of the pattern are considered
+    (not the ones in groups, branches or repetitions), and only ASCII ones,
+    so that checking if a traceback contains the literal won't fail on
+    encoding.
+
+    Args:
+        pattern (str): regular expression to inspect.
+        flags (number): flags the pattern is compiled with.
+
+    Returns:
+        str. the longest required literal, or an empty string if there's none.
+    """
+    parsed_pattern = sre_parse.parse(pattern, flags)
+    if parsed_pattern.pattern.flags & re.IGNORECASE:
+        return ""
+
+    longest_literal = current_literal = ""
+    for opcode, argument in parsed_pattern:
+        if opcode == sre_constants.LITERAL and argument <= MAX_ASCII_CODE:
+            current_literal += chr(argument)
+
+        else:
+            current_literal = ""
+
+        if len(current_literal) > len(longest_literal):
+            longest_literal = current_literal
+
+    return longest_literal
+
+
+class SignatureMatcher(object):
+    """Match tracebacks with a set of precompiled signatures.
+
+    Attributes:
+        compiled_signatures (list): tuples of signature, its required literal
+            and its compiled pattern, in the signatures' order.
+        last_signature_pk (number): the greatest primary key of the given
+            signatures, None if no signatures were given.
+    """
+    def __init__(self, signatures):
+        """Compile the given signatures.
+
+        Signatures with an invalid pattern are skipped.
+
+        Args:
+            signatures (iterable): SignatureData objects to match with.
+        """
+        self.compiled_signatures = []
+        self.last_signature_pk = None
+        for signature in signatures:
+            self.last_signature_pk = max(self.last_signature_pk, signature.pk)
+            try:
+                regex = re.compile(signature.pattern, SIGNATURE_FLAGS)
+
+            except re.error as error:
+                core_log.warning("Skipping signature %r with invalid pattern "
+                                 "%r: %s", signature.name, signature.pattern,
+                                 error)
+                continue
+
+            self.compiled_signatures.append(
+                (signature, get_required_literal(signature.pattern), regex))
+
+    def match(self, exception_str, newer_than=None):
+        """Return the first signature which matches the traceback.
+
+        Args:
+            exception_str (str): exception traceback string.
+            newer_than (number): match only signatures whose primary key is
+                greater than this one. Leave None to match all signatures.
+
+        Returns:
+            SignatureData. the matching signature, None if there's none.
+        """
+        for signature, literal, regex in self.compiled_signatures:
+            if newer_than is not None and signature.pk <= newer_than:
+                continue
+
+            if literal in exception_str and regex.match(exception_str):
+                return signature
+
+        return None
+
+
+_matcher = None
+_matcher_version = None
+_matcher_lock = Lock()
+
+
+def get_signature_matcher():
+    """Return a matcher of all the signatures in the DB.
+
+    The matcher is cached, and is reused as long as the signatures in the DB
+    weren't changed since it was created (which is checked by a query),
+    so signatures which were added, changed or deleted by other processes
+    are matched too.
+
+    Returns:
+        SignatureMatcher. matcher of all the signatures, ordered by creation.
+    """
+    global _matcher, _matcher_version
+    version = list(SignatureData.objects.order_by("pk").values_list(
+        "pk", "name", "link", "pattern"))
+
+    with _matcher_lock:
+        if _matcher is None or _matcher_version != version:
+            _matcher = SignatureMatcher(SignatureData.objects.order_by("pk"))
+            _matcher_version = version
+
+        return _matcher
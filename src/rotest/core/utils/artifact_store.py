@@ -0,0 +1,220 @@
+"""Content-addressed store of artifact files, shared between runs.
+
+Files are stored once by the hash of their content in an objects directory,
+and each run's artifact is a manifest, which lists the run's files and their
+hashes. Since runs tend to produce the same files (e.g. resources' states
+and configuration snapshots), repeated content takes no more storage.
+
+A manifest can be exported into a zip file, like the ones created by the
+'artifact' output handler.
+
+Usage:
+    rotest export <manifest> [--output <zip>] [--objects-dir <dir>]
+"""
+# pylint: disable=invalid-name
+from __future__ import print_function
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+
+from rotest.common.config import ARTIFACTS_DIR
+
+
+OBJECTS_DIR_NAME = "objects"
+DEFAULT_OBJECTS_DIR = os.path.join(ARTIFACTS_DIR, OBJECTS_DIR_NAME)
+MANIFEST_EXTENSION = ".manifest.json"
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024  # 1M
+MAX_IN_MEMORY_FILE_SIZE = 64 * 1024 * 1024  # 64M
+
+
+class ArtifactStore(object):
+    """Store of files by the hash of their content.
+
+    Each file is stored at 'objects/<2 first hash digits>/<rest of hash>'.
+    Files are first copied to a temporary file in the objects directory and
+    then renamed, so concurrent runs storing the same content never see
+    partial objects.
+
+    Attributes:
+        objects_dir (str): the directory of the stored files.
+    """
+    OBJECT_MODE = 0o644
+
+    def __init__(self, objects_dir=DEFAULT_OBJECTS_DIR):
+        self.objects_dir = objects_dir
+
+    def get_object_path(self, content_hash):
+        """Return the path of the stored file with the given hash.
+
+        Args:
+            content_hash (str): hex digest of the file's content.
+
+        Returns:
+            str. path of the stored file.
+        """
+        return os.path.join(self.objects_dir, content_hash[:2],
+                            content_hash[2:])
+
+    @staticmethod
+    def _make_dir(directory):
+        """Create a directory of the store, if it doesn't exist.
+
+        Args:
+            directory (str): path of the directory.
+        """
+        if os.path.exists(directory):
+            return
+
+        try:
+            os.makedirs(directory)
+
+        except OSError:
+            # Another run could have created the directory meanwhile
+            if not os.path.isdir(directory):
+                raise
+
+    def store(self, file_path):
+        """Store a file, unless a file with the same content is stored.
+
+        The file is hashed first, and copied only if its content isn't stored
+        yet. It's copied to a temporary file, which is then named by the hash.
+
+        Args:
+            file_path (str): path of the file to store.
+
+        Returns:
+            str. the hash of the file's content.
+        """
+        content_hash = hashlib.sha256()
+        with open(file_path, "rb") as file_object:
+            for chunk in iter(lambda: file_object.read(HASH_CHUNK_SIZE), ""):
+                content_hash.update(chunk)
+
+        content_hash = content_hash.hexdigest()
+        object_path = self.get_object_path(content_hash)
+        if os.path.exists(object_path):
+            return content_hash
+
+        self._make_dir(os.path.dirname(object_path))
+        temp_fd, temp_path = tempfile.mkstemp(dir=self.objects_dir)
+        try:
+            with os.fdopen(temp_fd, "wb") as temp_file, \
+                    open(file_path, "rb") as file_object:
+                shutil.copyfileobj(file_object, temp_file, HASH_CHUNK_SIZE)
+
+            # The objects directory is shared between the users
+            os.chmod(temp_path, self.OBJECT_MODE)
+            os.rename(temp_path, object_path)
+
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return content_hash
+
+
+def write_manifest(manifest_path, files):
+    """Write a manifest of a run's files, replacing the previous one.
+
+    The manifest is written to a temporary file first, and then renamed over
+    the previous manifest (atomically, except on Windows), so a crash leaves
+    the previous manifest intact.
+
+    Args:
+        manifest_path (str): path of the manifest.
+        files (list): dicts describing the files (name, hash, size, mtime and
+            mode).
+    """
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w") as manifest_file:
+        json.dump({"version": MANIFEST_VERSION, "files": files},
+                  manifest_file, indent=1)
+
+    if sys.platform == "win32" and os.path.exists(manifest_path):
+        # Renaming over an existing file fails on Windows
+        os.remove(manifest_path)
+
+    os.rename(temp_path, manifest_path)
+
+
+def read_manifest(manifest_path):
+    """Return the files listed in a manifest.
+
+    Args:
+        manifest_path (str): path of the manifest.
+
+    Returns:
+        list. dicts describing the files (name, hash, size, mtime and mode).
+    """
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError("Unsupported manifest version %r in %r" %
+                         (manifest.get("version"), manifest_path))
+
+    return manifest["files"]
+
+
+def export_manifest(manifest_path, zip_path, store=None):
+    """Create a zip file of the files listed in a manifest.
+
+    Args:
+        manifest_path (str): path of the manifest.
+        zip_path (str): path of the zip file to create.
+        store (ArtifactStore): the store of the files, leave None to use the
+            default objects directory.
+    """
+    if store is None:
+        store = ArtifactStore()
+
+    with ZipFile(zip_path, mode="w", compression=ZIP_DEFLATED,
+                 allowZip64=True) as artifact:
+
+        for file_entry in read_manifest(manifest_path):
+            object_path = store.get_object_path(file_entry["hash"])
+            if file_entry["size"] > MAX_IN_MEMORY_FILE_SIZE:
+                artifact.write(object_path, file_entry["name"])
+                continue
+
+            info = ZipInfo(file_entry["name"],
+                           time.localtime(file_entry["mtime"])[:6])
+            info.external_attr = (file_entry["mode"] & 0xFFFF) << 16
+            info.compress_type = ZIP_DEFLATED
+            with open(object_path, "rb") as object_file:
+                artifact.writestr(info, object_file.read())
+
+
+def main():
+    """Export a run's artifact manifest into a zip file."""
+    parser = argparse.ArgumentParser(
+        prog="rotest export",
+        description="Export a run's artifact manifest into a zip file")
+
+    parser.add_argument("manifest", help="path of the artifact manifest")
+    parser.add_argument("--output", "-o", default=None,
+                        help="path of the zip file to create (default: the "
+                             "manifest's path, with a .zip extension)")
+    parser.add_argument("--objects-dir", default=DEFAULT_OBJECTS_DIR,
+                        help="directory of the stored files (default: %s)" %
+                             DEFAULT_OBJECTS_DIR)
+    args = parser.parse_args(sys.argv[2:])
+
+    zip_path = args.output
+    if zip_path is None:
+        zip_path = args.manifest
+        if zip_path.endswith(MANIFEST_EXTENSION):
+            zip_path = zip_path[:-len(MANIFEST_EXTENSION)]
+
+        zip_path += ".zip"
+
+    export_manifest(args.manifest, zip_path, ArtifactStore(args.objects_dir))
+    print("Exported %r to %r" % (args.manifest, zip_path))
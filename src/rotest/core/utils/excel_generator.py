@@ -8,9 +8,13 @@ import django
 from rotest.core.models.run_data import RunData
 from rotest.common.django_utils import get_sub_model
 from rotest.core.models.case_data import CaseData, TestOutcome
+from rotest.core.result.handlers.xlsx_handler import XlsxHandler
 from rotest.core.result.handlers.excel_handler import ExcelHandler
 
 
+XLSX_EXTENSION = ".xlsx"
+
+
 class TestSimulator(object):
     """A class that simulates a test or container instance."""
     def __init__(self, data, identifier, parents_count):
@@ -106,17 +110,22 @@ def generate_excel(run_name, dest_path):
 
     Args:
         run_name (str): name of the run to summarize.
-        dest_path (str): path to create the excel in.
+        dest_path (str): path to create the excel in. Paths ending with
+            '.xlsx' are written in the XLSX format, which has no rows limit.
     """
     main_test = _generate_tests_tree_by_run_name(run_name)
-    handler = ExcelHandler(main_test, output_file_path=dest_path)
+    handler_class = ExcelHandler
+    if dest_path.endswith(XLSX_EXTENSION):
+        handler_class = XlsxHandler
+
+    handler = handler_class(main_test, output_file_path=dest_path)
     handler.start_test_run()
     for case in main_test.iter_cases():
         result_type = case.data.exception_type
         if result_type is not None:
-            handler._write_case_result(case)
+            handler.stop_test(case)
 
-    handler.workbook.save(handler.output_file_path)
+    handler.stop_test_run()
 
 
 def main():
@@ -0,0 +1,229 @@
+"""Time series of the samples taken by monitors during tests.
+
+Cyclic monitors record typed samples (e.g. CPU usage, memory or traffic)
+into fixed-size ring buffers of the test. At the end of the test, each
+buffer is written to a columnar file in the test's work directory:
+a JSON header line, followed by the raw timestamps column and the raw
+values column.
+"""
+import os
+import re
+import sys
+import json
+import math
+import time
+import threading
+from array import array
+
+METRICS_DIR_NAME = "metrics"
+METRIC_EXTENSION = ".col"
+METRIC_FILE_VERSION = 1
+TIMESTAMP_TYPECODE = "d"
+NUMERIC_TYPECODES = "bBhHiIlLfd"
+
+
+class MetricBuffer(object):
+    """Fixed-size ring buffer of a metric's samples, backed by arrays.
+
+    When the buffer is full, each new sample replaces the oldest one. The
+    samples are recorded and read under a lock, since cyclic monitors may
+    still record samples while the buffer is written.
+
+    Attributes:
+        name (str): name of the metric.
+        typecode (str): array typecode of the values, e.g. 'd' or 'L'.
+        capacity (number): maximal amount of samples kept.
+        count (number): amount of samples recorded, including dropped ones.
+    """
+    def __init__(self, name, typecode="d", capacity=3600):
+        if typecode not in NUMERIC_TYPECODES:
+            raise ValueError("Unsupported metric typecode %r, expected one "
+                             "of %r" % (typecode, NUMERIC_TYPECODES))
+
+        if capacity <= 0:
+            raise ValueError("Metric capacity must be positive, got %r" %
+                             capacity)
+
+        self.name = name
+        self.typecode = typecode
+        self.capacity = capacity
+        self.count = 0
+
+        self._lock = threading.Lock()
+        self._timestamps = array(TIMESTAMP_TYPECODE, [0]) * capacity
+        self._values = array(typecode, [0]) * capacity
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def dropped(self):
+        """Amount of samples replaced by newer ones."""
+        return self.count - len(self)
+
+    def record(self, value, timestamp=None):
+        """Add a sample to the buffer.
+
+        Args:
+            value (number): the sampled value.
+            timestamp (number): time of the sample, leave None for now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            index = self.count % self.capacity
+            self._values[index] = value
+            self._timestamps[index] = timestamp
+            self.count += 1
+
+    def _ordered(self, column):
+        """Return the samples of the column, from the oldest to the newest.
+
+        Args:
+            column (array.array): the timestamps or the values column.
+
+        Returns:
+            array.array. the kept samples of the column.
+        """
+        if self.count <= self.capacity:
+            return column[:self.count]
+
+        index = self.count % self.capacity
+        return column[index:] + column[:index]
+
+    def samples(self):
+        """Return a snapshot of the kept samples, oldest first.
+
+        Returns:
+            tuple. the amount of samples recorded, the timestamps and the
+                values of the kept samples (array.array).
+        """
+        with self._lock:
+            return (self.count, self._ordered(self._timestamps),
+                    self._ordered(self._values))
+
+    def timestamps(self):
+        """Return the timestamps of the kept samples, oldest first."""
+        return self.samples()[1]
+
+    def values(self):
+        """Return the values of the kept samples, oldest first."""
+        return self.samples()[2]
+
+    def summary(self):
+        """Return statistics of the kept samples.
+
+        Returns:
+            dict. the samples' count, min, max, mean and 95th percentile
+                (nearest rank), the statistics are None if there are no
+                samples.
+        """
+        values = sorted(self.values())
+        if len(values) == 0:
+            return {"count": 0, "min": None, "max": None, "mean": None,
+                    "p95": None}
+
+        p95_rank = int(math.ceil(0.95 * len(values)))
+        return {"count": len(values),
+                "min": values[0],
+                "max": values[-1],
+                "mean": float(sum(values)) / len(values),
+                "p95": values[p95_rank - 1]}
+
+    def write(self, file_path):
+        """Write the kept samples to a columnar file.
+
+        Args:
+            file_path (str): path of the file to create.
+        """
+        count, timestamps, values = self.samples()
+        header = {"version": METRIC_FILE_VERSION,
+                  "name": self.name,
+                  "typecode": self.typecode,
+                  "count": len(values),
+                  "dropped": count - len(values),
+                  "byteorder": sys.byteorder}
+
+        with open(file_path, "wb") as metric_file:
+            metric_file.write(json.dumps(header) + "\n")
+            timestamps.tofile(metric_file)
+            values.tofile(metric_file)
+
+
+def read_metric_file(file_path):
+    """Read a metric's samples from a columnar file.
+
+    Args:
+        file_path (str): path of the metric's file.
+
+    Returns:
+        tuple. the file's header (dict), the timestamps and the values
+            (array.array).
+    """
+    with open(file_path, "rb") as metric_file:
+        header = json.loads(metric_file.readline())
+        if header.get("version") != METRIC_FILE_VERSION:
+            raise ValueError("Unsupported metric file version %r in %r" %
+                             (header.get("version"), file_path))
+
+        timestamps = array(TIMESTAMP_TYPECODE)
+        timestamps.fromfile(metric_file, header["count"])
+        values = array(str(header["typecode"]))
+        values.fromfile(metric_file, header["count"])
+
+    if header["byteorder"] != sys.byteorder:
+        timestamps.byteswap()
+        values.byteswap()
+
+    return header, timestamps, values
+
+
+def get_metric_file_name(name):
+    """Return the name of a metric's file.
+
+    Args:
+        name (str): name of the metric.
+
+    Returns:
+        str. the metric's name, safe to use as a file name.
+    """
+    return re.sub(r"[^\w.-]", "_", name) + METRIC_EXTENSION
+
+
+def get_metrics_summary(test):
+    """Return the statistics of the samples taken during the test.
+
+    In multiprocess runs the samples are kept by the worker which ran the
+    test, so the main process uses the statistics the worker sent instead.
+
+    Args:
+        test (object): test item instance.
+
+    Returns:
+        dict. statistics of the test's metrics, by the metrics' names.
+    """
+    metrics_summary = getattr(test, "metrics_summary", None)
+    if metrics_summary is not None:
+        return metrics_summary
+
+    return {name: metric.summary()
+            for name, metric in getattr(test, "metrics", {}).items()}
+
+
+def write_test_metrics(test):
+    """Write the samples taken during the test to its work directory.
+
+    Args:
+        test (object): test item instance.
+    """
+    metrics = getattr(test, "metrics", {})
+    if len(metrics) == 0:
+        return
+
+    metrics_dir = os.path.join(test.work_dir, METRICS_DIR_NAME)
+    if not os.path.exists(metrics_dir):
+        os.makedirs(metrics_dir)
+
+    for name, metric in metrics.items():
+        metric.write(os.path.join(metrics_dir, get_metric_file_name(name)))
@@ -0,0 +1,235 @@
+"""Profile the runs of tests, to find the functions they spend their time in.
+
+Only the setUp, test and tearDown methods of the tests are profiled, and not
+the locking of their resources or the result handlers' calls.
+
+Two profiling modes are supported:
+
+* cprofile - deterministic profiling using :mod:`cProfile`, which measures
+  every function call of the test's thread. The statistics are saved in the
+  test's work directory as a '.pstats' file, which can be loaded using
+  :class:`pstats.Stats` or tools like snakeviz.
+* sampling - samples the stack of the test's thread periodically, which adds
+  much less overhead to the test. The samples are saved in the test's work
+  directory as collapsed stacks (a 'frame;frame;frame count' line per stack),
+  which is the input format of flame graph tools.
+"""
+# pylint: disable=protected-access
+import os
+import sys
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from operator import itemgetter
+
+CPROFILE = "cprofile"
+SAMPLING = "sampling"
+PROFILE_MODES = (CPROFILE, SAMPLING)
+
+PSTATS_FILE_NAME = "profile.pstats"
+COLLAPSED_FILE_NAME = "profile.collapsed"
+
+BUILTIN_FILE_NAME = "~"
+
+
+def format_function(file_name, line_number, function_name):
+    """Return a short description of a function, e.g. 'run (case.py:142)'.
+
+    Args:
+        file_name (str): path of the function's source file.
+        line_number (number): line number of the function's definition.
+        function_name (str): name of the function.
+
+    Returns:
+        str. description of the function.
+    """
+    if file_name == BUILTIN_FILE_NAME:
+        return function_name
+
+    return "%s (%s:%d)" % (function_name, os.path.basename(file_name),
+                           line_number)
+
+
+class DeterministicProfiler(object):
+    """Profile every function call of the thread, using cProfile.
+
+    Note:
+        The profiler must be started and stopped in the profiled thread.
+    """
+    FILE_NAME = PSTATS_FILE_NAME
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        """Start profiling the current thread."""
+        self._profile.enable()
+
+    def stop(self):
+        """Stop profiling."""
+        self._profile.disable()
+
+    def save(self, directory):
+        """Save the profile's statistics as a '.pstats' file.
+
+        Args:
+            directory (str): directory to save the file in.
+
+        Returns:
+            str. path of the saved file.
+        """
+        file_path = os.path.join(directory, self.FILE_NAME)
+        self._profile.dump_stats(file_path)
+        return file_path
+
+
+class SamplingProfiler(object):
+    """Sample the stack of the thread periodically from a background thread.
+
+    Only Python frames are sampled, so the time spent in C functions (e.g.
+    waiting on a socket) is attributed to the Python function calling them.
+
+    Attributes:
+        INTERVAL (number): default seconds between samples.
+        interval (number): seconds between samples.
+        stacks (collections.Counter): number of samples of each stack, by its
+            collapsed form, e.g. 'run (case.py:142);test_method (tests.py:9)'.
+    """
+    FILE_NAME = COLLAPSED_FILE_NAME
+    INTERVAL = 0.005
+
+    def __init__(self, interval=INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+
+        self._thread_id = None
+        self._sampler = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start sampling the current thread."""
+        self._thread_id = threading.current_thread().ident
+        self._stopped.clear()
+        self._sampler = threading.Thread(target=self._sample_periodically,
+                                         name="SamplingProfiler")
+        self._sampler.daemon = True
+        self._sampler.start()
+
+    def stop(self):
+        """Stop sampling, and wait for the sampling thread to end."""
+        self._stopped.set()
+        self._sampler.join()
+
+    def _sample_periodically(self):
+        """Sample the thread until the profiler is stopped."""
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Add the current stack of the sampled thread to the samples."""
+        frame = sys._current_frames().get(self._thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(format_function(code.co_filename,
+                                         code.co_firstlineno,
+                                         code.co_name))
+            frame = frame.f_back
+
+        if len(stack) > 0:
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def save(self, directory):
+        """Save the samples as collapsed stacks.
+
+        Args:
+            directory (str): directory to save the file in.
+
+        Returns:
+            str. path of the saved file.
+        """
+        file_path = os.path.join(directory, self.FILE_NAME)
+        with open(file_path, "w") as collapsed_file:
+            for stack, samples in sorted(self.stacks.iteritems()):
+                collapsed_file.write("%s %d\n" % (stack, samples))
+
+        return file_path
+
+
+PROFILERS = {CPROFILE: DeterministicProfiler,
+             SAMPLING: SamplingProfiler}
+
+
+def create_profiler(mode):
+    """Create a profiler of the given mode.
+
+    Args:
+        mode (str): profiling mode, one of PROFILE_MODES.
+
+    Returns:
+        object. a profiler which has 'start', 'stop' and 'save' methods.
+
+    Raises:
+        ValueError: the mode isn't supported.
+    """
+    if mode not in PROFILERS:
+        raise ValueError("Unknown profile mode %r, options are: %s" %
+                         (mode, ", ".join(PROFILE_MODES)))
+
+    return PROFILERS[mode]()
+
+
+def get_profile_mode(test):
+    """Return the profiling mode configured for the test's run.
+
+    Args:
+        test (object): test item instance.
+
+    Returns:
+        str. the profiling mode, or None if the test shouldn't be profiled.
+    """
+    if not isinstance(test.config, dict):
+        return None
+
+    return test.config.get("profile")
+
+
+def get_hot_functions(directory, limit=10):
+    """Return the functions a profiled test spent the most time in.
+
+    The time of each function is its own time, excluding the functions it
+    called, as a fraction of the test's profiled time.
+
+    Args:
+        directory (str): the test's work directory.
+        limit (number): maximal number of functions to return.
+
+    Returns:
+        list. (function description, fraction of the time) tuples, from the
+            hottest function. empty if the test wasn't profiled.
+    """
+    pstats_path = os.path.join(directory, PSTATS_FILE_NAME)
+    collapsed_path = os.path.join(directory, COLLAPSED_FILE_NAME)
+
+    own_times = Counter()
+    if os.path.exists(pstats_path):
+        stats = pstats.Stats(pstats_path)
+        for function, (_, _, own_time, _, _) in stats.stats.iteritems():
+            own_times[format_function(*function)] += own_time
+
+    elif os.path.exists(collapsed_path):
+        with open(collapsed_path) as collapsed_file:
+            for line in collapsed_file:
+                stack, samples = line.rsplit(" ", 1)
+                own_times[stack.rsplit(";", 1)[-1]] += int(samples)
+
+    total_time = sum(own_times.itervalues())
+    if total_time == 0:
+        return []
+
+    hot_functions = sorted(own_times.iteritems(), key=itemgetter(1),
+                           reverse=True)[:limit]
+
+    return [(function, own_time / float(total_time))
+            for function, own_time in hot_functions]
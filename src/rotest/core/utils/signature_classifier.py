@@ -0,0 +1,172 @@
+"""Known issues classification script for stored tests failures.
+
+Matches the tracebacks of the failed and errored cases in the DB against the
+known issues signatures, and links each case to the signature it matches.
+
+The classification is incremental: each case remembers the last signature it
+was matched against, so new cases are matched against all the signatures,
+while already classified cases are matched only against newer signatures.
+Changes in the patterns of existing signatures are not re-applied, unless
+the classification is reset. The cases of a deleted signature are matched
+against all the signatures again.
+
+Usage:
+    rotest classify [--processes <processes>] [--chunk-size <size>] [--reset]
+"""
+# pylint: disable=invalid-name
+from __future__ import print_function
+
+import sys
+import argparse
+from multiprocessing import Pool
+from collections import defaultdict
+
+import django
+from django.db.models import Q
+from django.db import connection, transaction
+
+from rotest.common import core_log
+from rotest.core.models.case_data import CaseData, TestOutcome
+from rotest.core.models.traceback_data import (TracebackData,
+                                               decompress_traceback)
+from rotest.core.signature_matcher import get_signature_matcher
+
+
+DEFAULT_CHUNK_SIZE = 500
+CLASSIFIED_OUTCOMES = (TestOutcome.ERROR, TestOutcome.FAILED)
+
+
+def get_unclassified_cases(last_signature_pk):
+    """Return the failed cases which weren't matched against all signatures.
+
+    Args:
+        last_signature_pk (number): the greatest primary key of the
+            signatures to match against.
+
+    Returns:
+        django.db.models.query.QuerySet. the cases to classify.
+    """
+    return CaseData.objects.filter(
+        exception_type__in=CLASSIFIED_OUTCOMES,
+        signature__isnull=True, traceback_data__isnull=False).filter(
+        Q(last_checked_signature__isnull=True) |
+        Q(last_checked_signature__lt=last_signature_pk))
+
+
+def classify_cases(cases_ids):
+    """Match the cases' tracebacks against the signatures they weren't.
+
+    Cases share their stored tracebacks, so each distinct traceback is loaded
+    and matched only once per chunk.
+
+    Args:
+        cases_ids (list): primary keys of the cases to classify.
+
+    Returns:
+        number. the amount of cases which matched a signature.
+    """
+    matcher = get_signature_matcher()
+    signature_to_cases = defaultdict(list)
+
+    cases = list(CaseData.objects.filter(pk__in=cases_ids).values_list(
+        "pk", "traceback_data", "last_checked_signature"))
+
+    tracebacks = dict(TracebackData.objects.filter(
+        pk__in=set(traceback_id for _, traceback_id, _ in cases)).values_list(
+        "pk", "body"))
+
+    matches = {}
+    for case_id, traceback_id, last_checked_signature in cases:
+        key = (traceback_id, last_checked_signature)
+        if key not in matches:
+            traceback = decompress_traceback(tracebacks[traceback_id])
+            matches[key] = matcher.match(traceback,
+                                         newer_than=last_checked_signature)
+
+        signature_to_cases[matches[key]].append(case_id)
+
+    with transaction.atomic():
+        for signature, signature_cases in signature_to_cases.iteritems():
+            CaseData.objects.filter(pk__in=signature_cases).update(
+                signature=signature,
+                last_checked_signature=matcher.last_signature_pk)
+
+    return sum(len(signature_cases) for signature, signature_cases
+               in signature_to_cases.iteritems() if signature is not None)
+
+
+def reset_classification():
+    """Unlink all the cases from their signatures, to classify them again."""
+    CaseData.objects.filter(last_checked_signature__isnull=False).update(
+        signature=None, last_checked_signature=None)
+
+
+def classify_failures(processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Classify the failures which weren't matched against all signatures.
+
+    The cases are classified in chunks, which are distributed between worker
+    processes, each with its own DB connection.
+
+    Args:
+        processes (number): amount of worker processes to use. Leave None to
+            use one process per CPU, or pass 1 to classify in this process.
+        chunk_size (number): amount of cases in each chunk.
+
+    Returns:
+        tuple. the amount of classified cases and the amount of them which
+            matched a signature.
+    """
+    matcher = get_signature_matcher()
+    if matcher.last_signature_pk is None:
+        return 0, 0
+
+    # Read all the identifiers first, to not hold the DB while it's updated
+    cases_ids = list(get_unclassified_cases(
+        matcher.last_signature_pk).values_list("pk", flat=True).iterator())
+    chunks = [cases_ids[index:index + chunk_size]
+              for index in xrange(0, len(cases_ids), chunk_size)]
+
+    core_log.debug("Classifying %d cases in %d chunks",
+                   len(cases_ids), len(chunks))
+
+    if processes == 1:
+        matches = [classify_cases(chunk) for chunk in chunks]
+
+    else:
+        # The worker processes must not share this process' DB connection
+        connection.close()
+        pool = Pool(processes)
+        try:
+            matches = pool.map(classify_cases, chunks)
+
+        finally:
+            pool.close()
+            pool.join()
+
+    return len(cases_ids), sum(matches)
+
+
+def main():
+    """Classify the stored failures by the known issues signatures."""
+    django.setup()
+    parser = argparse.ArgumentParser(
+        prog="rotest classify",
+        description="Link failed tests in the DB to known issues signatures")
+
+    parser.add_argument("--processes", "-p", type=int, default=None,
+                        help="amount of worker processes (default: one per "
+                             "CPU)")
+    parser.add_argument("--chunk-size", "-c", type=int,
+                        default=DEFAULT_CHUNK_SIZE,
+                        help="amount of failures classified at once")
+    parser.add_argument("--reset", action="store_true",
+                        help="classify all the failures again, e.g. after "
+                             "changing patterns of signatures")
+    args = parser.parse_args(sys.argv[2:])
+
+    if args.reset:
+        reset_classification()
+
+    classified, matched = classify_failures(args.processes, args.chunk_size)
+    print("Classified %d failures, %d of them matched a signature" %
+          (classified, matched))
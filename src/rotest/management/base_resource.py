@@ -53,6 +53,8 @@ class BaseResource(object):
         DATA_CLASS (class): class of the resource's global data container.
         PARALLEL_INITIALIZATION (bool): whether or not to validate and
             initialize sub-resources in other threads.
+        STATE_TIMEOUT (number): seconds to wait for the resource's state to
+            be stored, None to use the test's STATE_TIMEOUT.
         logger (logger): resource's logger instance.
         data (ResourceData): assigned data instance.
         config (AttrDict): run configuration.
@@ -64,6 +66,7 @@ class BaseResource(object):
 
     DATA_CLASS = None
     PARALLEL_INITIALIZATION = False
+    STATE_TIMEOUT = None
 
     _SHELL_CLIENT = None
     _SHELL_REQUEST_NAME = 'shell_resource'
@@ -6,8 +6,9 @@ also for the resources cleanup procedure and release.
 # pylint: disable=invalid-name,too-many-instance-attributes,too-many-branches
 # pylint: disable=too-few-public-methods,too-many-arguments,too-many-locals
 # pylint: disable=no-member,method-hidden,broad-except,too-many-public-methods
+from functools import wraps
 from itertools import izip
-from threading import Thread
+from threading import Thread, RLock
 
 import time
 
@@ -15,6 +16,8 @@ import re
 from attrdict import AttrDict
 
 from rotest.common import core_log
+from rotest.common.timing import (PhaseTimer, LOCK, PREPARE, CONNECT,
+                                  VALIDATE, INITIALIZE, FINALIZE)
 from rotest.management.client.client import AbstractClient
 from rotest.api.common.responses import FailureResponseModel
 from rotest.api.resource_control.lock_resources import USER_NOT_EXIST
@@ -81,6 +84,10 @@ class ClientResourceManager(AbstractClient):
             that are yet to be released.
         keep_resources (bool): whether to keep the resources locked until
             they are not needed.
+        immediate_locks (number): number of lock requests that were granted
+            on the first attempt.
+        blocked_locks (number): number of lock requests that had to wait for
+            unavailable resources (whether they were granted or not).
     """
     DEFAULT_KEEP_RESOURCES = True
 
@@ -93,8 +100,20 @@ class ClientResourceManager(AbstractClient):
         self.locked_resources = []
         self.keep_resources = keep_resources
 
+        self.blocked_locks = 0
+        self.immediate_locks = 0
+
         super(ClientResourceManager, self).__init__(logger=logger, host=host)
 
+    def lock_wait_hook(self):
+        """Hook called after each failed attempt to lock resources.
+
+        Replace it on the instance (e.g. with a function that raises an
+        exception) to stop waiting for the resources before the lock timeout.
+        By default, the client waits until the timeout.
+        """
+        pass
+
     def _release_locked_resources(self):
         """Release the locked resources of the client."""
         if len(self.locked_resources) > 0:
@@ -117,7 +136,8 @@ class ClientResourceManager(AbstractClient):
                                    data=TokenModel({"token": self.token}))
             super(ClientResourceManager, self).disconnect()
 
-    def _initialize_resource(self, resource, skip_init=False):
+    def _initialize_resource(self, resource, skip_init=False,
+                             phase_timer=None):
         """Try to initialize the resource.
 
         Note:
@@ -126,9 +146,15 @@ class ClientResourceManager(AbstractClient):
         Args:
             resource(BaseResource): resource to initialize.
             skip_init (bool): True to skip initialize and validation.
+            phase_timer (PhaseTimer): timer to record the durations of the
+                resource's phases in.
         """
+        if phase_timer is None:
+            phase_timer = PhaseTimer()
+
         try:
-            resource.connect()
+            with phase_timer.measure_resource(resource.name, CONNECT):
+                resource.connect()
 
         except Exception:
             self.logger.exception("Connecting to %r failed", resource.name)
@@ -140,21 +166,28 @@ class ClientResourceManager(AbstractClient):
 
         try:
             self.logger.debug("Initializing resource %r", resource.name)
-            self._validate_resource(resource)
+            self._validate_resource(resource, phase_timer)
             self.logger.debug("Resource %r was initialized", resource.name)
 
         except Exception:
             self.logger.exception("Failed initializing %r, calling finalize",
                                   resource.name)
-            resource.finalize()
+            with phase_timer.measure_resource(resource.name, FINALIZE):
+                resource.finalize()
+
             raise
 
-    def _validate_resource(self, resource):
+    def _validate_resource(self, resource, phase_timer=None):
         """Validate and initialize if needed the resource and its subresources.
 
         Args:
             resource (BaseResource): resource to validate and initialize.
+            phase_timer (PhaseTimer): timer to record the durations of the
+                resources' phases in.
         """
+        if phase_timer is None:
+            phase_timer = PhaseTimer()
+
         sub_threads = []
         for sub_resource in resource.get_sub_resources():
             if resource.PARALLEL_INITIALIZATION:
@@ -162,22 +195,28 @@ class ClientResourceManager(AbstractClient):
                                           sub_resource.name)
 
                 initialize_thread = Thread(target=self._validate_resource,
-                                           args=[sub_resource])
+                                           args=[sub_resource, phase_timer])
                 initialize_thread.start()
                 sub_threads.append(initialize_thread)
 
             else:
-                self._validate_resource(sub_resource)
+                self._validate_resource(sub_resource, phase_timer)
 
         for sub_thread in sub_threads:
             sub_thread.join()
 
-        if resource.force_initialize or not resource.validate():
+        is_valid = False
+        if not resource.force_initialize:
+            with phase_timer.measure_resource(resource.name, VALIDATE):
+                is_valid = resource.validate()
+
+        if not is_valid:
             if not resource.force_initialize:
                 self.logger.debug("Resource %r validation failed",
                                   resource.name)
 
-            resource.initialize()
+            with phase_timer.measure_resource(resource.name, INITIALIZE):
+                resource.initialize()
 
         else:
             self.logger.debug("Resource %r skipped initialization",
@@ -202,7 +241,8 @@ class ClientResourceManager(AbstractClient):
                                            force_initialize)
 
     def _setup_resources(self, requests, resources, force_initialize,
-                         base_work_dir, config, enable_debug, skip_init):
+                         base_work_dir, config, enable_debug, skip_init,
+                         phase_timer=None):
         """Prepare the resources for work.
 
         Iterates over the resources and tries to prepare them for
@@ -221,6 +261,8 @@ class ClientResourceManager(AbstractClient):
             config (dict): run configuration dictionary.
             enable_debug (bool): True to wrap the resource's method with debug.
             skip_init (bool): True to skip initialization and validation.
+            phase_timer (PhaseTimer): timer to record the durations of the
+                resources' phases in.
 
         Yields:
             tuple. pairs of locked and initialized resources (name, resource).
@@ -244,11 +286,11 @@ class ClientResourceManager(AbstractClient):
             if enable_debug:
                 resource.enable_debug()
 
-            self._initialize_resource(resource, skip_init)
+            self._initialize_resource(resource, skip_init, phase_timer)
 
             yield (request.name, resource)
 
-    def _cleanup_resources(self, resources):
+    def _cleanup_resources(self, resources, phase_timer=None):
         """Cleanup the resources and release them.
 
         Iterates over the resources dictionary and tries to cleanup each
@@ -256,10 +298,15 @@ class ClientResourceManager(AbstractClient):
 
         Args:
             resources (AttrDict): dictionary of resources {name: BaseResource}.
+            phase_timer (PhaseTimer): timer to record the durations of the
+                resources' finalization in.
 
         Raises:
             RuntimeError. releasing resources failed.
         """
+        if phase_timer is None:
+            phase_timer = PhaseTimer()
+
         exceptions = []
 
         self.logger.debug("cleaning up the locked resources")
@@ -268,7 +315,9 @@ class ClientResourceManager(AbstractClient):
 
             try:
                 resource.logger.debug("Finalizing resource %r", name)
-                resource.finalize()
+                with phase_timer.measure_resource(resource.name, FINALIZE):
+                    resource.finalize()
+
                 resource.logger.debug("Resource %r Finalized", name)
 
             except Exception as err:
@@ -297,6 +346,7 @@ class ClientResourceManager(AbstractClient):
             UnknownUserError. if the user requested the lock is unknown.
             ResourceUnavailableError. if timeout is reached and no resource
                 could be locked.
+            Exception. any error raised by 'lock_wait_hook' to stop waiting.
         """
         encoded_requests = [descriptor.encode() for descriptor in
                             descriptors]
@@ -306,6 +356,7 @@ class ClientResourceManager(AbstractClient):
             "token": self.token
         })
 
+        blocked = False
         start_time = time.time()
         while True:
             response = self.requester.request(LockResources,
@@ -317,12 +368,21 @@ class ClientResourceManager(AbstractClient):
                 if match:
                     raise UnknownUserError(response.details)
 
+                if not blocked:
+                    blocked = True
+                    self.blocked_locks += 1
+
+                self.lock_wait_hook()
+
                 if time.time() - start_time > timeout:
                     raise ResourceUnavailableError(response.details)
 
             else:
                 break
 
+        if not blocked:
+            self.immediate_locks += 1
+
         return response
 
     def _lock_resources(self, descriptors, timeout=None):
@@ -484,7 +544,8 @@ class ClientResourceManager(AbstractClient):
                           use_previous=True,
                           enable_debug=False,
                           force_initialize=False,
-                          base_work_dir=ROTEST_WORK_DIR):
+                          base_work_dir=ROTEST_WORK_DIR,
+                          phase_timer=None):
         """Lock the required resources and prepare them for work.
 
         * Requests the resources from the manager server.
@@ -501,6 +562,8 @@ class ClientResourceManager(AbstractClient):
             force_initialize (bool): determines if the resources will be
                 initialized even if their validation succeeds.
             base_work_dir (str): base work directory path.
+            phase_timer (PhaseTimer): timer to record the time waited for the
+                lock, and the durations of the resources' phases in.
 
         Returns:
             AttrDict. resources AttrDict {name: BaseResource}.
@@ -508,6 +571,9 @@ class ClientResourceManager(AbstractClient):
         Raises:
             ServerError. resource manager failed to lock resources.
         """
+        if phase_timer is None:
+            phase_timer = PhaseTimer()
+
         requests = list(requests)
         descriptors = [ResourceDescriptor(request.type, **request.kwargs)
                        for request in requests]
@@ -520,33 +586,38 @@ class ClientResourceManager(AbstractClient):
                                                             descriptors)
 
         self.logger.debug("Requesting resources from resource manager")
-        locked_resources = self._lock_resources(descriptors)
+        with phase_timer.measure(LOCK):
+            locked_resources = self._lock_resources(descriptors)
+
         self.logger.info("Locked resources %s", locked_resources)
 
         try:
             self.logger.debug("Setting up the locked resources")
 
-            for name, resource in self._setup_resources(requests,
-                                                        locked_resources,
-                                                        force_initialize,
-                                                        base_work_dir,
-                                                        config,
-                                                        enable_debug,
-                                                        skip_init):
+            with phase_timer.measure(PREPARE):
+                for name, resource in self._setup_resources(requests,
+                                                            locked_resources,
+                                                            force_initialize,
+                                                            base_work_dir,
+                                                            config,
+                                                            enable_debug,
+                                                            skip_init,
+                                                            phase_timer):
 
-                initialized_resources[name] = resource
+                    initialized_resources[name] = resource
 
-                if self.keep_resources:
-                    self.locked_resources.append(resource)
+                    if self.keep_resources:
+                        self.locked_resources.append(resource)
 
             return initialized_resources
 
         except Exception:
-            self._cleanup_resources(initialized_resources)
+            self._cleanup_resources(initialized_resources, phase_timer)
             self._release_resources(locked_resources)
             raise
 
-    def release_resources(self, resources, dirty=False, force_release=False):
+    def release_resources(self, resources, dirty=False, force_release=False,
+                          phase_timer=None, finalize=True):
         """Cleanup the resources and release them.
 
         Iterates over the resources dictionary and tries to cleanup each
@@ -557,6 +628,11 @@ class ClientResourceManager(AbstractClient):
             dirty (bool): the resources requested dirty state.
             force_release (bool): release even if the client is supposed
                 to keep the resources.
+            phase_timer (PhaseTimer): timer to record the durations of the
+                resources' finalization in.
+            finalize (bool): whether to finalize the resources, or only
+                release their locks (e.g. when they're still in use, and
+                would be finalized by their user).
 
         Raises:
             RuntimeError. releasing resources failed.
@@ -566,7 +642,8 @@ class ClientResourceManager(AbstractClient):
             return
 
         try:
-            self._cleanup_resources(resources)
+            if finalize:
+                self._cleanup_resources(resources, phase_timer)
 
         finally:
             self._release_resources(resources=resources.values())
@@ -587,3 +664,31 @@ class ClientResourceManager(AbstractClient):
 
         return [self.parser.decode(resource)
                 for resource in response.resource_descriptors]
+
+
+class SynchronizedResourceManager(object):
+    """Proxy to a resource manager client, which serializes its calls.
+
+    Used when tests share a client from several threads (e.g. the blocks of
+    a parallel flow), since the client keeps the state of its locked
+    resources and isn't thread-safe.
+
+    Attributes:
+        resource_manager (ClientResourceManager): the wrapped client.
+    """
+    def __init__(self, resource_manager):
+        self.resource_manager = resource_manager
+        self._lock = RLock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.resource_manager, name)
+        if not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        def synchronized_method(*args, **kwargs):
+            """Call the client's method while holding the lock."""
+            with self._lock:
+                return attribute(*args, **kwargs)
+
+        return synchronized_method
@@ -10,7 +10,9 @@ from rotest.api.common.models import (StartTestRunParamsModel,
                                       UpdateRunDataParamsModel,
                                       AddTestResultParamsModel,
                                       TestControlOperationParamsModel,
-                                      UpdateResourcesParamsModel)
+                                      UpdateResourcesParamsModel,
+                                      AddTestEventsParamsModel,
+                                      SessionParamsModel)
 from rotest.api.common.responses import FailureResponseModel
 from rotest.api.test_control import (StartTestRun,
                                      UpdateRunData,
@@ -20,7 +22,9 @@ from rotest.api.test_control import (StartTestRun,
                                      StopTest,
                                      UpdateResources,
                                      StartComposite,
-                                     StopComposite)
+                                     StopComposite,
+                                     AddTestEvents,
+                                     GetDeltaManifest)
 
 from rotest.common import core_log
 from rotest.common.config import RESOURCE_MANAGER_HOST
@@ -29,7 +33,8 @@ from rotest.management.common.resource_descriptor import ResourceDescriptor
 from rotest.management.common.utils import (TEST_ID_KEY,
                                             TEST_NAME_KEY,
                                             TEST_SUBTESTS_KEY,
-                                            TEST_CLASS_CODE_KEY)
+                                            TEST_CLASS_CODE_KEY,
+                                            compress_tests_tree)
 
 
 class ClientResultManager(AbstractClient):
@@ -72,6 +77,10 @@ class ClientResultManager(AbstractClient):
     def start_test_run(self, main_test):
         """Inform the result server of the start of the run.
 
+        The tests tree is sent compressed. Servers from before the compressed
+        tree was supported reject that request, in which case it's sent
+        again with the plain tests tree.
+
         Args:
             main_test (TestCase / TestSuite): main test container of the run.
         """
@@ -81,7 +90,7 @@ class ClientResultManager(AbstractClient):
 
         request_data = StartTestRunParamsModel({
             "token": self.token,
-            "tests": tests_tree_dict,
+            "compressed_tests": compress_tests_tree(tests_tree_dict),
             "run_data": run_data
         })
 
@@ -89,6 +98,20 @@ class ClientResultManager(AbstractClient):
                                           data=request_data,
                                           method="post")
 
+        if isinstance(response, FailureResponseModel):
+            self.logger.debug("The server rejected the compressed tests "
+                              "tree (%s), sending the plain tree",
+                              response.details)
+            request_data = StartTestRunParamsModel({
+                "token": self.token,
+                "tests": tests_tree_dict,
+                "run_data": run_data
+            })
+
+            response = self.requester.request(StartTestRun,
+                                              data=request_data,
+                                              method="post")
+
         if isinstance(response, FailureResponseModel):
             raise RuntimeError(response.details)
 
@@ -134,6 +157,42 @@ class ClientResultManager(AbstractClient):
         if isinstance(response, FailureResponseModel):
             raise RuntimeError(response.details)
 
+    @staticmethod
+    def get_resources_descriptors(test_item):
+        """Return the encoded descriptors of the test's locked resources.
+
+        Args:
+            test_item (rotest.core.case.TestCase): the test to describe.
+
+        Returns:
+            list. the encoded resources descriptors.
+        """
+        if test_item.locked_resources is None:
+            return []
+
+        return [ResourceDescriptor(type(resource),
+                                   name=resource.data.name).encode()
+                for resource in test_item.locked_resources.itervalues()]
+
+    def add_test_events(self, events):
+        """Send a batch of tests events to the result server.
+
+        Args:
+            events (list): the events to apply, in order. Each event is a dict
+                containing the event's name ('event'), the test identifier
+                ('test_id') and the event's parameters.
+        """
+        request_data = AddTestEventsParamsModel({
+            "token": self.token,
+            "events": events
+        })
+        response = self.requester.request(AddTestEvents,
+                                          data=request_data,
+                                          method="post")
+
+        if isinstance(response, FailureResponseModel):
+            raise RuntimeError(response.details)
+
     def start_test(self, test_item):
         """Inform the result server of the beginning of a test.
 
@@ -173,6 +232,22 @@ class ClientResultManager(AbstractClient):
 
         return response.should_skip
 
+    def get_delta_manifest(self):
+        """Get the tests of the run that passed in their last run.
+
+        Returns:
+            set. identifiers of the tests that should be skipped.
+        """
+        request_data = SessionParamsModel({"token": self.token})
+        response = self.requester.request(GetDeltaManifest,
+                                          data=request_data,
+                                          method="get")
+
+        if isinstance(response, FailureResponseModel):
+            raise RuntimeError(response.details)
+
+        return set(response.tests_to_skip)
+
     def stop_test(self, test_item):
         """Inform the result server of the end of a test.
 
@@ -196,12 +271,7 @@ class ClientResultManager(AbstractClient):
         Args:
             test_item (rotest.core.case.TestCase): the test to update about.
         """
-        resources = []
-        if test_item.locked_resources is not None:
-            resources = [ResourceDescriptor(type(resource),
-                                            name=resource.data.name).encode()
-                         for resource in
-                         test_item.locked_resources.itervalues()]
+        resources = self.get_resources_descriptors(test_item)
 
         request_data = UpdateResourcesParamsModel({
             "test_details": {
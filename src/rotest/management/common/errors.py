@@ -57,6 +57,10 @@ class ResourceUnavailableError(ServerError):
     """Resource unavailable error."""
 
 
+class LockWaitAbortedError(ResourceUnavailableError):
+    """Waiting for unavailable resources was stopped by the client."""
+
+
 class ResourceDoesNotExistError(ServerError):
     """Resource does not exist error."""
 
@@ -84,6 +88,7 @@ class ErrorFactory(object):
                         ResourceBuildError,
                         ResourceReleaseError,
                         ResourcePermissionError,
+                        LockWaitAbortedError,
                         ResourceUnavailableError,
                         ResourceDoesNotExistError,
                         ResourceAlreadyAvailableError]
@@ -161,6 +161,38 @@ class RunFinished(AbstractMessage):
     pass
 
 
+@slots_extender(('reason',))
+class RecycleWorker(AbstractMessage):
+    """Signals that the worker reached its limits and should be replaced.
+
+    Note:
+        This message is used in multiproccess runner to inform the manager
+        that the worker stopped pulling jobs between tests, and a new worker
+        should be started instead of it.
+
+    Attributes:
+        reason (str): the limit that the worker has reached.
+    """
+    pass
+
+
+@slots_extender(('immediate_locks', 'blocked_locks'))
+class ResourcesLockReport(AbstractMessage):
+    """Reports the outcome of the worker's resources lock requests.
+
+    Note:
+        This message is used in multiproccess runner to let the manager
+        decide whether to add workers or drain blocked ones.
+
+    Attributes:
+        immediate_locks (number): lock requests granted on the first attempt
+            since the last report.
+        blocked_locks (number): lock requests that had to wait for unavailable
+            resources since the last report.
+    """
+    pass
+
+
 @slots_extender(('run_data',))
 class UpdateRunData(AbstractMessage):
     """Update the run data message.
@@ -213,8 +245,25 @@ class ShouldSkip(AbstractTestEventMessage):
     pass
 
 
+class RequeueTest(AbstractTestEventMessage):
+    """Return a started test to the pending tests message.
+
+    Note:
+        This message is used in multiproccess runner to inform the manager
+        that a drained worker stopped waiting for the test's resources, and
+        the test was put back in the jobs queue to be run by another worker.
+    """
+    pass
+
+
+@slots_extender(('phase_times', 'metrics_summary'))
 class StopTest(AbstractTestEventMessage):
-    """End the run of a test message."""
+    """End the run of a test message.
+
+    Attributes:
+        phase_times (str): JSON of the durations of the test's phases.
+        metrics_summary (str): JSON of the statistics of the test's metrics.
+    """
     pass
 
 
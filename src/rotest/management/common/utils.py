@@ -1,5 +1,8 @@
 """Common resource management constants."""
 # pylint: disable=exec-used
+import json
+import zlib
+import base64
 import importlib
 from socket import gethostbyaddr
 
@@ -64,6 +67,30 @@ def get_username(request):
     return get_host_name(get_client_ip(request))
 
 
+def compress_tests_tree(tests_tree):
+    """Compress a tests tree dict for sending it to the server.
+
+    Args:
+        tests_tree (dict): the tests tree, as created by the result client.
+
+    Returns:
+        str. the compressed tree, base64 encoded.
+    """
+    return base64.b64encode(zlib.compress(json.dumps(tests_tree)))
+
+
+def decompress_tests_tree(compressed_tree):
+    """Decompress a tests tree that was compressed by `compress_tests_tree`.
+
+    Args:
+        compressed_tree (str): the compressed tree, base64 encoded.
+
+    Returns:
+        dict. the tests tree.
+    """
+    return json.loads(zlib.decompress(base64.b64decode(compressed_tree)))
+
+
 def extract_type(type_path):
     """Extract a type of a resource from the given type path.
 
@@ -5,8 +5,10 @@ from functools import partial
 
 from django.test import Client, TransactionTestCase
 
-from rotest.core.models import RunData
-from rotest.core.models.case_data import TestOutcome
+from rotest.core.models import RunData, GeneralData
+from rotest.core.models.suite_data import SuiteData
+from rotest.core.models.case_data import TestOutcome, CaseData
+from rotest.management.common.utils import compress_tests_tree
 from rotest.management.client.result_client import ClientResultManager
 
 from tests.api.utils import request
@@ -156,3 +158,78 @@ class TestControl(TransactionTestCase):
                                              self.test_case.identifier
                                      })
         self.assertEqual(response.status_code, httplib.NO_CONTENT)
+
+    def test_add_test_events(self):
+        """Assert that the request has the right server response."""
+        response, _ = self.requester(
+            path="tests/add_test_events",
+            json_data={
+                "token": self.token,
+                "events": [{
+                    "event": "start_test",
+                    "test_id": self.test_case.identifier
+                }, {
+                    "event": "add_result",
+                    "test_id": self.test_case.identifier,
+                    "result_code": TestOutcome.SUCCESS
+                }, {
+                    "event": "stop_test",
+                    "test_id": self.test_case.identifier
+                }]
+            })
+        self.assertEqual(response.status_code, httplib.NO_CONTENT)
+
+    def test_add_invalid_test_event(self):
+        """Assert that an invalid event is rejected."""
+        response, _ = self.requester(
+            path="tests/add_test_events",
+            json_data={
+                "token": self.token,
+                "events": [{
+                    "event": "no_such_event",
+                    "test_id": self.test_case.identifier
+                }]
+            })
+        self.assertEqual(response.status_code, httplib.BAD_REQUEST)
+
+    def test_compressed_tests_tree(self):
+        """Assert that a compressed tree is created with the right types."""
+        main_test = MockSuite1(run_data=RunData(run_name='compressed_run'))
+        tests_tree_dict = ClientResultManager._create_test_dict(main_test)
+
+        response, _ = self.requester(
+            path="tests/start_test_run",
+            json_data={
+                "run_data": {"run_name": "compressed_run"},
+                "compressed_tests": compress_tests_tree(tests_tree_dict),
+                "token": self.token
+            })
+        self.assertEqual(response.status_code, httplib.NO_CONTENT)
+
+        run_data = RunData.objects.get(run_name="compressed_run")
+        main_data = SuiteData.objects.get(pk=run_data.main_test.pk)
+        self.assertEqual(main_data.name, main_test.data.name)
+
+        cases_datas = CaseData.objects.filter(run_data=run_data)
+        self.assertEqual(cases_datas.count(), 3)
+        for case_data in cases_datas:
+            self.assertIsNotNone(case_data.parent)
+            self.assertEqual(case_data.parent.parent.pk, main_data.pk)
+
+    def test_tests_tree_links(self):
+        """Assert that every test data is linked to its test's parent."""
+        run_data = RunData.objects.get(run_name='test_run_name')
+        main_data = GeneralData.objects.get(run_data=run_data,
+                                            parent__isnull=True)
+        self.assertEqual(main_data.pk, run_data.main_test.pk)
+
+        suites_datas = GeneralData.objects.filter(parent=main_data)
+        self.assertEqual(sorted(data.name for data in suites_datas),
+                         sorted(suite.data.name for suite in self.main_test))
+
+        for suite in self.main_test:
+            suite_data = suites_datas.get(name=suite.data.name)
+            self.assertEqual(
+                sorted(data.name for data in
+                       GeneralData.objects.filter(parent=suite_data)),
+                sorted(case.data.name for case in suite))
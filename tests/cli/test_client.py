@@ -54,7 +54,9 @@ def test_setting_options_by_config(run_tests):
                       outputs=["xml", "remote"], filter="MockCase",
                       run_name="some name", resources="query", debug=False,
                       fail_fast=False, list=False, save_state=False,
-                      skip_init=False)
+                      skip_init=False, max_jobs_per_worker=None,
+                      max_worker_memory=None, min_processes=None,
+                      threads=None, profile=None, profile_slowest=5)
 
     run_tests.assert_called_once_with(config=config, test=mock.ANY)
 
@@ -88,11 +90,33 @@ def test_setting_options_by_cli(run_tests):
                       outputs=["pretty", "full"], filter="MockCase",
                       run_name="other name", resources="other query",
                       debug=True, fail_fast=True, list=True, save_state=True,
-                      skip_init=True)
+                      skip_init=True, max_jobs_per_worker=None,
+                      max_worker_memory=None, min_processes=None,
+                      threads=None, profile=None, profile_slowest=5)
 
     run_tests.assert_called_once_with(config=config, test=mock.ANY)
 
 
+@mock.patch("rotest.cli.client.rotest_runner")
+@mock.patch("rotest.cli.client.discover_tests_under_paths",
+            mock.MagicMock(return_value={MockCase}))
+def test_profiling_option(rotest_runner):
+    sys.argv = ["rotest", "-o", "dots", "--profile", "sampling"]
+    with pytest.raises(SystemExit):
+        main()
+
+    config = rotest_runner.call_args[1]["config"]
+    assert config.profile == "sampling"
+    assert rotest_runner.call_args[1]["outputs"] == ["dots", "profile"]
+
+    sys.argv = ["rotest", "--profile"]
+    with pytest.raises(SystemExit):
+        main()
+
+    config = rotest_runner.call_args[1]["config"]
+    assert config.profile == "cprofile"
+
+
 @mock.patch("inspect.getfile", mock.MagicMock(return_value="script.py"))
 @mock.patch("rotest.cli.client.run_tests")
 @mock.patch("rotest.cli.client.discover_tests_under_paths",
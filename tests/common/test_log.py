@@ -1,10 +1,18 @@
 """Test Rotest's Logs behavior."""
 import os
 import time
+import shutil
+import logging
+import tempfile
 import unittest
+from multiprocessing import Process
 
-from rotest.common import core_log
-from rotest.common.log import get_test_logger
+import mock
+
+from rotest.common import core_log, log
+from rotest.common.log import (get_test_logger, define_logger, AsyncHandler,
+                               LogListener, close_test_logger,
+                               DebugBufferHandler, write_debug_buffers)
 from rotest.common.config import ROTEST_WORK_DIR
 
 
@@ -59,3 +67,192 @@ class TestLog(unittest.TestCase):
                 test_log_file_content = test_log_file.read()
                 self.assertEquals(core_log_file_content.count(log_msg), 1)
                 self.assertEquals(test_log_file_content.count(log_msg), 1)
+
+
+class TestTestLoggerLifecycle(unittest.TestCase):
+    """Test closing the tests' loggers."""
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def test_loggers_are_forgotten(self):
+        """Verify closed loggers release their files and aren't kept."""
+        logger_names = set(logging.Logger.manager.loggerDict)
+
+        for index in xrange(100):
+            logger = get_test_logger("lifecycle.%d" % index, self.log_dir)
+            log_file = logger.handlers[0].stream
+            logger.info("Record %d", index)
+            close_test_logger(logger)
+            self.assertTrue(log_file.closed)
+            self.assertEqual(logger.handlers, [])
+
+        self.assertEqual(set(logging.Logger.manager.loggerDict),
+                         logger_names)
+
+    def test_closing_parent_logger(self):
+        """Verify a closed logger's sub-loggers still propagate records."""
+        parent = get_test_logger("lifecycle", self.log_dir)
+        child = get_test_logger("lifecycle.child", self.log_dir)
+        close_test_logger(parent)
+
+        self.assertIs(child.parent, core_log)
+        self.assertIsNot(logging.getLogger(parent.name), parent)
+        self.assertIs(child.parent, logging.getLogger(parent.name))
+        close_test_logger(child)
+        close_test_logger(logging.getLogger(parent.name))
+        self.assertNotIn(parent.name, logging.Logger.manager.loggerDict)
+
+
+class RecordsHandler(logging.Handler):
+    """Handler which keeps the messages of the records it handles."""
+    def __init__(self):
+        super(RecordsHandler, self).__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def log_in_child(handler, message):
+    """Log a message through the given handler, and flush it.
+
+    Args:
+        handler (AsyncHandler): handler which was created in the parent.
+        message (str): message to log.
+    """
+    handler.handle(logging.makeLogRecord({"msg": message}))
+    handler.flush()
+
+
+class TestAsyncLog(unittest.TestCase):
+    """Test logging through the log listener's thread."""
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def test_async_logger(self):
+        """Verify all the records are written once the handlers are closed."""
+        logger = define_logger("async_logger_unittest", self.log_dir,
+                               is_colored=False, is_async=True)
+        self.assertIsInstance(logger.handlers[0], AsyncHandler)
+        log_file_path = logger.handlers[0].target.baseFilename
+
+        values = [1]
+        logger.debug("Values %s", values)
+        values.append(2)
+        for index in xrange(1000):
+            logger.info("Record %d", index)
+
+        try:
+            raise RuntimeError("Async error")
+
+        except RuntimeError:
+            logger.exception("Failure")
+
+        for handler in logger.handlers[:]:
+            handler.close()
+            logger.removeHandler(handler)
+
+        with open(log_file_path) as log_file:
+            content = log_file.read()
+
+        self.assertIn("Values [1]\n", content)
+        self.assertEqual(content.count("Record "), 1000)
+        self.assertIn("RuntimeError: Async error", content)
+
+    def test_drop_overflow(self):
+        """Verify records are dropped when the queue is full, and counted."""
+        target = RecordsHandler()
+        handler = AsyncHandler(target, overflow=AsyncHandler.DROP)
+        listener = LogListener(queue_size=1)
+
+        with mock.patch.object(log, "_listener", listener), \
+                mock.patch.object(log, "_listener_pid", os.getpid()):
+
+            for index in xrange(3):
+                handler.handle(logging.makeLogRecord({"msg": "Record %d",
+                                                     "args": (index,)}))
+
+            listener.start()
+            handler.flush()
+
+        self.assertEqual(target.messages,
+                         ["Record 0",
+                          "2 log records were dropped since the log queue "
+                          "was full"])
+
+    def test_log_after_fork(self):
+        """Verify a forked process writes through the parent's handler."""
+        log_file_path = os.path.join(self.log_dir, "fork.log")
+        handler = AsyncHandler(logging.FileHandler(log_file_path))
+        handler.handle(logging.makeLogRecord({"msg": "Parent record"}))
+        handler.flush()
+
+        child = Process(target=log_in_child, args=(handler, "Child record"))
+        child.start()
+        child.join(timeout=10)
+        if child.is_alive():
+            child.terminate()
+            self.fail("Flushing the log in the forked process got stuck")
+
+        handler.close()
+        self.assertEqual(child.exitcode, 0)
+        with open(log_file_path) as log_file:
+            self.assertEqual(log_file.read(),
+                             "Parent record\nChild record\n")
+
+    def test_unknown_overflow(self):
+        """Verify an unknown overflow policy is rejected."""
+        with self.assertRaises(ValueError):
+            AsyncHandler(RecordsHandler(), overflow="ignore")
+
+
+class TestDebugBuffer(unittest.TestCase):
+    """Test holding back debug records until a test fails."""
+    def setUp(self):
+        self.target = RecordsHandler()
+        self.logger = logging.getLogger("debug_buffer_unittest")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(DebugBufferHandler(self.target, capacity=3))
+
+    def tearDown(self):
+        close_test_logger(self.logger)
+
+    def test_debug_records_held_back(self):
+        """Verify only the non debug records are written immediately."""
+        for index in xrange(5):
+            self.logger.debug("Debug %d", index)
+
+        self.logger.info("Info")
+        self.assertEqual(self.target.messages, ["Info"])
+
+    def test_write_buffer(self):
+        """Verify the latest debug records are written when asked for."""
+        for index in xrange(5):
+            self.logger.debug("Debug %d", index)
+
+        write_debug_buffers(self.logger)
+        self.assertEqual(self.target.messages,
+                         ["Writing 3 held back debug records (2 earlier ones "
+                          "were discarded)",
+                          "Debug 2", "Debug 3", "Debug 4"])
+
+        write_debug_buffers(self.logger)
+        self.assertEqual(len(self.target.messages), 4)
+
+    def test_passthrough_after_write(self):
+        """Verify debug records are written immediately after the buffer."""
+        self.logger.debug("Debug 0")
+        write_debug_buffers(self.logger)
+
+        self.logger.debug("Debug 1")
+        self.assertEqual(self.target.messages,
+                         ["Writing 1 held back debug records (0 earlier ones "
+                          "were discarded)",
+                          "Debug 0", "Debug 1"])
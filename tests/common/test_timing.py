@@ -0,0 +1,60 @@
+"""Test the measuring of the tests' phases."""
+import time
+import unittest
+
+from rotest.common.timing import (PhaseTimer, monotonic_time,
+                                  load_phase_times, format_durations)
+
+
+class TestPhaseTimer(unittest.TestCase):
+    """Test accumulating the durations of phases."""
+    SLEEP_TIME = 0.05
+
+    def test_monotonic_time(self):
+        """Verify the monotonic clock advances."""
+        start_time = monotonic_time()
+        time.sleep(self.SLEEP_TIME)
+        self.assertGreaterEqual(monotonic_time() - start_time,
+                                self.SLEEP_TIME * 0.9)
+
+    def test_nested_phases(self):
+        """Verify the time of nested phases is deducted from the outer one."""
+        timer = PhaseTimer()
+        with timer.measure("outer"):
+            with timer.measure("inner"):
+                time.sleep(self.SLEEP_TIME)
+
+        self.assertGreaterEqual(timer.phases["inner"], self.SLEEP_TIME * 0.9)
+        self.assertLess(timer.phases["outer"], self.SLEEP_TIME / 2)
+
+    def test_accumulate(self):
+        """Verify repeated phases are summed."""
+        timer = PhaseTimer()
+        timer.add("release", 1)
+        timer.add("release", 2)
+        timer.add_resource("res", "initialize", 3)
+        timer.start("test")
+        timer.stop("test")
+        timer.stop("teardown")
+
+        self.assertEqual(timer.phases.keys(), ["test", "release"])
+        self.assertEqual(timer.phases["release"], 3)
+        self.assertEqual(timer.resources, {"res": {"initialize": 3}})
+
+    def test_encoding(self):
+        """Verify the durations are decoded in the measured order."""
+        timer = PhaseTimer()
+        for phase in ("lock", "setup", "test", "release"):
+            timer.add(phase, 0.5)
+
+        durations = load_phase_times(timer.dumps())
+        self.assertEqual(durations["phases"].keys(),
+                         ["lock", "setup", "test", "release"])
+        self.assertEqual(format_durations(durations["phases"]),
+                         "lock 0.50s, setup 0.50s, test 0.50s, release 0.50s")
+
+        other_timer = PhaseTimer()
+        other_timer.loads(timer.dumps())
+        self.assertEqual(other_timer.phases, timer.phases)
+        self.assertEqual(load_phase_times(None),
+                         {"phases": {}, "resources": {}})
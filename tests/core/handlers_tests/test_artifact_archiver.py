@@ -0,0 +1,160 @@
+"""Test the background archiving of work directories."""
+# pylint: disable=protected-access
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from zipfile import ZipFile
+from multiprocessing import Process
+
+from mock import patch
+
+from rotest.core.result.handlers import artifact_archiver
+from rotest.core.result.handlers.artifact_archiver import (ArtifactArchiver,
+                                                           get_archive_name)
+
+
+def archive_and_crash(artifact_path, saved_directory, crashed_directory):
+    """Archive two directories and exit without closing the archive.
+
+    Args:
+        artifact_path (str): path of the archive to create.
+        saved_directory (str): directory to archive and save.
+        crashed_directory (str): directory to archive before crashing.
+    """
+    archiver = ArtifactArchiver(artifact_path, workers=1, save_interval=3600)
+    archiver._archive_directory(saved_directory, recursive=True)
+    archiver._save()
+    archiver._archive_directory(crashed_directory, recursive=True)
+    archiver._file.flush()
+    os._exit(0)
+
+
+class TestArtifactArchiver(unittest.TestCase):
+    """Test archiving directories to a zip in the background."""
+    WAIT_TIMEOUT = 5
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.work_dir = os.path.join(self.base_dir, "work")
+        self.artifact_path = os.path.join(self.base_dir, "artifact.zip")
+
+        self.files = {}
+        for sub_dir in ("case1", "case2", os.path.join("case2", "state")):
+            os.makedirs(os.path.join(self.work_dir, sub_dir))
+            for index in xrange(3):
+                file_path = os.path.join(self.work_dir, sub_dir,
+                                         "file%d.log" % index)
+                content = "%s line %d\n" % (sub_dir, index) * 100
+                with open(file_path, "wb") as file_object:
+                    file_object.write(content)
+
+                self.files[get_archive_name(file_path)] = content
+
+        top_file = os.path.join(self.work_dir, "results.xls")
+        with open(top_file, "wb") as file_object:
+            file_object.write("results")
+
+        self.files[get_archive_name(top_file)] = "results"
+
+        self.archiver = ArtifactArchiver(self.artifact_path, workers=2,
+                                         save_interval=0)
+        self.archiver.start()
+
+    def tearDown(self):
+        self.archiver.close()
+        shutil.rmtree(self.base_dir)
+
+    def validate_archive(self, artifact_path, expected_names):
+        """Validate the archive contains each given file once, intact.
+
+        Args:
+            artifact_path (str): path of the archive to validate.
+            expected_names (list): names of the files in the archive.
+        """
+        with ZipFile(artifact_path) as artifact:
+            self.assertIsNone(artifact.testzip())
+            self.assertItemsEqual(artifact.namelist(), expected_names)
+            for name in expected_names:
+                self.assertEqual(artifact.read(name), self.files[name])
+
+    def test_each_file_archived_once(self):
+        """Verify files of nested directories are archived once."""
+        self.archiver.add_directory(os.path.join(self.work_dir, "case2"))
+        self.archiver.add_directory(os.path.join(self.work_dir, "case1"))
+        self.archiver.add_directory(self.work_dir)
+        self.archiver.close()
+
+        self.validate_archive(self.artifact_path, self.files.keys())
+
+    def test_top_level_files(self):
+        """Verify only the top level files are archived if not recursive."""
+        self.archiver.add_directory(self.work_dir, recursive=False)
+        self.archiver.close()
+
+        self.validate_archive(self.artifact_path,
+                              [name for name in self.files
+                               if name.endswith("results.xls")])
+
+    def test_big_files(self):
+        """Verify files too big to compress in memory are archived too."""
+        with patch.object(artifact_archiver, "MAX_IN_MEMORY_FILE_SIZE", 1000):
+            self.archiver.add_directory(self.work_dir)
+            self.archiver.close()
+
+        self.validate_archive(self.artifact_path, self.files.keys())
+
+    def test_readable_before_closing(self):
+        """Verify the archived part is readable if the archiver isn't closed.
+        """
+        self.archiver.add_directory(os.path.join(self.work_dir, "case1"))
+        expected_names = [name for name in self.files if "case1" in name]
+
+        # Copy the archive, as it is if the run would crash now
+        crashed_artifact_path = os.path.join(self.base_dir, "crashed.zip")
+        start_time = time.time()
+        while True:
+            shutil.copy(self.artifact_path, crashed_artifact_path)
+            with ZipFile(crashed_artifact_path) as artifact:
+                if len(artifact.namelist()) == len(expected_names):
+                    break
+
+            self.assertLess(time.time() - start_time, self.WAIT_TIMEOUT)
+            time.sleep(0.01)
+
+        self.validate_archive(crashed_artifact_path, expected_names)
+
+    def test_crash_after_big_file(self):
+        """Verify the saved part is readable after a crash mid-save-interval.
+        """
+        big_dir = os.path.join(self.base_dir, "big")
+        os.makedirs(big_dir)
+        with open(os.path.join(big_dir, "big.bin"), "wb") as file_object:
+            file_object.write(os.urandom(200 * 1024))
+
+        crashed_artifact_path = os.path.join(self.base_dir, "crashed.zip")
+        crashing_process = Process(target=archive_and_crash,
+                                   args=(crashed_artifact_path,
+                                         os.path.join(self.work_dir, "case1"),
+                                         big_dir))
+        crashing_process.start()
+        crashing_process.join()
+
+        self.validate_archive(crashed_artifact_path,
+                              [name for name in self.files
+                               if "case1" in name])
+
+    def test_modified_file_archived_again(self):
+        """Verify a file modified after it was archived is archived again."""
+        self.archiver.add_directory(self.work_dir)
+
+        top_file = os.path.join(self.work_dir, "results.xls")
+        with open(top_file, "wb") as file_object:
+            file_object.write("final results")
+
+        self.files[get_archive_name(top_file)] = "final results"
+        self.archiver.add_directory(self.work_dir, recursive=False)
+        self.archiver.close()
+
+        self.validate_archive(self.artifact_path, self.files.keys())
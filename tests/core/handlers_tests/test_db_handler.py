@@ -0,0 +1,112 @@
+"""Test Rotest's DB handlers."""
+# pylint: disable=protected-access
+import mock
+
+from rotest.core.models.run_data import RunData
+from rotest.core.models.case_data import CaseData
+from rotest.common.django_utils.common import get_sub_model
+from rotest.core.models.general_data import GeneralData
+from rotest.core.result.handlers.db_handler import DBHandler, BatchDBHandler
+
+from tests.core.handlers_tests.base_result_handler_test import (get_tests,
+                                                         BaseResultHandlerTest)
+
+
+class TestDBHandler(BaseResultHandlerTest):
+    """Test DB handler's functionality."""
+    __test__ = True
+
+    def get_result_handler(self):
+        """Get an instance of DBHandler.
+
+        Returns:
+            DBHandler. An instance of DBHandler to test with.
+        """
+        return DBHandler(self.main_test)
+
+    def validate_start_test_run(self):
+        """Validate that the whole tests tree was saved."""
+        saved_datas = GeneralData.objects.filter(
+            pk__in=[test.data.pk for test in get_tests(self.main_test)])
+
+        self.assertEqual(saved_datas.count(),
+                         len(list(get_tests(self.main_test))))
+
+    def validate_stop_test_run(self):
+        """Validate that the results of the tests were saved."""
+        for test in get_tests(self.main_test):
+            saved_data = CaseData.objects.get(pk=test.data.pk)
+            self.assertEqual(saved_data.exception_type,
+                             test.data.exception_type)
+
+    def test_bulk_tree_creation(self):
+        """Validate the tests tree is inserted with its links and subtypes."""
+        run_data = RunData(run_name="bulk run")
+        self.main_test.data.run_data = run_data
+        self.handler.start_test_run()
+
+        pending = [self.main_test]
+        while len(pending) > 0:
+            test = pending.pop()
+            saved_data = get_sub_model(GeneralData.objects.get(
+                                                        pk=test.data.pk))
+            self.assertIsInstance(saved_data, type(test.data))
+            self.assertEqual(saved_data.run_data_id, run_data.pk)
+            if test.IS_COMPLEX:
+                self.assertEqual(
+                    sorted(saved_data.tests.values_list("pk", flat=True)),
+                    sorted(sub_test.data.pk for sub_test in test))
+                pending.extend(test)
+
+        self.assertEqual(RunData.objects.get(pk=run_data.pk).main_test_id,
+                         self.main_test.data.pk)
+
+
+class TestBatchDBHandler(TestDBHandler):
+    """Test the write-behind DB handler's functionality."""
+    def get_result_handler(self):
+        """Get an instance of BatchDBHandler.
+
+        Returns:
+            BatchDBHandler. An instance of BatchDBHandler to test with.
+        """
+        return BatchDBHandler(self.main_test)
+
+    def test_coalesce_changes(self):
+        """Validate that repeated changes of a data are saved once."""
+        self.handler.FLUSH_INTERVAL = 60
+        self.handler.start_test_run()
+        test = next(get_tests(self.main_test))
+
+        self.handler.start_test(test)
+        self.handler.add_success(test)
+        self.handler.stop_test(test)
+
+        self.assertEqual(self.handler._pending_datas.values(), [test.data])
+
+        self.handler.stop_test_run()
+        self.assertEqual(len(self.handler._pending_datas), 0)
+
+    def test_requeue_failed_saves(self):
+        """Validate that the datas whose save failed are saved later."""
+        self.handler.FLUSH_INTERVAL = 60
+        self.handler.start_test_run()
+        failing_test, test = list(get_tests(self.main_test))[:2]
+
+        for started_test in (failing_test, test):
+            started_test.start()
+            self.handler.start_test(started_test)
+
+        with mock.patch.object(failing_test.data, "save",
+                               side_effect=RuntimeError):
+            self.assertFalse(self.handler.flush())
+
+        self.assertEqual(self.handler._pending_datas.values(),
+                         [failing_test.data])
+        self.assertIsNotNone(GeneralData.objects.get(pk=test.data.pk)
+                             .start_time)
+
+        self.handler.stop_test_run()
+        self.assertEqual(len(self.handler._pending_datas), 0)
+        self.assertIsNotNone(GeneralData.objects.get(pk=failing_test.data.pk)
+                             .start_time)
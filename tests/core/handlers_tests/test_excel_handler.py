@@ -6,10 +6,11 @@ import itertools
 import xlrd
 
 from rotest.core.block import TestBlock
+from rotest.core.models.case_data import TestOutcome
 from rotest.core.result.handlers.excel_handler import ExcelHandler
 
-from tests.core.handlers_tests.base_result_handler_test import \
-    BaseResultHandlerTest
+from tests.core.handlers_tests.base_result_handler_test import (get_tests,
+                                                         BaseResultHandlerTest)
 
 
 class TestExcelHandler(BaseResultHandlerTest):
@@ -53,7 +54,7 @@ class TestExcelHandler(BaseResultHandlerTest):
         Returns:
             TestExcelHandler. An instance of TestExcelHandler to test with.
         """
-        return ExcelHandler(self.main_test)
+        return ExcelHandler(self.main_test, save_interval=0)
 
     def _read_excel(self):
         """Read the excel workbook and sheet."""
@@ -228,3 +229,26 @@ class TestExcelHandler(BaseResultHandlerTest):
             actual_cell = actual_sheet.cell(row, col)
             expected_cell = expected_sheet.cell(row, col)
             self.assertEqual(actual_cell, expected_cell)
+
+    def test_debounced_saving(self):
+        """Validate the file is saved periodically and when the run ends."""
+        self.handler.saver.save_interval = 60
+        self.handler.start_test_run()
+        test = next(get_tests(self.main_test))
+        test_row = self.handler.test_to_row[test.identifier]
+
+        self.handler.start_test(test)
+        test.data.exception_type = TestOutcome.SUCCESS
+        self.handler.add_success(test)
+
+        self._read_excel()
+        self.assertIn(ExcelHandler.DID_NOT_RUN,
+                      self.worksheet.cell_value(rowx=test_row,
+                                                colx=self.RESULT_COLUMN))
+
+        self.handler.stop_test_run()
+
+        self._read_excel()
+        self.assertIn(ExcelHandler.SUCCESS,
+                      self.worksheet.cell_value(rowx=test_row,
+                                                colx=self.RESULT_COLUMN))
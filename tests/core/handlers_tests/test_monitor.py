@@ -1,9 +1,15 @@
 """Test Rotest's Monitor class behavior."""
+import os
 import time
 import threading
 
 from rotest.core.case import request
+from rotest.core.utils.metrics import (read_metric_file, get_metrics_summary,
+                                       METRICS_DIR_NAME)
 from rotest.management.models.ut_models import DemoResource
+from rotest.core.result.monitor.server import (MonitorServer,
+                                               MonitorScheduler,
+                                               MonitorRegistration)
 from rotest.core.result.monitor import AbstractMonitor, AbstractResourceMonitor
 
 from tests.core.utils import (MockCase,
@@ -11,6 +17,7 @@ from tests.core.utils import (MockCase,
                               BasicRotestUnitTest)
 
 COMMON_LIST = []
+SLOW_LIST = []
 RESOURCE_NAME = 'available_resource1'
 
 
@@ -97,6 +104,7 @@ class AbstractMonitorTest(BasicRotestUnitTest):
         """Clear global COMMON_LIST."""
         super(AbstractMonitorTest, self).setUp()
         del COMMON_LIST[:]
+        del SLOW_LIST[:]
 
     def _run_case(self, test_case):
         """Run given case and return it.
@@ -137,9 +145,8 @@ class TestShortCycle(AbstractMonitorTest):
                            "%d got %d" %
                            (1, cycle_nums))
 
-        monitor_thread = COMMON_LIST[0]
-        self.assertFalse(monitor_thread.is_alive(),
-                         "Monitor thread is still alive after the test")
+        self.assertEqual(MonitorServer.MONITORS, {},
+                         "Monitor is still registered after the test")
 
 
 class TestLongCycle(AbstractMonitorTest):
@@ -163,9 +170,8 @@ class TestLongCycle(AbstractMonitorTest):
                          "Unexpected number of cycles, expected %d got %d" %
                          (1, cycle_nums))
 
-        monitor_thread = COMMON_LIST[0]
-        self.assertFalse(monitor_thread.is_alive(),
-                         "Monitor thread is still alive after the test")
+        self.assertEqual(MonitorServer.MONITORS, {},
+                         "Monitor is still registered after the test")
 
 
 class TestNoCycle(AbstractMonitorTest):
@@ -207,9 +213,8 @@ class TestSingleFailure(AbstractMonitorTest):
                          "Unexpected number of failures, expected %d got %d" %
                          (1, fail_nums))
 
-        monitor_thread = COMMON_LIST[0]
-        self.assertFalse(monitor_thread.is_alive(),
-                         "Monitor thread is still alive after the test")
+        self.assertEqual(MonitorServer.MONITORS, {},
+                         "Monitor is still registered after the test")
 
 
 class TestMultipleFailure(AbstractMonitorTest):
@@ -229,9 +234,8 @@ class TestMultipleFailure(AbstractMonitorTest):
                            "%d got %d" %
                            (1, fail_nums))
 
-        monitor_thread = COMMON_LIST[0]
-        self.assertFalse(monitor_thread.is_alive(),
-                         "Monitor thread is still alive after the test")
+        self.assertEqual(MonitorServer.MONITORS, {},
+                         "Monitor is still registered after the test")
 
 
 class TestGotResourceMonitor(AbstractMonitorTest):
@@ -268,3 +272,126 @@ class TestNoResourceMonitor(AbstractMonitorTest):
         self.assertEqual(cycle_nums, 0,
                          "Unexpected number of cycles, expected %d got %d" %
                          (0, cycle_nums))
+
+
+class SlowMonitor(AbstractMonitor):
+    """Monitor which takes longer than its cycle to run."""
+    CYCLE = 0.1
+    RUN_TIME = 1.0
+
+    def run_monitor(self, test):
+        SLOW_LIST.append(threading.current_thread())
+        time.sleep(self.RUN_TIME)
+
+
+class TestMonitorScheduler(AbstractMonitorTest):
+    """Test running many monitors by a single scheduler."""
+    __test__ = True
+    RESULT_OUTPUTS = [SlowMonitor, SuccessShortMonitor]
+
+    def test_method(self):
+        """Verify slow monitors don't delay the others."""
+        self._run_case(LongSuccessCase)
+
+        self.assertTrue(self.result.wasSuccessful(),
+                        'Case failed when it should have succeeded')
+
+        threads = set(COMMON_LIST + SLOW_LIST)
+        self.assertLessEqual(len(threads), MonitorScheduler.MAX_WORKERS,
+                             "Monitors ran in more threads than the pool's")
+
+        self.assertEqual(len(SLOW_LIST), 1,
+                         "The slow monitor ran again before its run ended")
+        self.assertGreater(len(COMMON_LIST), 1,
+                           "The short monitor was delayed by the slow one")
+
+        self.assertEqual(MonitorServer.MONITORS, {},
+                         "Monitor is still registered after the test")
+
+    def test_unregister_many(self):
+        """Verify registering and unregistering many monitors is fast."""
+        monitors = [SuccessLongMonitor() for _ in xrange(1000)]
+        start_time = time.time()
+        for monitor in monitors:
+            MonitorServer.register_monitor(monitor, self)
+
+        for monitor in monitors:
+            MonitorServer.unregister_monitor(monitor, self)
+
+        self.assertLess(time.time() - start_time, SuccessLongMonitor.CYCLE)
+        self.assertEqual(MonitorServer.MONITORS, {})
+
+    def test_cancel_dispatched_run(self):
+        """Verify runs dispatched before the cancelling don't run."""
+        # A scheduler with a single worker, which is kept busy, so the
+        # dispatched run waits in the pool's queue
+        scheduler = MonitorScheduler(workers=1)
+        scheduler.start()
+        worker_busy = threading.Event()
+        release_worker = threading.Event()
+
+        def block_worker():
+            worker_busy.set()
+            release_worker.wait()
+
+        blocking = MonitorRegistration(SuccessLongMonitor.CYCLE, block_worker)
+        scheduler.schedule(blocking)
+        worker_busy.wait()
+
+        registration = MonitorRegistration(0, COMMON_LIST.append, None)
+        scheduler.schedule(registration)
+        while registration.idle.is_set():
+            time.sleep(0.01)
+
+        canceller = threading.Thread(target=scheduler.cancel,
+                                     args=(registration,))
+        canceller.start()
+        while not registration.cancelled:
+            time.sleep(0.01)
+
+        release_worker.set()
+        canceller.join()
+        scheduler.cancel(blocking)
+
+        self.assertEqual(COMMON_LIST, [],
+                         "The monitor ran after it was cancelled")
+        self.assertTrue(registration.idle.is_set())
+
+
+class MetricsMonitor(AbstractMonitor):
+    """Monitor which records the index of its run."""
+    CYCLE = 0.1
+    METRICS_CAPACITY = 3
+
+    def run_monitor(self, test):
+        COMMON_LIST.append(threading.current_thread())
+        self.record_metric(test, "run index", len(COMMON_LIST), "L")
+
+
+class TestMonitorMetrics(AbstractMonitorTest):
+    """Test recording the samples of monitors."""
+    __test__ = True
+    RESULT_OUTPUTS = [MetricsMonitor]
+
+    def test_method(self):
+        """Verify the samples are written to the test's work directory."""
+        test = self._run_case(LongSuccessCase)
+
+        self.assertTrue(self.result.wasSuccessful(),
+                        'Case failed when it should have succeeded')
+
+        runs_count = len(COMMON_LIST)
+        self.assertGreater(runs_count, MetricsMonitor.METRICS_CAPACITY)
+
+        summary = get_metrics_summary(test)["run index"]
+        self.assertEqual(summary["count"], MetricsMonitor.METRICS_CAPACITY)
+        self.assertEqual(summary["max"], runs_count)
+        self.assertEqual(summary["min"],
+                         runs_count - MetricsMonitor.METRICS_CAPACITY + 1)
+
+        header, _, values = read_metric_file(
+            os.path.join(test.work_dir, METRICS_DIR_NAME, "run_index.col"))
+        self.assertEqual(header["dropped"],
+                         runs_count - MetricsMonitor.METRICS_CAPACITY)
+        self.assertEqual(values.tolist(),
+                         range(summary["min"], runs_count + 1))
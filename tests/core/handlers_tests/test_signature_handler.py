@@ -37,7 +37,7 @@ class TestSignatureHandler(BaseResultHandlerTest):
         Returns:
             SignatureHandler. An instance of SignatureHandler to test with.
         """
-        return SignatureHandler(self.main_test)
+        return SignatureHandler(self.main_test, save_interval=0)
 
     def validate_start_test_run(self):
         """Validate the output of the handler's start_test_run method."""
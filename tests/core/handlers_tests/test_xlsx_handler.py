@@ -0,0 +1,106 @@
+"""Test Rotest's streaming XLSX handlers."""
+# pylint: disable=protected-access,attribute-defined-outside-init
+import os
+
+import xlrd
+
+from rotest.core.result.handlers.xlsx_handler import (XlsxHandler,
+                                                      XlsxSignatureHandler)
+
+from tests.core.handlers_tests import (test_excel_handler,
+                                       test_signature_handler)
+from tests.core.handlers_tests.base_result_handler_test import (get_tests,
+                                                         BaseResultHandlerTest)
+
+
+class TestXlsxHandler(test_excel_handler.TestExcelHandler):
+    """Test the XLSX handler's functionality.
+
+    The report is written only when the run ends, so the results are
+    validated then.
+
+    Attributes:
+        results (list): the added results, as arguments of validate_result.
+    """
+    def setUp(self):
+        super(TestXlsxHandler, self).setUp()
+        self.results = []
+
+    def get_result_handler(self):
+        """Get an instance of XlsxHandler.
+
+        Returns:
+            XlsxHandler. An instance of XlsxHandler to test with.
+        """
+        return XlsxHandler(self.main_test)
+
+    def validate_start_test_run(self):
+        """Validate that the file is not written before the run ends."""
+        self.assertFalse(os.path.exists(self.handler.output_file_path))
+
+    def validate_result(self, test, result, traceback=""):
+        """Save the result, to be validated when the run ends."""
+        self.results.append((test, result, traceback))
+
+    def validate_stop_test_run(self):
+        """Validate the headers, tests tree, results and summary."""
+        self._read_excel()
+
+        self.validate_headers()
+        self.validate_hierarchy()
+        self.validate_summary()
+
+        for test, result, traceback in self.results:
+            super(TestXlsxHandler, self).validate_result(test, result,
+                                                         traceback)
+
+    def test_debounced_saving(self):
+        """Validate that the tests which didn't run are reported so."""
+        self.handler.start_test_run()
+        self.handler.stop_test_run()
+
+        self._read_excel()
+        for test in get_tests(self.main_test):
+            test_row = self.handler.test_to_row[test.identifier]
+            self.assertIn(XlsxHandler.DID_NOT_RUN,
+                          self.worksheet.cell_value(rowx=test_row,
+                                                    colx=self.RESULT_COLUMN))
+
+
+class TestXlsxSignatureHandler(BaseResultHandlerTest):
+    """Test the XLSX issues signatures handler's functionality.
+
+    Attributes:
+        signatures_names (list): names of the expected matched signatures.
+    """
+    __test__ = True
+
+    fixtures = ['signature_ut.json']
+
+    def setUp(self):
+        super(TestXlsxSignatureHandler, self).setUp()
+        self.signatures_names = []
+
+    def get_result_handler(self):
+        """Get an instance of XlsxSignatureHandler.
+
+        Returns:
+            XlsxSignatureHandler. An instance of XlsxSignatureHandler.
+        """
+        return XlsxSignatureHandler(self.main_test)
+
+    def validate_result(self, test, result, traceback=""):
+        """Save the expected signature, to be validated when the run ends."""
+        signatures_names = test_signature_handler.TestSignatureHandler.SIG_DICT
+        if result in signatures_names:
+            self.signatures_names.append(signatures_names[result])
+
+    def validate_stop_test_run(self):
+        """Validate the headers and the matched signatures."""
+        worksheet = xlrd.open_workbook(
+            self.handler.output_file_path).sheet_by_index(0)
+
+        self.assertEqual(worksheet.row_values(0),
+                         list(XlsxSignatureHandler.HEADERS))
+        self.assertEqual(worksheet.col_values(1, start_rowx=1),
+                         self.signatures_names)
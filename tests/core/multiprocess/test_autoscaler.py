@@ -0,0 +1,148 @@
+"""Test the multiprocess runner workers autoscaler."""
+# pylint: disable=invalid-name,protected-access
+import Queue
+import unittest
+import threading
+
+import mock
+
+from rotest.management.common.errors import LockWaitAbortedError
+from rotest.core.runners.multiprocess.worker.process import WorkerProcess
+from rotest.core.runners.multiprocess.manager.message_handler import \
+                                                        RunnerMessageHandler
+from rotest.core.runners.multiprocess.manager.autoscaler import \
+                                                        WorkersAutoscaler
+
+
+class TestWorkersAutoscaler(unittest.TestCase):
+    """Test the scaling decisions of the workers autoscaler."""
+
+    def setUp(self):
+        """Create an autoscaler with no interval between additions."""
+        self.autoscaler = WorkersAutoscaler(min_workers=1, max_workers=3)
+        self.autoscaler.SCALE_UP_INTERVAL = 0
+
+    def test_illegal_range(self):
+        """Validate that an illegal workers range is rejected."""
+        self.assertRaises(ValueError, WorkersAutoscaler,
+                          min_workers=3, max_workers=2)
+
+    def test_scale_up(self):
+        """Validate scaling up only with pending jobs and free slots."""
+        for _ in xrange(WorkersAutoscaler.LOCK_HISTORY_SIZE):
+            self.autoscaler.report_locks(worker_pid=1, immediate_locks=0,
+                                         blocked_locks=0)
+
+        self.assertTrue(self.autoscaler.should_scale_up(active_workers=1,
+                                                        pending_jobs=True))
+        self.assertFalse(self.autoscaler.should_scale_up(active_workers=1,
+                                                         pending_jobs=False))
+        self.assertFalse(self.autoscaler.should_scale_up(active_workers=3,
+                                                         pending_jobs=True))
+
+    def test_no_scale_up_without_history(self):
+        """Validate that workers aren't added before enough lock reports."""
+        self.assertFalse(self.autoscaler.should_scale_up(active_workers=1,
+                                                         pending_jobs=True))
+
+        self.autoscaler.report_locks(worker_pid=1, immediate_locks=1,
+                                     blocked_locks=0)
+        self.assertFalse(self.autoscaler.should_scale_up(active_workers=1,
+                                                         pending_jobs=True))
+
+    def test_no_scale_up_when_blocked(self):
+        """Validate that blocked lock requests prevent scaling up."""
+        self.autoscaler.report_locks(worker_pid=1, immediate_locks=0,
+                                     blocked_locks=1)
+        self.assertFalse(self.autoscaler.should_scale_up(active_workers=1,
+                                                         pending_jobs=True))
+
+        self.autoscaler.report_locks(worker_pid=1, immediate_locks=3,
+                                     blocked_locks=0)
+        self.assertTrue(self.autoscaler.should_scale_up(active_workers=1,
+                                                        pending_jobs=True))
+
+    def test_drain_repeatedly_blocked(self):
+        """Validate that only repeatedly blocked workers are drained."""
+        for _ in xrange(WorkersAutoscaler.BLOCKED_STREAK_LIMIT):
+            self.autoscaler.report_locks(worker_pid=1, immediate_locks=0,
+                                         blocked_locks=1)
+
+        self.autoscaler.report_locks(worker_pid=2, immediate_locks=0,
+                                     blocked_locks=1)
+
+        self.assertEqual(self.autoscaler.workers_to_drain([1, 2]), [1])
+
+    def test_keep_minimal_workers(self):
+        """Validate that draining keeps the minimal number of workers."""
+        for _ in xrange(WorkersAutoscaler.BLOCKED_STREAK_LIMIT):
+            self.autoscaler.report_locks(worker_pid=1, immediate_locks=0,
+                                         blocked_locks=1)
+
+        self.assertEqual(self.autoscaler.workers_to_drain([1]), [])
+
+
+class TestBlockedWorker(unittest.TestCase):
+    """Test the handling of a worker's blocked lock requests."""
+
+    def setUp(self):
+        """Create a worker which can be drained, without starting it."""
+        self.worker = WorkerProcess(save_state=False, config=None,
+                                    run_delta=False, run_name=None,
+                                    requests_queue=Queue.Queue(),
+                                    reply_queue=None, results_queue=None,
+                                    root_test=None, failfast=False,
+                                    parent_id=None, skip_init=False,
+                                    output_handlers=[],
+                                    drain_event=threading.Event())
+
+        self.worker.queue_handler = mock.MagicMock(discard_events=False)
+        self.worker.resource_manager = mock.MagicMock(immediate_locks=0,
+                                                      blocked_locks=1)
+
+    def test_report_while_waiting(self):
+        """Validate that blocked requests are reported once per interval."""
+        self.worker.handle_blocked_lock()
+        self.worker.handle_blocked_lock()
+
+        self.worker.queue_handler.report_resources_locks.\
+            assert_called_once_with(immediate_locks=0, blocked_locks=1)
+
+    def test_abort_when_drained(self):
+        """Validate that a drained worker stops waiting and requeues."""
+        self.worker.drain_event.set()
+        self.assertRaises(LockWaitAbortedError,
+                          self.worker.handle_blocked_lock)
+
+        self.assertTrue(self.worker.lock_wait_aborted)
+        self.assertTrue(self.worker.queue_handler.discard_events)
+
+        self.worker.requeue_test(7)
+        self.assertFalse(self.worker.queue_handler.discard_events)
+        self.assertEqual(self.worker.requests_queue.get(block=False), 7)
+        self.worker.queue_handler.requeue_test.assert_called_once_with(7)
+
+
+class TestRequeuedTest(unittest.TestCase):
+    """Test the manager's handling of a test that a worker requeued."""
+
+    def setUp(self):
+        """Create a message handler with a mock runner and result."""
+        self.result = mock.MagicMock()
+        self.handler = RunnerMessageHandler(mock.MagicMock(), self.result,
+                                            main_test=None)
+        self.test = mock.MagicMock(identifier=7, TIMEOUT=10)
+
+    def test_start_reported_once(self):
+        """Validate that a requeued test isn't started again."""
+        self.handler._handle_start_message(self.test,
+                                           mock.MagicMock(msg_id=1))
+        self.handler._handle_requeue_message(self.test,
+                                             mock.MagicMock(msg_id=1))
+        self.handler._handle_start_message(self.test,
+                                           mock.MagicMock(msg_id=2))
+
+        self.result.startTest.assert_called_once_with(self.test)
+        self.handler.runner.update_worker.assert_called_with(worker_pid=2,
+                                                             test=self.test)
+        self.assertEqual(self.handler.requeued_tests, set())
@@ -11,6 +11,7 @@ from multiprocessing import Queue, Event
 import psutil
 import pytest
 
+from rotest.core.runners.multiprocess.worker.process import WorkerProcess
 from rotest.core.runners.multiprocess.manager.runner import MultiprocessRunner
 
 from tests.core.utils import MockSuite1, BasicRotestUnitTest
@@ -170,6 +171,51 @@ class TestMultiprocessRunner(AbstractMultiprocessRunnerTest):
                          "Number of resource locks was %d instead of 1" %
                          resources_locked)
 
+    def test_recycle_worker_by_jobs_limit(self):
+        """Test that workers are replaced after reaching the jobs limit.
+
+        * Runs two cases with a limit of one job per worker.
+        * Validates that the cases ran in different processes.
+        * Validates that the recycling was counted.
+        """
+        BasicMultiprocessCase.pid_queue = self.pid_queue
+        BasicMultiprocessCase.post_timeout_event = self.post_timeout_event
+
+        MockSuite1.components = (BasicMultiprocessCase,
+                                 BasicMultiprocessCase)
+
+        self.runner.max_jobs_per_worker = 1
+        self.runner.run(MockSuite1)
+
+        pids = list(self.get_pids())
+        self.assertEqual(len(pids), 2,
+                         "Expected 2 registered cases, got %d" % len(pids))
+        self.assertNotEqual(pids[0], pids[1],
+                            "The worker wasn't recycled between the cases")
+        self.assertEqual(self.runner.recycled_workers,
+                         {WorkerProcess.RECYCLE_JOBS_LIMIT: 1})
+
+    def test_autoscaled_run(self):
+        """Test running cases with an autoscaled workers pool.
+
+        * Runs two cases with a single minimal worker.
+        * Validates that both cases ran in worker processes.
+        """
+        BasicMultiprocessCase.pid_queue = self.pid_queue
+        BasicMultiprocessCase.post_timeout_event = self.post_timeout_event
+
+        MockSuite1.components = (BasicMultiprocessCase,
+                                 BasicMultiprocessCase)
+
+        self.runner.min_workers = 1
+        self.runner.run(MockSuite1)
+
+        pids = list(self.get_pids())
+        self.assertEqual(len(pids), 2,
+                         "Expected 2 registered cases, got %d" % len(pids))
+        self.assertNotIn(os.getpid(), pids)
+        self.assertIsNotNone(self.runner.autoscaler)
+
 
 @pytest.mark.skip(reason="known bug")
 class TestMultipleWorkers(AbstractMultiprocessRunnerTest):
@@ -0,0 +1,134 @@
+"""Test the content-addressed artifact store."""
+import os
+import shutil
+import hashlib
+import tempfile
+import unittest
+from zipfile import ZipFile
+
+import mock
+
+from rotest.core.utils.artifact_store import (ArtifactStore, read_manifest,
+                                              export_manifest)
+from rotest.core.result.handlers.artifact_archiver import (ManifestArchiver,
+                                                           get_archive_name)
+
+
+class TestArtifactStore(unittest.TestCase):
+    """Test storing runs' files by their content."""
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.store = ArtifactStore(os.path.join(self.base_dir, "objects"))
+
+        self.files = {}
+        for run_index in xrange(2):
+            work_dir = os.path.join(self.base_dir, "run%d" % run_index)
+            os.makedirs(os.path.join(work_dir, "case", "state"))
+            self.write_file(os.path.join(work_dir, "case", "state",
+                                         "config.txt"), "config\n" * 100)
+            self.write_file(os.path.join(work_dir, "case", "case.log"),
+                            "run %d log\n" % run_index)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def write_file(self, file_path, content):
+        """Create a file of a run.
+
+        Args:
+            file_path (str): path of the file.
+            content (str): content of the file.
+        """
+        with open(file_path, "wb") as file_object:
+            file_object.write(content)
+
+        self.files[get_archive_name(file_path)] = content
+
+    def archive_run(self, run_index):
+        """Store the files of a run, and return its manifest's path.
+
+        Args:
+            run_index (number): index of the run to archive.
+
+        Returns:
+            str. path of the run's manifest.
+        """
+        work_dir = os.path.join(self.base_dir, "run%d" % run_index)
+        manifest_path = os.path.join(self.base_dir,
+                                     "run%d.manifest.json" % run_index)
+        archiver = ManifestArchiver(manifest_path, self.store, workers=2,
+                                    save_interval=0)
+        archiver.start()
+        archiver.add_directory(os.path.join(work_dir, "case"))
+        archiver.add_directory(work_dir)
+        archiver.close()
+
+        return manifest_path
+
+    def get_objects_count(self):
+        """Return the amount of files in the store."""
+        return sum(len(files) for _, _, files in
+                   os.walk(self.store.objects_dir))
+
+    def test_store(self):
+        """Verify a file is stored once by its hash, without leftovers."""
+        file_path = os.path.join(self.base_dir, "run0", "case", "case.log")
+        content_hash = self.store.store(file_path)
+        self.assertEqual(content_hash,
+                         hashlib.sha256(self.files[get_archive_name(
+                             file_path)]).hexdigest())
+
+        # A stored content isn't copied again
+        with mock.patch.object(tempfile, "mkstemp") as mkstemp_mock:
+            self.assertEqual(self.store.store(file_path), content_hash)
+
+        self.assertFalse(mkstemp_mock.called)
+        self.assertEqual(self.get_objects_count(), 1)
+        with open(self.store.get_object_path(content_hash), "rb") as stored:
+            self.assertEqual(stored.read(),
+                             self.files[get_archive_name(file_path)])
+
+    def test_store_deduplication(self):
+        """Verify identical files are stored once."""
+        first_manifest = self.archive_run(0)
+        self.assertEqual(self.get_objects_count(), 2)
+
+        second_manifest = self.archive_run(1)
+        self.assertEqual(self.get_objects_count(), 3)
+
+        self.assertEqual(len(read_manifest(first_manifest)), 2)
+        self.assertEqual(len(read_manifest(second_manifest)), 2)
+
+    def test_export(self):
+        """Verify an exported manifest contains the run's files."""
+        manifest_path = self.archive_run(1)
+        zip_path = os.path.join(self.base_dir, "run1.zip")
+        export_manifest(manifest_path, zip_path, self.store)
+
+        with ZipFile(zip_path) as artifact:
+            self.assertIsNone(artifact.testzip())
+            names = artifact.namelist()
+            self.assertEqual(len(names), 2)
+            for name in names:
+                self.assertIn("run1", name)
+                self.assertEqual(artifact.read(name), self.files[name])
+
+    def test_modified_file(self):
+        """Verify the manifest lists the last version of a modified file."""
+        manifest_path = os.path.join(self.base_dir, "run0.manifest.json")
+        case_dir = os.path.join(self.base_dir, "run0", "case")
+        archiver = ManifestArchiver(manifest_path, self.store, workers=2,
+                                    save_interval=0)
+        archiver.start()
+        archiver.add_directory(case_dir)
+
+        log_path = os.path.join(case_dir, "case.log")
+        self.write_file(log_path, "final log\n")
+        archiver.add_directory(case_dir)
+        archiver.close()
+
+        files = read_manifest(manifest_path)
+        self.assertEqual(len(files), 2)
+        log_entry, = [entry for entry in files
+                      if entry["name"] == get_archive_name(log_path)]
+        self.assertEqual(log_entry["size"], len("final log\n"))
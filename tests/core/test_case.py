@@ -1,10 +1,12 @@
 """Test Rotest's TestCase class behavior."""
 # pylint: disable=missing-docstring,unused-argument,protected-access
 # pylint: disable=no-member,no-self-use,too-many-public-methods,invalid-name
-import os
 import re
 
 from rotest.core.case import request
+from rotest.common.timing import (load_phase_times, LOCK, PREPARE, SETUP,
+                                  TEST, TEARDOWN, STORE_STATE, RELEASE,
+                                  CONNECT, VALIDATE, INITIALIZE, FINALIZE)
 from rotest.core.models.case_data import TestOutcome, CaseData
 from rotest.management.models.ut_models import (DemoResource,
                                                 DemoResourceData,
@@ -15,7 +17,8 @@ from tests.core.utils import (ErrorInSetupCase, SuccessCase, FailureCase,
                               UnexpectedSuccessCase, BasicRotestUnitTest,
                               DynamicResourceLockingCase, ExpectRaisesCase,
                               StoreFailureErrorCase, ExpectedFailureCase,
-                              StoreFailureCase, MockTestSuite)
+                              StoreFailureCase, CoroutineCase,
+                              CoroutineFailureCase)
 
 
 RESOURCE_NAME = 'available_resource1'
@@ -135,26 +138,6 @@ class TestTestCase(BasicRotestUnitTest):
         self.version = 1
         self.ip_address = '1.1.1.1'
 
-    def _run_case(self, test_case, **kwargs):
-        """Run given case and return it.
-
-        Args:
-            test_case (rotest.core.case.TestCase): case to run.
-
-        Returns:
-            rotest.core.case.TestCase. the case.
-        """
-        class InternalSuite(MockTestSuite):
-            components = (test_case,)
-
-        test_suite = InternalSuite()
-        case = test_suite._tests[0]
-        for name, value in kwargs.iteritems():
-            setattr(case, name, value)
-
-        self.run_test(test_suite)
-        return next(iter(test_suite))
-
     def test_success_case_run(self):
         """Test a TestCase on successful run.
 
@@ -820,42 +803,24 @@ class TestTestCase(BasicRotestUnitTest):
         self.validate_resource(available_resource, validated=False,
                                initialized=False, finalized=False)
 
-    def test_store_state(self):
-        """Test the resource store sate method.
-
-        * Define a resource as required resource.
-        * Run the test under a test suite.
-        * Validate store_state method was called (it writes a file).
-        """
-        resource_name = 'store_resource'
-        TempErrorCase.resources = (request(resource_name=resource_name,
-                                           resource_class=DemoResource,
+    def test_phase_times(self):
+        """Test that the durations of the test's phases are saved."""
+        TempErrorCase.resources = (request('test_resource', DemoResource,
                                            name=RESOURCE_NAME),)
 
         case = self._run_case(TempErrorCase, save_state=True)
 
-        expected_state_path = os.path.join(case.work_dir,
-                                           TempErrorCase.STATE_DIR_NAME)
-
-        self.assertTrue(os.path.exists(expected_state_path))
+        phase_times = load_phase_times(case.data.phase_times)
+        self.assertEqual(phase_times["phases"].keys(),
+                         [LOCK, PREPARE, SETUP, TEST, TEARDOWN, STORE_STATE,
+                          RELEASE])
+        self.assertItemsEqual(phase_times["resources"][RESOURCE_NAME].keys(),
+                              [CONNECT, VALIDATE, INITIALIZE, FINALIZE])
+        for duration in phase_times["phases"].values():
+            self.assertGreaterEqual(duration, 0)
 
-    def test_save_state(self):
-        """Test the save_sate flag.
-
-        * Defines a resource as required resource that not save state.
-        * Runs the test under a test suite.
-        * Validates store_state method wasn't called.
-        """
-        resource_name = 'save_state_resource'
-        TempSuccessCase.resources = (request(resource_name=resource_name,
-                                             resource_class=DemoResource,
-                                             name=RESOURCE_NAME),)
-
-        case = self._run_case(TempSuccessCase, save_state=True)
-        expected_state_path = os.path.join(case.work_dir,
-                                           TempSuccessCase.STATE_DIR_NAME)
-
-        self.assertFalse(os.path.exists(expected_state_path))
+        self.assertItemsEqual(self.result.phase_totals.keys(),
+                              phase_times["phases"].keys())
 
     def test_force_initialize(self):
         """Tests the force_initialize flag when True.
@@ -937,3 +902,38 @@ class TestTestCase(BasicRotestUnitTest):
         self.assertEqual(case.data.exception_type, TestOutcome.SUCCESS,
                          "Unexpected test outcome, expected %r got %r" %
                          (TestOutcome.SUCCESS, case.data.exception_type))
+
+    def test_coroutine_case_run(self):
+        """Test a TestCase with coroutine methods on successful run.
+
+        * Runs a case whose setUp, test and tearDown methods are coroutines.
+        * Validates the result and that all the methods ran in order.
+        * Validates the resources were requested and released as usual.
+        """
+        CoroutineCase.resources = (request('test_resource', DemoResource,
+                                           name=RESOURCE_NAME),)
+
+        case = self._run_case(CoroutineCase)
+
+        self.assertTrue(self.result.wasSuccessful(),
+                        'Case failed when it should have succeeded')
+        self.assertEqual(case.steps, ['setUp', 'test', 'tearDown'])
+        self.assertEqual(case.data.exception_type, TestOutcome.SUCCESS)
+
+        test_resource = DemoResourceData.objects.get(name=RESOURCE_NAME)
+        self.validate_resource(test_resource)
+
+    def test_coroutine_failure_case_run(self):
+        """Test a TestCase with a failing coroutine test method.
+
+        * Runs a case whose test method fails after waiting on the loop.
+        * Validates the failure and its traceback.
+        """
+        CoroutineFailureCase.resources = ()
+
+        case = self._run_case(CoroutineFailureCase)
+
+        self.assertFalse(self.result.wasSuccessful(),
+                         'Case succeeded when it should have failed')
+        self.assertEqual(case.data.exception_type, TestOutcome.FAILED)
+        self.assertIn('self.fail()', case.data.traceback)
@@ -0,0 +1,75 @@
+"""Test profiling TestCases."""
+# pylint: disable=missing-docstring,invalid-name
+import os
+from StringIO import StringIO
+from unittest.runner import _WritelnDecorator
+
+import mock
+
+from rotest.core.case import request
+from rotest.core.result.result import Result
+from rotest.core.utils.profiler import (CPROFILE, SAMPLING, PSTATS_FILE_NAME,
+                                        COLLAPSED_FILE_NAME)
+from rotest.management.models.ut_models import DemoResource
+from rotest.core.result.handlers.profile_handler import ProfileHandler
+
+from tests.core.utils import BasicRotestUnitTest, SuccessCase
+
+
+RESOURCE_NAME = 'available_resource1'
+
+
+class TempSuccessCase(SuccessCase):
+    """Inherit class and override resources requests."""
+    __test__ = False
+
+    resources = (request('test_resource', DemoResource, name=RESOURCE_NAME),)
+
+
+class TestCaseProfiling(BasicRotestUnitTest):
+    """Test profiling cases, and summarizing their profiles."""
+    fixtures = ['resource_ut.json']
+
+    def test_profile(self):
+        """Test that the tests are profiled by the configured mode."""
+        for mode, file_name in ((CPROFILE, PSTATS_FILE_NAME),
+                                (SAMPLING, COLLAPSED_FILE_NAME)):
+            case = self._run_case(TempSuccessCase,
+                                  config={"profile": mode})
+
+            self.assertTrue(self.result.wasSuccessful(),
+                            'Case failed when it should have succeeded')
+            self.assertEqual(os.listdir(case.work_dir).count(file_name), 1)
+
+        case = self._run_case(TempSuccessCase, config={})
+        self.assertNotIn(PSTATS_FILE_NAME, os.listdir(case.work_dir))
+
+    def test_profile_before_stop(self):
+        """Test that the profile is saved before the test stops."""
+        profiled_files = []
+        stop_test = Result.stopTest.im_func
+
+        def record_profile(result, test):
+            profiled_files.append(os.path.isfile(
+                            os.path.join(test.work_dir, PSTATS_FILE_NAME)))
+            stop_test(result, test)
+
+        with mock.patch.object(Result, 'stopTest', record_profile):
+            self._run_case(TempSuccessCase, config={"profile": CPROFILE})
+
+        self.assertEqual(profiled_files, [True])
+
+    def test_profile_summary(self):
+        """Test printing the hot functions of the slowest tests."""
+        case = self._run_case(TempSuccessCase, config={"profile": CPROFILE})
+
+        stream = StringIO()
+        handler = ProfileHandler(stream=_WritelnDecorator(stream))
+        handler.stop_test(case)
+        handler.stop_test(case.parent)
+        handler.print_errors(1, [], [], [], [], [])
+
+        self.assertEqual(handler.tests, [case])
+        summary = stream.getvalue()
+        self.assertIn(case.data.name, summary)
+        self.assertIn("%", summary)
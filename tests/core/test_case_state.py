@@ -0,0 +1,197 @@
+"""Test storing the states of a TestCase's resources."""
+# pylint: disable=missing-docstring,unused-argument,invalid-name
+import os
+import time
+import threading
+
+import mock
+
+from rotest.core.case import request
+from rotest.management.models.ut_models import DemoResource
+
+from tests.core.utils import BasicRotestUnitTest, SuccessCase, ErrorCase
+
+
+RESOURCE_NAME = 'available_resource1'
+OTHER_RESOURCE_NAME = 'available_resource2'
+
+
+class WaitingStateResource(DemoResource):
+    """Resource whose state is stored only after an event is set."""
+    STATE_FILE_NAME = 'waiting_state.bin'
+    WAIT_TIMEOUT = 3
+    store_event = threading.Event()
+
+    def store_state(self, state_dir_path):
+        """Wait for the event, and save a state file if it was set."""
+        if self.store_event.wait(self.WAIT_TIMEOUT):
+            super(WaitingStateResource, self).store_state(state_dir_path)
+
+
+class TempSuccessCase(SuccessCase):
+    """Inherit class and override resources requests."""
+    __test__ = False
+
+    resources = (request('test_resource', DemoResource, name=RESOURCE_NAME),)
+
+
+class TempErrorCase(ErrorCase):
+    """Inherit class and override resources requests."""
+    __test__ = False
+
+    resources = (request('test_resource', DemoResource, name=RESOURCE_NAME),)
+
+
+class TestCaseState(BasicRotestUnitTest):
+    """Test storing the states of the resources of failing cases."""
+    fixtures = ['resource_ut.json']
+
+    def test_store_state(self):
+        """Test the resource store sate method.
+
+        * Define a resource as required resource.
+        * Run the test under a test suite.
+        * Validate store_state method was called (it writes a file).
+        """
+        resource_name = 'store_resource'
+        TempErrorCase.resources = (request(resource_name=resource_name,
+                                           resource_class=DemoResource,
+                                           name=RESOURCE_NAME),)
+
+        case = self._run_case(TempErrorCase, save_state=True)
+
+        expected_state_path = os.path.join(case.work_dir,
+                                           TempErrorCase.STATE_DIR_NAME)
+
+        self.assertTrue(os.path.exists(expected_state_path))
+
+    def test_save_state(self):
+        """Test the save_sate flag.
+
+        * Defines a resource as required resource that not save state.
+        * Runs the test under a test suite.
+        * Validates store_state method wasn't called.
+        """
+        resource_name = 'save_state_resource'
+        TempSuccessCase.resources = (request(resource_name=resource_name,
+                                             resource_class=DemoResource,
+                                             name=RESOURCE_NAME),)
+
+        case = self._run_case(TempSuccessCase, save_state=True)
+        expected_state_path = os.path.join(case.work_dir,
+                                           TempSuccessCase.STATE_DIR_NAME)
+
+        self.assertFalse(os.path.exists(expected_state_path))
+
+    def test_compress_state(self):
+        """Test compressing the stored states' files."""
+        TempErrorCase.resources = (request(resource_name='store_resource',
+                                           resource_class=DemoResource,
+                                           name=RESOURCE_NAME),)
+
+        case = self._run_case(TempErrorCase, save_state=True,
+                              COMPRESS_STATE=True)
+
+        state_path = os.path.join(case.work_dir, TempErrorCase.STATE_DIR_NAME)
+        self.assertEqual(os.listdir(state_path),
+                         [DemoResource.STATE_FILE_NAME +
+                          TempErrorCase.COMPRESSED_EXTENSION])
+
+    def test_release_stored_resources(self):
+        """Test releasing resources once their own state is stored.
+
+        * Request a resource whose state is stored only after the other
+          resource is released.
+        * Validate the states of both resources were stored.
+        """
+        store_event = threading.Event()
+
+        class ReleaseTrackingCase(TempErrorCase):
+            __test__ = False
+
+            resources = (request('fast_resource', DemoResource,
+                                 name=RESOURCE_NAME),
+                         request('slow_resource', WaitingStateResource,
+                                 name=OTHER_RESOURCE_NAME))
+
+            def release_resources(self, resources=None, *args, **kwargs):
+                super(ReleaseTrackingCase, self).release_resources(
+                    resources, *args, **kwargs)
+                if resources == ['fast_resource']:
+                    store_event.set()
+
+        WaitingStateResource.store_event = store_event
+        case = self._run_case(ReleaseTrackingCase, save_state=True)
+
+        state_path = os.path.join(case.work_dir, TempErrorCase.STATE_DIR_NAME)
+        self.assertItemsEqual(os.listdir(state_path),
+                              [DemoResource.STATE_FILE_NAME,
+                               WaitingStateResource.STATE_FILE_NAME])
+        self.assertEqual(len(case.locked_resources), 0)
+
+    def test_store_state_timeout(self):
+        """Test that the test doesn't wait for hanging states storing."""
+        TempErrorCase.resources = (request('fast_resource', DemoResource,
+                                           name=RESOURCE_NAME),
+                                   request('slow_resource',
+                                           WaitingStateResource,
+                                           name=OTHER_RESOURCE_NAME))
+
+        WaitingStateResource.store_event = threading.Event()
+        start_time = time.time()
+        case = self._run_case(TempErrorCase, save_state=True,
+                              STATE_TIMEOUT=0.2)
+
+        self.assertLess(time.time() - start_time,
+                        WaitingStateResource.WAIT_TIMEOUT)
+        state_path = os.path.join(case.work_dir, TempErrorCase.STATE_DIR_NAME)
+        self.assertEqual(os.listdir(state_path),
+                         [DemoResource.STATE_FILE_NAME])
+
+    def test_resource_state_timeout(self):
+        """Test that resources time out by their own state timeout."""
+        finalized_event = threading.Event()
+
+        class QuickTimeoutResource(WaitingStateResource):
+            STATE_TIMEOUT = 0.2
+
+            def finalize(self):
+                super(QuickTimeoutResource, self).finalize()
+                finalized_event.set()
+
+        TempErrorCase.resources = (request('fast_resource', DemoResource,
+                                           name=RESOURCE_NAME),
+                                   request('slow_resource',
+                                           QuickTimeoutResource,
+                                           name=OTHER_RESOURCE_NAME))
+
+        released_resources = []
+        release_resources = TempErrorCase.release_resources.im_func
+
+        def record_release(case, resources=None, dirty=False,
+                           force_release=True, finalize=True):
+            released_resources.append((resources, dirty, finalize))
+            release_resources(case, resources, dirty, force_release,
+                              finalize)
+
+        QuickTimeoutResource.store_event = threading.Event()
+        state_timeout = 2 * WaitingStateResource.WAIT_TIMEOUT
+        start_time = time.time()
+        with mock.patch.object(TempErrorCase, 'release_resources',
+                               record_release):
+            case = self._run_case(TempErrorCase, save_state=True,
+                                  STATE_TIMEOUT=state_timeout)
+
+        self.assertLess(time.time() - start_time,
+                        WaitingStateResource.WAIT_TIMEOUT)
+        self.assertIn((['slow_resource'], True, False), released_resources)
+        self.assertEqual(len(case.locked_resources), 0)
+        state_path = os.path.join(case.work_dir, TempErrorCase.STATE_DIR_NAME)
+        self.assertEqual(os.listdir(state_path),
+                         [DemoResource.STATE_FILE_NAME])
+
+        # The resource is finalized only once its state storing finishes
+        self.assertFalse(finalized_event.is_set())
+        QuickTimeoutResource.store_event.set()
+        self.assertTrue(
+                    finalized_event.wait(WaitingStateResource.WAIT_TIMEOUT))
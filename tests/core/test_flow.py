@@ -1,10 +1,15 @@
 """Test TestSuite behavior and common variables."""
 # pylint: disable=no-init,old-style-class,too-many-public-methods
 # pylint: disable=too-many-lines,too-many-arguments,too-many-locals
+import time
+from threading import Event
+
 from rotest.core.case import request
+from rotest.core.models.general_data import GeneralData
 from rotest.core.models.case_data import TestOutcome
 from rotest.core.flow_component import PipeTo, BlockInput, BlockOutput
 from rotest.core.block import MODE_CRITICAL, MODE_FINALLY, MODE_OPTIONAL
+from rotest.management.client.manager import SynchronizedResourceManager
 from rotest.management.models.ut_models import (DemoResource,
                                                 DemoResourceData,
                                                 InitializeErrorResource)
@@ -16,7 +21,8 @@ from tests.core.utils import (FailureBlock, ErrorBlock, MockFlow,
                               BasicRotestUnitTest, MockSubFlow,
                               AttributeCheckingBlock, MockBlock,
                               DynamicResourceLockingBlock, StoreFailuresBlock,
-                              create_reader_block, create_writer_block)
+                              CoroutineBlock, create_reader_block,
+                              create_writer_block)
 
 
 class TestTestFlow(BasicRotestUnitTest):
@@ -1183,3 +1189,130 @@ class TestTestFlow(BasicRotestUnitTest):
 
         self.assertEqual(test_flow.data.exception_type, TestOutcome.FAILED,
                          'Flow data status should have been failure')
+
+    def test_parallel_dependencies(self):
+        """Validate the dependencies derived for a parallel flow.
+
+        * Independent blocks don't depend on each other.
+        * A reader block depends on the writer of its input.
+        * A MODE_FINALLY block depends on all the previous blocks.
+        """
+        class ParallelFlow(MockFlow):
+            PARALLEL_BLOCKS = True
+            blocks = (SuccessBlock,
+                      create_writer_block(inject_name='value'),
+                      SuccessBlock,
+                      create_reader_block(inject_name='value',
+                                          inject_value='some_value'),
+                      SuccessBlock.params(mode=MODE_FINALLY))
+
+        test_flow = ParallelFlow()
+        self.assertEqual(test_flow.get_dependencies(),
+                         [set(), set(), set(), {1}, {0, 1, 2, 3}])
+
+    def test_parallel_blocks_run_concurrently(self):
+        """Validate that independent blocks run at the same time.
+
+        Each block signals its own event and waits for the other's, which
+        can only succeed if the two blocks run concurrently.
+        """
+        first_started = Event()
+        second_started = Event()
+
+        class WaitingBlock(MockBlock):
+            __test__ = False
+
+            own_event = BlockInput()
+            other_event = BlockInput()
+
+            def test_wait(self):
+                self.own_event.set()
+                self.assertTrue(self.other_event.wait(5),
+                                "The other block didn't run concurrently")
+
+        class ParallelFlow(MockFlow):
+            PARALLEL_BLOCKS = True
+            blocks = (WaitingBlock.params(own_event=first_started,
+                                          other_event=second_started),
+                      WaitingBlock.params(own_event=second_started,
+                                          other_event=first_started))
+
+        test_flow = ParallelFlow()
+        self.run_test(test_flow)
+
+        self.assertTrue(self.result.wasSuccessful(),
+                        'Flow failed when it should have succeeded')
+
+        self.validate_blocks(test_flow, successes=2)
+
+    def test_parallel_flow_modes(self):
+        """Validate the blocks modes semantics in a parallel flow.
+
+        A critical failure skips the blocks that depend on the failing block,
+        while MODE_FINALLY blocks still run.
+        """
+        class ParallelFlow(MockFlow):
+            PARALLEL_BLOCKS = True
+            blocks = (FailureBlock.params(mode=MODE_CRITICAL),
+                      SuccessBlock.params(mode=MODE_FINALLY),
+                      SuccessBlock.params(mode=MODE_CRITICAL))
+
+        test_flow = ParallelFlow()
+        self.run_test(test_flow)
+
+        self.assertFalse(self.result.wasSuccessful(),
+                         'Flow succeeded when it should have failed')
+
+        self.validate_blocks(test_flow, successes=1, failures=1, skips=1)
+
+    def test_parallel_critical_failure(self):
+        """Validate no block starts after a critical block failed.
+
+        The reader block depends on the writer block, which finishes only
+        after the independent critical block failed, so the reader is skipped
+        although it comes before the failing block in the flow.
+        """
+        class WaitingWriterBlock(MockBlock):
+            __test__ = False
+
+            value = BlockOutput()
+
+            def test_wait(self):
+                failing_block = list(self.parent)[-1]
+                deadline = time.time() + 5
+                while (failing_block.data.status != GeneralData.FINISHED and
+                       time.time() < deadline):
+                    time.sleep(0.05)
+
+                self.value = 'some_value'
+
+        class ParallelFlow(MockFlow):
+            PARALLEL_BLOCKS = True
+            blocks = (WaitingWriterBlock,
+                      create_reader_block(inject_name='value',
+                                          inject_value='some_value'),
+                      FailureBlock.params(mode=MODE_CRITICAL))
+
+        test_flow = ParallelFlow()
+        self.run_test(test_flow)
+
+        self.assertFalse(self.result.wasSuccessful(),
+                         'Flow succeeded when it should have failed')
+
+        self.validate_blocks(test_flow, successes=1, failures=1, skips=1)
+        for block in test_flow:
+            self.assertIsInstance(block.resource_manager,
+                                  SynchronizedResourceManager)
+
+    def test_coroutine_blocks(self):
+        """Validate that coroutine blocks run on the event loop."""
+        class CoroutineFlow(MockFlow):
+            blocks = (CoroutineBlock, CoroutineBlock)
+
+        test_flow = CoroutineFlow()
+        self.run_test(test_flow)
+
+        self.assertTrue(self.result.wasSuccessful(),
+                        'Flow failed when it should have succeeded')
+
+        self.validate_blocks(test_flow, successes=2)
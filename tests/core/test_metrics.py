@@ -0,0 +1,82 @@
+"""Test the buffers of the monitors' samples."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from rotest.core.utils.metrics import (MetricBuffer, read_metric_file,
+                                       get_metrics_summary)
+
+
+class TestMetricBuffer(unittest.TestCase):
+    """Test keeping and writing the samples of a metric."""
+    def test_ring_buffer(self):
+        """Verify the oldest samples are dropped when the buffer is full."""
+        metric = MetricBuffer("memory", "L", capacity=4)
+        for value in xrange(10):
+            metric.record(value, timestamp=value * 10)
+
+        self.assertEqual(len(metric), 4)
+        self.assertEqual(metric.dropped, 6)
+        self.assertEqual(metric.values().tolist(), [6, 7, 8, 9])
+        self.assertEqual(metric.timestamps().tolist(), [60, 70, 80, 90])
+
+    def test_summary(self):
+        """Verify the statistics of the samples."""
+        metric = MetricBuffer("cpu", capacity=100)
+        self.assertEqual(metric.summary()["count"], 0)
+        self.assertIsNone(metric.summary()["p95"])
+
+        for value in xrange(100, 0, -1):
+            metric.record(value)
+
+        self.assertEqual(metric.summary(), {"count": 100, "min": 1,
+                                            "max": 100, "mean": 50.5,
+                                            "p95": 95})
+
+    def test_samples(self):
+        """Verify the snapshot of the samples matches the recorded count."""
+        metric = MetricBuffer("memory", "L", capacity=2)
+        for value in xrange(3):
+            metric.record(value, timestamp=value)
+
+        count, timestamps, values = metric.samples()
+        self.assertEqual(count, 3)
+        self.assertEqual(timestamps.tolist(), [1, 2])
+        self.assertEqual(values.tolist(), [1, 2])
+
+    def test_sent_summary(self):
+        """Verify the summary sent by a worker is used when it exists."""
+        class Test(object):
+            metrics = {"cpu": MetricBuffer("cpu")}
+            metrics_summary = None
+
+        test = Test()
+        self.assertEqual(get_metrics_summary(test)["cpu"]["count"], 0)
+
+        test.metrics_summary = {"cpu": {"count": 5}}
+        self.assertEqual(get_metrics_summary(test), {"cpu": {"count": 5}})
+
+    def test_invalid_typecode(self):
+        """Verify only numeric typecodes are allowed."""
+        self.assertRaises(ValueError, MetricBuffer, "name", "c")
+
+    def test_write(self):
+        """Verify the written samples are read back."""
+        metric = MetricBuffer("traffic", "d", capacity=3)
+        for value in (0.5, 1.5, 2.5, 3.5):
+            metric.record(value, timestamp=value + 100)
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(temp_dir, "traffic.col")
+            metric.write(file_path)
+            header, timestamps, values = read_metric_file(file_path)
+
+        finally:
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(header["name"], "traffic")
+        self.assertEqual(header["dropped"], 1)
+        self.assertEqual(values.tolist(), [1.5, 2.5, 3.5])
+        self.assertEqual(timestamps.tolist(), [101.5, 102.5, 103.5])
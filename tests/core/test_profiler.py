@@ -0,0 +1,109 @@
+"""Test the profiling of tests."""
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import threading
+
+from rotest.core.utils.profiler import (CPROFILE, SAMPLING, PSTATS_FILE_NAME,
+                                        COLLAPSED_FILE_NAME, SamplingProfiler,
+                                        create_profiler, get_hot_functions)
+
+
+def busy_function(duration):
+    """Keep the CPU busy for the given seconds."""
+    end_time = time.time() + duration
+    while time.time() < end_time:
+        pass
+
+
+class TestProfilers(unittest.TestCase):
+    """Test profiling code and finding its hot functions."""
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def _profile(self, mode):
+        """Profile a call of the busy function and save the profile.
+
+        Args:
+            mode (str): profiling mode.
+
+        Returns:
+            str. path of the saved profile.
+        """
+        profiler = create_profiler(mode)
+        profiler.start()
+        try:
+            busy_function(0.2)
+
+        finally:
+            profiler.stop()
+
+        return profiler.save(self.work_dir)
+
+    def test_cprofile(self):
+        """Verify the deterministic profile finds the busy function."""
+        file_path = self._profile(CPROFILE)
+        self.assertEqual(os.path.basename(file_path), PSTATS_FILE_NAME)
+
+        hot_functions = get_hot_functions(self.work_dir, limit=3)
+        self.assertLessEqual(len(hot_functions), 3)
+        self.assertIn("busy_function (test_profiler.py:",
+                      " ".join(name for name, _ in hot_functions))
+
+    def test_sampling(self):
+        """Verify the samples are saved as collapsed stacks."""
+        file_path = self._profile(SAMPLING)
+        self.assertEqual(os.path.basename(file_path), COLLAPSED_FILE_NAME)
+
+        with open(file_path) as collapsed_file:
+            lines = collapsed_file.readlines()
+
+        self.assertGreater(len(lines), 0)
+        stack, samples = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(samples), 0)
+        self.assertIn("_profile (test_profiler.py:", stack)
+
+        (function, fraction), = get_hot_functions(self.work_dir, limit=1)
+        self.assertTrue(function.startswith("busy_function"))
+        self.assertGreater(fraction, 0.5)
+
+    def test_sample_other_thread(self):
+        """Verify only the profiled thread is sampled."""
+        profiler = SamplingProfiler()
+        started = threading.Event()
+        finished = threading.Event()
+
+        def idle_function():
+            """Start profiling the current thread, and wait."""
+            profiler.start()
+            started.set()
+            finished.wait()
+
+        idle_thread = threading.Thread(target=idle_function)
+        idle_thread.start()
+        started.wait()
+        try:
+            busy_function(0.1)
+
+        finally:
+            finished.set()
+            idle_thread.join()
+            profiler.stop()
+
+        self.assertGreater(len(profiler.stacks), 0)
+        for stack in profiler.stacks:
+            self.assertIn("idle_function", stack)
+            self.assertNotIn("busy_function", stack)
+
+    def test_no_profile(self):
+        """Verify no functions are returned for tests without a profile."""
+        self.assertEqual(get_hot_functions(self.work_dir), [])
+
+    def test_unknown_mode(self):
+        """Verify creating a profiler of an unknown mode fails."""
+        self.assertRaises(ValueError, create_profiler, "unknown")
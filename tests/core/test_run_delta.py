@@ -3,7 +3,7 @@
 # pylint: disable=protected-access,too-many-public-methods,invalid-name
 from rotest.core.runner import run
 from rotest.core.models.run_data import RunData
-from rotest.core.models.case_data import TestOutcome
+from rotest.core.models.case_data import CaseData, TestOutcome
 from rotest.core.result.handlers.db_handler import DBHandler
 
 from tests.core.utils import (ErrorCase, SuccessCase, FailureCase, SkipCase,
@@ -435,3 +435,24 @@ class TestRunDelta(BasicRotestUnitTest):
                         outputs=(DBHandler.NAME,), run_name='run1')
         self.validate_suite_data(run_data.main_test, False, successes=1,
                                  fails=1)
+
+    def test_delta_manifest_names(self):
+        """Test that the delta manifest only contains the requested tests.
+
+        * Runs a suite with success & failure cases.
+        * Validates the manifest of both tests holds their outcomes.
+        * Validates the manifest of the success case holds only its outcome.
+        """
+        MockTestSuite.components = (SuccessCase, FailureCase)
+
+        run_data, = run(MockTestSuite, outputs=(DBHandler.NAME,),
+                        run_name='run1')
+        success_name, failure_name = [case_data.name for case_data in
+                                      run_data.main_test.get_sub_tests_data()]
+
+        self.assertEqual(CaseData.get_delta_manifest(
+            [success_name, failure_name, success_name]),
+            {success_name: True, failure_name: False})
+
+        self.assertEqual(CaseData.get_delta_manifest([success_name]),
+                         {success_name: True})
@@ -4,14 +4,19 @@ This module contains tests for the runners' results.
 """
 # pylint: disable=too-many-arguments
 # pylint: disable=relative-import,invalid-name,too-many-public-methods
+import os
 import sys
 import unittest
 from abc import ABCMeta
 from StringIO import StringIO
 from multiprocessing import Queue, Event
 
+import mock
+
+from rotest.common.log import CORE_LOG_NAME, get_tree_path
 from rotest.core.runner import BaseTestRunner
 from rotest.core.models.general_data import GeneralData
+from rotest.core.runners.threaded_runner import ThreadedRunner
 from rotest.core.runners.multiprocess.manager.runner import MultiprocessRunner
 
 from tests.core.multiprocess.utils import (TimeoutCase, SuicideCase,
@@ -20,7 +25,8 @@ from tests.core.utils import (FailureCase, SuccessCase, ErrorCase, SkipCase,
                               UnexpectedSuccessCase, ExpectedFailureCase,
                               MockSuite1, MockSuite2, MockTestSuite,
                               StoreMultipleFailuresCase, StoreFailureErrorCase,
-                              TwoTestsCase, BasicRotestUnitTest)
+                              TwoTestsCase, BasicRotestUnitTest,
+                              ConcurrentCoroutineCase, LoggingCase)
 
 
 class AbstractTestRunnerResult(BasicRotestUnitTest):
@@ -303,3 +309,83 @@ class TestBaseRunnerResult(AbstractTestRunnerResult):
                                 enable_debug=False,
                                 stream=StringIO())
         return client
+
+
+class TestThreadedRunnerResult(AbstractTestRunnerResult):
+    """Test class for testing the threaded runner's behavior.
+
+    Attributes:
+        NUMBER_OF_THREADS (number): number of threads the ThreadedRunner
+            should use.
+    """
+    __test__ = True
+
+    NUMBER_OF_THREADS = 2
+
+    def get_runner(self):
+        """Create and return the relevant test runner.
+
+        Returns:
+            ThreadedRunner. test runner object.
+        """
+        return ThreadedRunner(outputs=[],
+                              config=None,
+                              run_name=None,
+                              run_delta=False,
+                              save_state=False,
+                              enable_debug=False,
+                              stream=StringIO(),
+                              threads_number=self.NUMBER_OF_THREADS)
+
+    def test_coroutines_interleave(self):
+        """Validate the tests' coroutines interleave on the runner's loop."""
+        ConcurrentCoroutineCase.running_coroutines = []
+        MockTestSuite.components = (ConcurrentCoroutineCase,
+                                    ConcurrentCoroutineCase)
+
+        self.runner.run(MockTestSuite)
+        test = self.runner.test_item
+
+        self.validate_all_finished(test)
+        self.validate_result(self.runner.result, True, successes=2)
+        for case in test:
+            self.assertIs(case.event_loop, self.runner.event_loop)
+
+        self.assertEqual(max(ConcurrentCoroutineCase.running_coroutines),
+                         self.NUMBER_OF_THREADS)
+
+    def test_client_creation_failure(self):
+        """Validate the tests fail if the threads can't create clients."""
+        MockTestSuite.components = (SuccessCase, SuccessCase, SuccessCase)
+
+        with mock.patch.object(BaseTestRunner, "create_resource_manager",
+                               side_effect=RuntimeError("No server")):
+            self.runner.run(MockTestSuite)
+
+        test = self.runner.test_item
+        self.validate_all_finished(test)
+        self.validate_result(self.runner.result, False, successes=0,
+                             errors=3)
+
+    def test_test_loggers(self):
+        """Validate the logs of concurrent tests go to their own loggers."""
+        MockTestSuite.components = (LoggingCase, LoggingCase)
+
+        self.runner.run(MockTestSuite)
+        test = self.runner.test_item
+        self.validate_result(self.runner.result, True, successes=2)
+
+        messages = {case.identifier: "Logged by test %d" % case.identifier
+                    for case in test}
+        for case in test:
+            log_path = os.path.join(case.work_dir, "%s.%s.log" %
+                                    (CORE_LOG_NAME, get_tree_path(case)))
+            with open(log_path) as log_file:
+                log_content = log_file.read()
+
+            for identifier, message in messages.iteritems():
+                if identifier == case.identifier:
+                    self.assertIn(message, log_content)
+
+                else:
+                    self.assertNotIn(message, log_content)
@@ -0,0 +1,93 @@
+"""Test classifying stored failures by the known issues signatures."""
+from django.test import TestCase, TransactionTestCase
+
+from rotest.core.models.signature import SignatureData
+from rotest.core.models.case_data import CaseData, TestOutcome
+from rotest.core.utils.signature_classifier import (classify_failures,
+                                                    reset_classification)
+
+
+class TestSignatureClassifier(TestCase):
+    """Test the incremental classification of failures."""
+    fixtures = ['signature_ut.json']
+
+    @staticmethod
+    def create_case(exception_type, traceback):
+        """Create a finished case in the DB.
+
+        Args:
+            exception_type (number): the outcome of the case.
+            traceback (str): the traceback of the case.
+
+        Returns:
+            CaseData. the created case.
+        """
+        return CaseData.objects.create(name="Case.test_method",
+                                       exception_type=exception_type,
+                                       traceback=traceback)
+
+    def test_classification(self):
+        """Test that failures are linked to the first matching signature."""
+        failure = self.create_case(TestOutcome.FAILED, "AssertionFailed")
+        error = self.create_case(TestOutcome.ERROR, "Bad\nError")
+        unknown = self.create_case(TestOutcome.ERROR, "Unknown")
+        success = self.create_case(TestOutcome.SUCCESS, "Error")
+
+        self.assertEqual(classify_failures(processes=1), (3, 2))
+
+        self.assertEqual(CaseData.objects.get(pk=failure.pk).signature.name,
+                         "test_res1")
+        self.assertEqual(CaseData.objects.get(pk=error.pk).signature.name,
+                         "test_res2")
+        self.assertIsNone(CaseData.objects.get(pk=unknown.pk).signature)
+        self.assertIsNone(CaseData.objects.get(pk=success.pk).signature)
+
+    def test_incremental_classification(self):
+        """Test that only new failures or new signatures are classified."""
+        self.create_case(TestOutcome.FAILED, "AssertionFailed")
+        unknown = self.create_case(TestOutcome.ERROR, "Unknown")
+        self.assertEqual(classify_failures(processes=1), (2, 1))
+        self.assertEqual(classify_failures(processes=1), (0, 0))
+
+        self.create_case(TestOutcome.ERROR, "Bad\nError")
+        self.assertEqual(classify_failures(processes=1), (1, 1))
+
+        SignatureData.objects.create(name="unknown", link="",
+                                     pattern="Unknown")
+        self.assertEqual(classify_failures(processes=1), (1, 1))
+        self.assertEqual(CaseData.objects.get(pk=unknown.pk).signature.name,
+                         "unknown")
+
+        reset_classification()
+        self.assertEqual(classify_failures(processes=1), (3, 3))
+
+    def test_deleted_signature(self):
+        """Test that the cases of a deleted signature are classified again."""
+        case = self.create_case(TestOutcome.ERROR, "Unknown Error")
+        SignatureData.objects.create(name="unknown", link="",
+                                     pattern="Unknown")
+        self.assertEqual(classify_failures(processes=1), (1, 1))
+        self.assertEqual(CaseData.objects.get(pk=case.pk).signature.name,
+                         "test_res2")
+
+        SignatureData.objects.filter(name="test_res2").delete()
+        self.assertEqual(classify_failures(processes=1), (1, 1))
+        self.assertEqual(CaseData.objects.get(pk=case.pk).signature.name,
+                         "unknown")
+
+
+class TestMultiprocessSignatureClassifier(TransactionTestCase):
+    """Test classifying failures in worker processes."""
+    fixtures = ['signature_ut.json']
+
+    def test_classification(self):
+        """Test that the workers classify all the chunks."""
+        for index in xrange(10):
+            CaseData.objects.create(name="Case.test_%d" % index,
+                                    exception_type=TestOutcome.FAILED,
+                                    traceback="AssertionFailed %d" % index)
+
+        self.assertEqual(classify_failures(processes=2, chunk_size=3),
+                         (10, 10))
+        self.assertEqual(
+            CaseData.objects.filter(signature__name="test_res1").count(), 10)
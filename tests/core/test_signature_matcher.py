@@ -0,0 +1,63 @@
+"""Test matching tracebacks with the known issues signatures."""
+from django.test import TestCase
+
+from rotest.core.models.signature import SignatureData
+from rotest.core.signature_matcher import (SignatureMatcher,
+                                           get_required_literal,
+                                           get_signature_matcher)
+
+
+class TestSignatureMatcher(TestCase):
+    """Test the precompiled signatures matcher."""
+    fixtures = ['signature_ut.json']
+
+    def test_required_literal(self):
+        """Test extracting the literal every match of a pattern contains."""
+        self.assertEqual(get_required_literal(".*Fail.*"), "Fail")
+        self.assertEqual(get_required_literal("Traceback.*Error: (a|b)"),
+                         "Traceback")
+        self.assertEqual(get_required_literal("(Fail|Error)"), "")
+        self.assertEqual(get_required_literal("(?i).*Fail.*"), "")
+
+    def test_match(self):
+        """Test that the first matching signature is returned."""
+        matcher = get_signature_matcher()
+
+        self.assertEqual(matcher.match("Failed. Error").name, "test_res1")
+        self.assertEqual(matcher.match("Bad\nError").name, "test_res2")
+        self.assertIsNone(matcher.match("Success"))
+
+    def test_invalid_pattern(self):
+        """Test that signatures with invalid patterns are skipped."""
+        matcher = SignatureMatcher([SignatureData(name="invalid",
+                                                  pattern="(Error"),
+                                    SignatureData(name="valid",
+                                                  pattern=".*Error.*")])
+
+        self.assertEqual(matcher.match("Error").name, "valid")
+
+    def test_invalidation(self):
+        """Test that the matcher is recreated only when signatures change."""
+        matcher = get_signature_matcher()
+        self.assertIs(get_signature_matcher(), matcher)
+
+        SignatureData.objects.create(name="new", link="", pattern="New.*")
+
+        new_matcher = get_signature_matcher()
+        self.assertIsNot(new_matcher, matcher)
+        self.assertEqual(new_matcher.match("New issue").name, "new")
+
+    def test_invalidation_by_other_process(self):
+        """Test that the matcher is recreated when signatures are updated.
+
+        Updating the signatures with a query (as another process would)
+        sends no signals, so the matcher must notice the change by itself.
+        """
+        matcher = get_signature_matcher()
+        SignatureData.objects.filter(name="test_res1").update(
+            pattern=".*Changed.*")
+
+        new_matcher = get_signature_matcher()
+        self.assertIsNot(new_matcher, matcher)
+        self.assertEqual(new_matcher.match("Changed. Error").name,
+                         "test_res1")
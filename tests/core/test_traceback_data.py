@@ -0,0 +1,91 @@
+"""Test storing the tests' tracebacks deduplicated and compressed."""
+from django.test import TestCase
+from django.forms.models import modelform_factory
+
+from rotest.core.admin import CaseDataForm
+
+from rotest.core.models.case_data import CaseData, TestOutcome
+from rotest.core.models.traceback_data import TracebackData
+
+
+class TestTracebackData(TestCase):
+    """Test the content-addressed storage of the cases' tracebacks."""
+    TRACEBACK = u"Traceback (most recent call last):\n  AssertionError: \u05d0"
+
+    def test_round_trip(self):
+        """Test that the traceback is read back as it was written."""
+        case = CaseData.objects.create(name="Case.test_method",
+                                       traceback=self.TRACEBACK)
+
+        stored_case = CaseData.objects.get(pk=case.pk)
+        self.assertEqual(stored_case.traceback, self.TRACEBACK)
+        self.assertNotEqual(stored_case.traceback_data.body, self.TRACEBACK)
+
+    def test_deduplication(self):
+        """Test that identical tracebacks are stored once."""
+        first_case = CaseData.objects.create(name="Case.test_first",
+                                             traceback=self.TRACEBACK)
+        second_case = CaseData.objects.create(
+            name="Case.test_second",
+            traceback=self.TRACEBACK.replace("\n", "\r\n"))
+
+        self.assertEqual(TracebackData.objects.count(), 1)
+        self.assertEqual(first_case.traceback_data_id,
+                         second_case.traceback_data_id)
+
+    def test_empty_traceback(self):
+        """Test that an empty traceback isn't stored."""
+        case = CaseData.objects.create(name="Case.test_method")
+
+        self.assertEqual(CaseData.objects.get(pk=case.pk).traceback, "")
+        self.assertIsNone(case.traceback_data)
+        self.assertEqual(TracebackData.objects.count(), 0)
+
+    def test_update_result(self):
+        """Test that results details are appended to the stored traceback."""
+        case = CaseData.objects.create(name="Case.test_method")
+        case.update_result(TestOutcome.ERROR, "First error")
+        case.save()
+        case = CaseData.objects.get(pk=case.pk)
+        case.update_result(TestOutcome.ERROR, "Second error")
+        case.save()
+
+        self.assertEqual(CaseData.objects.get(pk=case.pk).traceback,
+                         CaseData.TB_SEPARATOR.join(["First error",
+                                                     "Second error"]))
+        # The traceback before the second error isn't left orphaned
+        self.assertEqual(TracebackData.objects.count(), 1)
+
+    def test_shared_traceback_kept(self):
+        """Test that a changed traceback is kept if other cases share it."""
+        first_case = CaseData.objects.create(name="Case.test_first",
+                                             traceback=self.TRACEBACK)
+        second_case = CaseData.objects.create(name="Case.test_second",
+                                              traceback=self.TRACEBACK)
+
+        first_case.traceback = u"Edited traceback"
+        first_case.save()
+
+        self.assertEqual(TracebackData.objects.count(), 2)
+        self.assertEqual(CaseData.objects.get(pk=second_case.pk).traceback,
+                         self.TRACEBACK)
+
+    def test_admin_form(self):
+        """Test that the admin edits the traceback through the property."""
+        case = CaseData.objects.create(name="Case.test_method",
+                                       traceback=self.TRACEBACK)
+
+        # The admin creates the form of the fields it shows
+        form_class = modelform_factory(CaseData, form=CaseDataForm,
+                                       fields=["name", "traceback"])
+
+        form = form_class(instance=case)
+        self.assertEqual(form.initial["traceback"], self.TRACEBACK)
+
+        form = form_class({"name": case.name,
+                           "traceback": u"Edited traceback"}, instance=case)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        self.assertEqual(CaseData.objects.get(pk=case.pk).traceback,
+                         u"Edited traceback")
@@ -8,6 +8,8 @@ import django
 from django.db import connections
 from django.core.exceptions import ObjectDoesNotExist
 from django.test.testcases import TransactionTestCase
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
 
 from rotest.core.flow import TestFlow
 from rotest.core.suite import TestSuite
@@ -86,6 +88,29 @@ class BasicRotestUnitTest(TransactionTestCase):
 
         test.run(self.result)
 
+    def _run_case(self, test_case, **kwargs):
+        """Run the given case under a suite, and return it.
+
+        Args:
+            test_case (type): case class to run.
+            kwargs (dict): attributes to set to the case before running it.
+
+        Returns:
+            rotest.core.case.TestCase. the case.
+        """
+        class InternalSuite(TestSuite):
+            __test__ = False
+
+            components = (test_case,)
+
+        test_suite = InternalSuite()
+        case = next(iter(test_suite))
+        for name, value in kwargs.iteritems():
+            setattr(case, name, value)
+
+        self.run_test(test_suite)
+        return case
+
     def validate_result(self, result, success, successes=0, fails=0, skips=0,
                         errors=0, expected_failures=0, unexpected_successes=0):
         """Validate that the run summary is as expected.
@@ -479,6 +504,69 @@ class ErrorInSetupCase(SuccessCase):
         raise RuntimeError()
 
 
+class CoroutineCase(MockCase):
+    """Mock case, with coroutine setUp, test and tearDown methods."""
+    __test__ = False
+
+    def setUp(self):
+        """Mock test setup - waits on the event loop."""
+        self.steps = [(yield deferLater(reactor, 0, lambda: 'setUp'))]
+
+    def test_coroutine(self):
+        """Mock test function - waits on the event loop and validates."""
+        self.steps.append((yield deferLater(reactor, 0, lambda: 'test')))
+        self.assertEqual(self.steps, ['setUp', 'test'])
+
+    def tearDown(self):
+        """Mock test teardown - waits on the event loop."""
+        self.steps.append((yield deferLater(reactor, 0, lambda: 'tearDown')))
+
+
+class CoroutineFailureCase(MockCase):
+    """Mock case, coroutine test method that fails after waiting."""
+    __test__ = False
+
+    def test_coroutine_failure(self):
+        """Mock test function - waits on the event loop and fails."""
+        yield deferLater(reactor, 0, lambda: None)
+        self.fail()
+
+
+class ConcurrentCoroutineCase(MockCase):
+    """Mock case, coroutine test method that counts the running coroutines.
+
+    Attributes:
+        WAIT_DURATION (number): seconds the test waits on the event loop.
+        running_coroutines (list): number of the unfinished coroutines on the
+            event loop of each test, counted after waiting.
+    """
+    __test__ = False
+
+    WAIT_DURATION = 0.5
+    running_coroutines = []
+
+    def test_coroutine(self):
+        """Mock test function - waits on the event loop and counts."""
+        yield deferLater(reactor, self.WAIT_DURATION, lambda: None)
+        self.running_coroutines.append(len(self.event_loop.pending))
+
+
+class LoggingCase(MockCase):
+    """Mock case, logs its name after waiting for the concurrent tests.
+
+    Attributes:
+        WAIT_DURATION (number): seconds the test waits on the event loop.
+    """
+    __test__ = False
+
+    WAIT_DURATION = 0.5
+
+    def test_log(self):
+        """Mock test function - waits on the event loop and logs its name."""
+        yield deferLater(reactor, self.WAIT_DURATION, lambda: None)
+        self.logger.info("Logged by test %d", self.identifier)
+
+
 class FailTwiceCase(MockCase):
     """Mock case which fails until it is run a fixed number of times.
 
@@ -664,6 +752,16 @@ class SuccessBlock(MockBlock):
         pass
 
 
+class CoroutineBlock(MockBlock):
+    """Mock block, coroutine test method that succeeds after waiting."""
+    __test__ = False
+
+    def test_coroutine(self):
+        """Mock test function - waits on the event loop and validates."""
+        value = yield deferLater(reactor, 0, lambda: 'value')
+        self.assertEqual(value, 'value')
+
+
 def create_writer_block(inject_name='some_name', inject_value='some_value'):
     class WriteToCommonBlock(MockBlock):
         """Mock test, injects data into the common object."""
@@ -1,6 +1,7 @@
 """Tests for the result client-server mechanism."""
 # pylint: disable=invalid-name,too-many-public-methods,protected-access
 import mock
+from requests import ConnectionError
 from swaggapi.api.builder.client import requester
 
 from rotest.core.models import GeneralData
@@ -9,11 +10,12 @@ from rotest.management.common.utils import LOCALHOST
 from rotest.common.django_utils.common import get_sub_model
 from rotest.core.models.case_data import TestOutcome, CaseData
 from rotest.management.client.result_client import ClientResultManager
+from rotest.core.result.handlers.remote_db_handler import RemoteDBHandler
 from rotest.management.models.ut_models import DemoResource, DemoResourceData
 
 from tests.management.resource_base_test import BaseResourceManagementTest
 from tests.core.utils import (MockTestSuite, MockSuite1, MockSuite2, MockCase,
-                              MockCase1, MockCase2, SuccessCase)
+                              MockCase1, MockCase2, SuccessCase, ErrorCase)
 
 
 class TestResultManagement(BaseResourceManagementTest):
@@ -133,6 +135,22 @@ class TestResultManagement(BaseResourceManagementTest):
 
         self.assertEqual(db_run_data.run_name, run_data.run_name)
 
+    def test_tree_building_old_server(self):
+        """Test the plain tests tree is sent if the compressed is rejected."""
+        MockSuite1.components = (MockSuite2, MockTestSuite)
+        MockSuite2.components = (MockCase, MockCase1, MockCase2)
+        MockTestSuite.components = (SuccessCase,)
+
+        run_data = RunData(run_name='test_run_name')
+        main_test = MockSuite1(run_data=run_data)
+        with mock.patch("rotest.api.test_control.start_test_run."
+                        "decompress_tests_tree",
+                        side_effect=ValueError) as decompress_mock:
+            self.client.start_test_run(main_test)
+
+        self.assertEqual(decompress_mock.call_count, 1)
+        self._validate_tests_tree(main_test)
+
     def test_start_test(self):
         """Test that the start_test method starts the test's data."""
         MockTestSuite.components = (SuccessCase,)
@@ -259,3 +277,154 @@ class TestResultManagement(BaseResourceManagementTest):
         self._validate_test_result(test_case, success=False,
                                error_tuple=(TestOutcome.ERROR, ERROR_STRING))
         self._validate_test_result(main_test, success=False)
+
+    def test_add_test_events(self):
+        """Test that a batch of events is applied in order."""
+        MockTestSuite.components = (SuccessCase,)
+
+        run_data = RunData(run_name=None)
+        main_test = MockTestSuite(run_data=run_data)
+        test_case = next(iter(main_test))
+
+        ERROR_STRING = 'test error'
+        self.client.start_test_run(main_test)
+        self.client.add_test_events([
+            {"event": "start_composite", "test_id": main_test.identifier},
+            {"event": "start_test", "test_id": test_case.identifier},
+            {"event": "stop_test", "test_id": test_case.identifier},
+            {"event": "add_result", "test_id": test_case.identifier,
+             "result_code": TestOutcome.ERROR, "info": ERROR_STRING},
+            {"event": "stop_composite", "test_id": main_test.identifier}])
+
+        self._validate_has_times(test_case, start_time=True, end_time=True)
+        self._validate_test_result(test_case, success=False,
+                               error_tuple=(TestOutcome.ERROR, ERROR_STRING))
+        self._validate_test_result(main_test, success=False)
+
+    @mock.patch("rotest.management.client.client.Requester",
+                new=requester.TestRequester, create=True)
+    def test_remote_handler_spill(self):
+        """Test that the remote handler sends spilled events in order."""
+        MockTestSuite.components = (SuccessCase,)
+
+        run_data = RunData(run_name=None)
+        main_test = MockTestSuite(run_data=run_data)
+        test_case = next(iter(main_test))
+
+        handler = RemoteDBHandler(main_test=main_test)
+        handler.MAX_BUFFERED_EVENTS = 1
+        handler.UPLOAD_INTERVAL = 60
+
+        handler.start_test_run()
+        handler.start_composite(main_test)
+        handler.start_test(test_case)
+        handler.add_success(test_case)
+        handler.stop_test(test_case)
+        handler.stop_composite(main_test)
+
+        self.assertEqual(handler._spilled_events, 4)
+
+        handler.stop_test_run()
+        self.assertFalse(handler._has_pending_events())
+
+        self._validate_has_times(test_case, start_time=True, end_time=True)
+        self._validate_test_result(test_case, success=True)
+        self._validate_test_result(main_test, success=True)
+
+    @mock.patch("rotest.management.client.client.Requester",
+                new=requester.TestRequester, create=True)
+    def test_remote_handler_failing_event(self):
+        """Test that an event the server fails on doesn't drop its batch."""
+        MockTestSuite.components = (SuccessCase,)
+
+        run_data = RunData(run_name=None)
+        main_test = MockTestSuite(run_data=run_data)
+        test_case = next(iter(main_test))
+
+        handler = RemoteDBHandler(main_test=main_test)
+        handler.UPLOAD_INTERVAL = 60
+
+        handler.start_test_run()
+        handler.start_composite(main_test)
+        handler.start_test(test_case)
+        handler._events.append({"event": "start_test",
+                                "test_id": "unknown_test"})
+        handler.add_success(test_case)
+        handler.stop_test(test_case)
+        handler.stop_composite(main_test)
+
+        with mock.patch.object(handler.client, "add_test_events",
+                               wraps=handler.client.add_test_events) as send:
+            handler.stop_test_run()
+
+        self.assertFalse(handler._has_pending_events())
+        self.assertEqual(send.call_args_list.count(
+                             mock.call([{"event": "start_test",
+                                         "test_id": "unknown_test"}])),
+                         handler.MAX_EVENT_ATTEMPTS)
+
+        self._validate_has_times(test_case, start_time=True, end_time=True)
+        self._validate_test_result(test_case, success=True)
+        self._validate_test_result(main_test, success=True)
+
+    @mock.patch("rotest.management.client.client.Requester",
+                new=requester.TestRequester, create=True)
+    def test_remote_handler_server_down(self):
+        """Test that events are sent again while the server is unreachable."""
+        MockTestSuite.components = (SuccessCase,)
+
+        run_data = RunData(run_name=None)
+        main_test = MockTestSuite(run_data=run_data)
+        test_case = next(iter(main_test))
+
+        handler = RemoteDBHandler(main_test=main_test)
+        handler.UPLOAD_INTERVAL = 60
+        handler.RETRY_INTERVAL = 0
+
+        handler.start_test_run()
+        handler.start_test(test_case)
+        handler.add_success(test_case)
+        handler.stop_test(test_case)
+
+        send_events = handler.client.add_test_events
+        failures = [ConnectionError("Server down")] * 2
+
+        def send_when_up(events):
+            """Fail sending the events until the server is up."""
+            if len(failures) > 0:
+                raise failures.pop()
+
+            send_events(events)
+
+        with mock.patch.object(handler.client, "add_test_events",
+                               side_effect=send_when_up) as send:
+            handler.flush()
+
+        self.assertEqual(send.call_count, 3)
+        self.assertFalse(handler._has_pending_events())
+        handler.stop_test_run()
+
+        self._validate_has_times(test_case, start_time=True, end_time=True)
+        self._validate_test_result(test_case, success=True)
+
+    def test_get_delta_manifest(self):
+        """Test that the delta manifest contains the tests that passed."""
+        MockTestSuite.components = (SuccessCase, ErrorCase)
+
+        run_data = RunData(run_name='delta_run')
+        main_test = MockTestSuite(run_data=run_data)
+        success_case, error_case = list(main_test)
+
+        self.client.start_test_run(main_test)
+        for test_case, outcome in ((success_case, TestOutcome.SUCCESS),
+                                   (error_case, TestOutcome.ERROR)):
+            self.client.start_test(test_case)
+            self.client.add_result(test_case, outcome, "")
+            self.client.stop_test(test_case)
+
+        delta_run_data = RunData(run_name='delta_run', run_delta=True)
+        delta_test = MockTestSuite(run_data=delta_run_data)
+        self.client.start_test_run(delta_test)
+
+        self.assertEqual(self.client.get_delta_manifest(),
+                         {next(iter(delta_test)).identifier})